@@ -0,0 +1,168 @@
+"""
+Admission control and load shedding.
+
+Every API request is put in one of four classes, each with its own
+concurrency limit and a bounded wait queue:
+
+* ``vote``  - ballot submission (``ADMISSION_VOTE_LIMIT``)
+* ``auth``  - login, registration and OTP endpoints (``ADMISSION_AUTH_LIMIT``)
+* ``admin`` - ``/admin/`` endpoints (``ADMISSION_ADMIN_LIMIT``)
+* ``read``  - everything else (``ADMISSION_READ_LIMIT``)
+
+A request runs once its class has a free slot. Otherwise it waits in the
+class queue for up to ``ADMISSION_QUEUE_TIMEOUT`` seconds. When the queue
+already holds ``ADMISSION_<CLASS>_QUEUE`` requests, or the wait times out,
+the request fails fast with 503 and ``Retry-After`` instead of queueing on
+the database pool until ``DB_POOL_TIMEOUT`` and failing with a 500.
+
+Slots are never shared between classes, so the vote limit is capacity
+reserved for submissions however busy browsing gets. Keep the sum of the
+limits at or under the pool's connection ceiling (``DB_POOL_SIZE`` +
+``DB_MAX_OVERFLOW``, or ``DB_POOL_MAX``). The defaults add up to 15, the
+default ceiling. Health checks, ``/metrics``, uploaded files and the
+waiting room endpoints are not admission controlled.
+"""
+
+import os
+import threading
+import time
+
+from flask import Flask, g, jsonify, request
+
+from metrics import ADMISSION_IN_FLIGHT, ADMISSION_REJECTED
+
+VOTE_ENDPOINTS = {"voting.submit_vote"}
+# In-memory endpoints that never touch the database; throttling them would only slow the queue
+EXEMPT_ENDPOINTS = {"voting.join_waiting_room", "voting.waiting_room_status"}
+
+# class -> (default limit, default queue length)
+DEFAULTS = {"vote": (5, 50), "auth": (3, 20), "read": (6, 20), "admin": (1, 5)}
+
+
+class Gate:
+    """A concurrency limit with a bounded wait queue."""
+
+    def __init__(self, name: str, limit: int, max_queue: int):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout: float) -> str | None:
+        """Take a slot, waiting up to timeout seconds; return why not ("queue_full" / "timeout") or None."""
+        with self._cond:
+            if self.active >= self.limit or self.waiting:
+                if self.waiting >= self.max_queue:
+                    self.rejected += 1
+                    return "queue_full"
+                self.waiting += 1
+                deadline = time.monotonic() + timeout
+                try:
+                    while self.active >= self.limit:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.timed_out += 1
+                            return "timeout"
+                        self._cond.wait(remaining)
+                finally:
+                    self.waiting -= 1
+            self.active += 1
+            self.admitted += 1
+            return None
+
+    def release(self) -> None:
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+class AdmissionController:
+    def __init__(self, gates: dict[str, Gate], queue_timeout: float, retry_after: int):
+        self.gates = gates
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+    @staticmethod
+    def classify() -> str | None:
+        """Request class of the current request, or None if it is not admission controlled."""
+        path = request.path
+        if not path.startswith("/api/") or path.startswith("/api/health"):
+            return None
+        if request.endpoint in EXEMPT_ENDPOINTS:
+            return None
+        if request.endpoint in VOTE_ENDPOINTS:
+            return "vote"
+        if "/admin/" in path:
+            return "admin"
+        if request.blueprint == "auth":
+            return "auth"
+        return "read"
+
+    def install(self, app: Flask) -> None:
+        app.before_request(self._admit)
+        app.teardown_request(self._release)
+
+    def _admit(self):
+        if request.method == "OPTIONS":
+            return None
+        request_class = self.classify()
+        if request_class is None:
+            return None
+        gate = self.gates[request_class]
+        reason = gate.acquire(self.queue_timeout)
+        if reason is not None:
+            ADMISSION_REJECTED.labels(request_class, reason).inc()
+            response = jsonify({"error": "Server is busy, please try again shortly"})
+            response.status_code = 503
+            response.headers["Retry-After"] = str(self.retry_after)
+            return response
+        g.admission_gate = gate
+        ADMISSION_IN_FLIGHT.labels(request_class).inc()
+
+    def _release(self, exc):
+        gate = g.pop("admission_gate", None)
+        if gate is not None:
+            gate.release()
+            ADMISSION_IN_FLIGHT.labels(gate.name).dec()
+
+    def stats(self) -> dict:
+        return {name: gate.stats() for name, gate in self.gates.items()}
+
+
+def init_admission(app: Flask) -> AdmissionController:
+    gates = {}
+    for name, (limit, max_queue) in DEFAULTS.items():
+        gates[name] = Gate(
+            name,
+            limit=int(os.getenv(f"ADMISSION_{name.upper()}_LIMIT", str(limit))),
+            max_queue=int(os.getenv(f"ADMISSION_{name.upper()}_QUEUE", str(max_queue))),
+        )
+    controller = AdmissionController(
+        gates,
+        queue_timeout=float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5")),
+        retry_after=int(os.getenv("ADMISSION_RETRY_AFTER", "2")),
+    )
+    controller.install(app)
+    app.extensions["admission"] = controller
+
+    @app.get("/api/health/admission")
+    def admission_stats():
+        return jsonify(controller.stats())
+
+    return controller
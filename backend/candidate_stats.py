@@ -0,0 +1,103 @@
+"""
+Candidate application statistics for the admin dashboard.
+
+Every per-election and global figure comes from one
+``GROUP BY election, is_approved`` aggregate over candidates. The result is
+kept as a materialized snapshot. Each apply, approve, reject or withdraw
+marks it stale once it commits, and the next read rebuilds it. Nothing is
+queried in the writer's commit hook, while its own connection is still
+checked out. Snapshots also expire after
+``CANDIDATE_STATS_MAX_AGE_SECONDS`` so other worker processes' writes are
+picked up too.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from database import get_session, Candidate, Election
+
+
+def compute_statistics(session) -> dict:
+    """Compute overview and per-election application counts in one query."""
+    rows = session.execute(
+        select(
+            Election.id,
+            Election.title,
+            Election.election_year,
+            Election.status,
+            Candidate.is_approved,
+            func.count(Candidate.id),
+        )
+        .join(Candidate, Candidate.election_id == Election.id)
+        .group_by(Election.id, Candidate.is_approved)
+    )
+
+    by_election = {}
+    for election_id, title, election_year, status, is_approved, count in rows:
+        stats = by_election.setdefault(election_id, {
+            "election_id": election_id,
+            "title": title,
+            "election_year": election_year,
+            "status": status,
+            "total_applications": 0,
+            "approved_applications": 0,
+            "pending_applications": 0
+        })
+        stats["total_applications"] += count
+        stats["approved_applications" if is_approved else "pending_applications"] += count
+
+    election_stats = list(by_election.values())
+    return {
+        "overview": {
+            "total_applications": sum(s["total_applications"] for s in election_stats),
+            "approved_applications": sum(s["approved_applications"] for s in election_stats),
+            "pending_applications": sum(s["pending_applications"] for s in election_stats)
+        },
+        "by_election": election_stats
+    }
+
+
+class CandidateStatistics:
+    """Materialized copy of compute_statistics() with a freshness timestamp."""
+
+    def __init__(self, max_age_seconds: int):
+        self.max_age_seconds = max_age_seconds
+        self._snapshot = None  # (stats, generated_at, monotonic time the query started)
+        self._stale_at = 0.0   # monotonic time of the last committed change
+        self._lock = threading.Lock()
+
+    def get(self) -> dict:
+        """Return the statistics with a generated_at timestamp, refreshing if stale or too old."""
+        snapshot = self._snapshot
+        if (
+            snapshot is None or snapshot[2] < self._stale_at
+            or time.monotonic() - snapshot[2] > self.max_age_seconds
+        ):
+            snapshot = self.refresh()
+        stats, generated_at, _ = snapshot
+        return {**stats, "generated_at": generated_at}
+
+    def invalidate(self) -> None:
+        """Mark the snapshot stale after a candidate change commits; the next get() rebuilds it."""
+        self._stale_at = time.monotonic()
+
+    def refresh(self):
+        """Recompute the materialized statistics."""
+        requested = time.monotonic()
+        with self._lock:
+            # A refresh whose query started after this call already sees our writes
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot[2] >= requested:
+                return snapshot
+            started = time.monotonic()
+            with get_session() as session:
+                stats = compute_statistics(session)
+            self._snapshot = (stats, datetime.utcnow(), started)
+            return self._snapshot
+
+
+candidate_statistics = CandidateStatistics(int(os.getenv("CANDIDATE_STATS_MAX_AGE_SECONDS", "60")))
@@ -0,0 +1,153 @@
+"""
+Response compression middleware.
+
+Compresses JSON (and other text) responses with brotli or gzip depending on
+the client's Accept-Encoding. Views decorated with ``@precompressed`` return
+snapshot-style payloads that many clients fetch unchanged, so their
+compressed bytes are cached by content digest and reused instead of being
+recompressed on every request.
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from flask import Flask, current_app, request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; fall back to gzip only
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/javascript",
+    "text/css",
+    "text/html",
+    "text/plain",
+}
+
+
+def precompressed(view):
+    """Mark a view whose compressed responses should be cached by content."""
+    view.precompressed = True
+    return view
+
+
+class CompressedCache:
+    """Byte-bounded LRU of compressed bodies keyed by (encoding, body digest)."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, bytes], bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous)
+            self._entries[key] = body
+            self.current_bytes += len(body)
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+
+
+class Compression:
+    """Flask extension that compresses responses in an after_request hook."""
+
+    def __init__(self, app: Flask | None = None):
+        self.cache = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        app.config.setdefault("COMPRESS_MIN_SIZE", int(os.getenv("COMPRESS_MIN_SIZE", "1024")))
+        app.config.setdefault("COMPRESS_GZIP_LEVEL", int(os.getenv("COMPRESS_GZIP_LEVEL", "6")))
+        app.config.setdefault("COMPRESS_BR_QUALITY", int(os.getenv("COMPRESS_BR_QUALITY", "4")))
+        # Cached snapshots are compressed once, so they can afford a stronger setting
+        app.config.setdefault("COMPRESS_SNAPSHOT_GZIP_LEVEL", int(os.getenv("COMPRESS_SNAPSHOT_GZIP_LEVEL", "9")))
+        app.config.setdefault("COMPRESS_SNAPSHOT_BR_QUALITY", int(os.getenv("COMPRESS_SNAPSHOT_BR_QUALITY", "5")))
+        app.config.setdefault("COMPRESS_CACHE_MAX_BYTES", int(os.getenv("COMPRESS_CACHE_MAX_BYTES", str(32 * 1024 * 1024))))
+
+        self.cache = CompressedCache(app.config["COMPRESS_CACHE_MAX_BYTES"])
+        app.extensions["compression"] = self
+        app.after_request(self.after_request)
+
+    def after_request(self, response):
+        if not self._should_compress(response):
+            return response
+
+        encoding = self._negotiate()
+        response.vary.add("Accept-Encoding")
+        if encoding is None:
+            return response
+
+        body = response.get_data()
+        config = current_app.config
+        view = current_app.view_functions.get(request.endpoint)
+        if getattr(view, "precompressed", False):
+            key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+            compressed = self.cache.get(key)
+            if compressed is None:
+                compressed = compress(
+                    body,
+                    encoding,
+                    gzip_level=config["COMPRESS_SNAPSHOT_GZIP_LEVEL"],
+                    br_quality=config["COMPRESS_SNAPSHOT_BR_QUALITY"],
+                )
+                self.cache.put(key, compressed)
+        else:
+            compressed = compress(
+                body,
+                encoding,
+                gzip_level=config["COMPRESS_GZIP_LEVEL"],
+                br_quality=config["COMPRESS_BR_QUALITY"],
+            )
+
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    def _should_compress(self, response) -> bool:
+        return (
+            response.status_code == 200
+            and not response.direct_passthrough
+            and not response.is_streamed
+            and "Content-Encoding" not in response.headers
+            and response.mimetype in COMPRESSIBLE_MIMETYPES
+            and (response.content_length or 0) >= current_app.config["COMPRESS_MIN_SIZE"]
+        )
+
+    def _negotiate(self) -> str | None:
+        offered = ["br", "gzip"] if brotli is not None else ["gzip"]
+        encoding = request.accept_encodings.best_match(offered)
+        if encoding is None or request.accept_encodings[encoding] == 0:
+            return None
+        return encoding
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = 6, br_quality: int = 4) -> bytes:
+    """Compress body with the given content-coding."""
+    if encoding == "br":
+        return brotli.compress(body, quality=br_quality, mode=brotli.MODE_TEXT)
+    # mtime=0 keeps the output deterministic for identical bodies
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
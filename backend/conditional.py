@@ -0,0 +1,183 @@
+"""
+Conditional GET support (ETag / If-None-Match) for read endpoints.
+
+Views declare which data they depend on as version scopes, formatted with
+the view arguments::
+
+    @candidate_bp.route("/election/<election_id>")
+    @conditional(CATALOG, CANDIDATES, "candidates:{election_id}")
+    def get_candidates_by_election(election_id): ...
+
+The layer reads the scopes' counters from ``data_versions`` in one query and
+derives a weak ETag from them and the request URL. A matching
+``If-None-Match`` is answered with 304 before the view runs, so neither its
+queries nor its serialization happen. Writers call ``bump_versions`` in the
+same transaction as the change they make.
+
+Ballots are the exception. Each would upsert its election's ``votes:<id>``
+row, so every ballot commit of an election would queue on that one row
+lock. Instead, a committed ballot marks the scope in ``deferred_bumps``,
+and a background thread bumps all marked scopes once every
+``VOTES_VERSION_INTERVAL_MS`` (250) in a transaction of its own. Votes
+validators therefore trail the ballots by up to that interval.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from functools import wraps
+
+from flask import g, make_response, request
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from database import get_session, reading_from_replica, DataVersion
+from single_flight import SingleFlight
+
+# Scopes shared by several endpoints; per-election ones are "election:<id>",
+# "candidates:<id>" and "votes:<id>"
+CATALOG = "catalog"          # elections, positions, departments, colleges (bumped by PostgreSQL triggers)
+DEPARTMENTS = "departments"  # departments and colleges (bumped by PostgreSQL triggers)
+CANDIDATES = "candidates"    # any candidate application
+STUDENTS = "students"        # student profiles (names, departments shown in listings)
+
+# What an election's candidate listings and results are built from
+ELECTION_CANDIDATE_SCOPES = ("election:{election_id}", DEPARTMENTS, STUDENTS, "candidates:{election_id}")
+ELECTION_RESULT_SCOPES = ELECTION_CANDIDATE_SCOPES + ("votes:{election_id}",)
+
+
+def candidates_scope(election_id: str) -> str:
+    return f"candidates:{election_id}"
+
+
+def votes_scope(election_id: str) -> str:
+    return f"votes:{election_id}"
+
+
+def trigger_maintained(scope: str) -> bool:
+    """Whether the scope is bumped by database triggers rather than by the API."""
+    return scope in (CATALOG, DEPARTMENTS) or scope.startswith("election:")
+
+
+def bump_versions(session, *scopes: str) -> dict[str, int]:
+    """Increment the version of each scope as part of the session's transaction; return the new versions."""
+    dialect = session.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    # Sorted so concurrent writers lock the rows in the same order
+    stmt = insert(DataVersion).values([{"scope": scope, "version": 1} for scope in sorted(set(scopes))])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DataVersion.scope],
+        set_={"version": DataVersion.version + 1, "updated_at": stmt.excluded.updated_at},
+    )
+    return dict(session.execute(stmt.returning(DataVersion.scope, DataVersion.version)).all())
+
+
+class DeferredBumps:
+    """Scopes bumped shortly after their writers commit, at most once per interval per process."""
+
+    def __init__(self, interval_seconds: float):
+        self.interval = interval_seconds
+        self.flushes = 0
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def mark(self, scope: str) -> None:
+        with self._lock:
+            self._pending.add(scope)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="deferred-bumps", daemon=True)
+                self._thread.start()
+
+    def flush(self) -> int:
+        """Bump every marked scope in one transaction; return how many."""
+        with self._lock:
+            pending, self._pending = self._pending, set()
+        if not pending:
+            return 0
+        try:
+            with get_session() as session:
+                bump_versions(session, *pending)
+        except Exception:
+            with self._lock:
+                self._pending |= pending
+            raise
+        self.flushes += 1
+        return len(pending)
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️  Deferred version bumps failed: {e}")
+
+
+deferred_bumps = DeferredBumps(float(os.getenv("VOTES_VERSION_INTERVAL_MS", "250")) / 1000)
+
+
+def current_versions(session, scopes: list[str]) -> dict[str, int]:
+    """Versions of the given scopes; scopes never bumped are absent."""
+    rows = session.execute(select(DataVersion.scope, DataVersion.version).where(DataVersion.scope.in_(scopes)))
+    return dict(rows.all())
+
+
+def _load_versions(scopes: tuple[str, ...]) -> dict[str, int]:
+    with get_session() as session:
+        return current_versions(session, list(scopes))
+
+
+# Identical requests arriving together share one version lookup
+_version_flights = SingleFlight()
+
+
+def request_versions(scopes: list[str]) -> dict[str, int | None]:
+    """Versions of scopes (None if never bumped), loaded once per request."""
+    known = g.setdefault("data_versions", {})
+    missing = tuple(scope for scope in scopes if scope not in known)
+    if missing:
+        # Replica and primary versions differ while the replica lags, so they never share a flight
+        versions = _version_flights.do((missing, reading_from_replica()), lambda: _load_versions(missing))
+        for scope in missing:
+            known[scope] = versions.get(scope)
+    return {scope: known[scope] for scope in scopes}
+
+
+def versions_tracked(versions: dict[str, int | None]) -> bool:
+    """False if a trigger-maintained scope has no row (e.g. on SQLite, or an unknown election)."""
+    return all(version is not None for scope, version in versions.items() if trigger_maintained(scope))
+
+
+def conditional(*scope_templates: str, vary=None):
+    """Add an ETag to the view's 200 responses and answer If-None-Match with 304.
+
+    vary, if given, is called with the view arguments; its result is part of
+    the ETag too. Use it for in-memory state that can change before the
+    scopes' versions do.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            versions = request_versions([template.format(**kwargs) for template in scope_templates])
+            if not versions_tracked(versions):
+                return view(*args, **kwargs)
+
+            key = repr((request.path, request.query_string, [version or 0 for version in versions.values()]))
+            if vary is not None:
+                key += repr(vary(**kwargs))
+            etag = hashlib.blake2b(key.encode(), digest_size=12).hexdigest()
+            if request.if_none_match.contains_weak(etag):
+                response = make_response("", 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                # A stale cached body must not be labelled with the current versions
+                if response.status_code != 200 or response.headers.get("X-Cache") == "STALE":
+                    return response
+            # Compressed and identity bodies differ in bytes, hence a weak validator
+            response.set_etag(etag, weak=True)
+            response.headers["Cache-Control"] = "no-cache"
+            return response
+        return wrapper
+    return decorator
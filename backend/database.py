@@ -3,19 +3,25 @@ from typing import Generator
 from dotenv import load_dotenv
 from sqlalchemy import (
     create_engine,
+    event,
     String,
     ForeignKey,
     UniqueConstraint,
+    Index,
     DateTime,
     Text,
     Boolean,
     CheckConstraint,
+    BigInteger,
+    DDL,
 )
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship, sessionmaker, Session
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
 import uuid
-from contextlib import contextmanager
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
 
 # Load environment variables
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env"), override=False)
@@ -198,8 +204,11 @@ class Candidate(Base):
     vote_selections: Mapped[list["VoteSelection"]] = relationship(back_populates="candidate", cascade="all, delete-orphan")
 
     # Combined Index: (election_id, student_id) (Unique Index) - Prevents a candidate from applying for more than one position in one election
+    # Keyset pagination indexes: listings filter on approval/student and page on (election_id, id)
     __table_args__ = (
         UniqueConstraint("election_id", "student_id", name="uq_candidate_per_student_per_election"),
+        Index("ix_candidates_is_approved_election_id_id", "is_approved", "election_id", "id"),
+        Index("ix_candidates_student_id_election_id_id", "student_id", "election_id", "id"),
     )
 
 
@@ -219,8 +228,10 @@ class Ballot(Base):
     vote_selections: Mapped[list["VoteSelection"]] = relationship(back_populates="ballot", cascade="all, delete-orphan")
 
     # Combined Index: (election_id, student_id) (Unique Index) - Prevents a user from voting more than once per election
+    # (election_id, submitted_at) lets the turnout time series backfill recent ballots with a range scan
     __table_args__ = (
         UniqueConstraint("election_id", "student_id", name="uq_ballot_per_student_per_election"),
+        Index("ix_ballots_election_id_submitted_at", "election_id", "submitted_at"),
     )
 
 
@@ -239,19 +250,167 @@ class VoteSelection(Base):
     position: Mapped["Position"] = relationship(back_populates="vote_selections")
     candidate: Mapped["Candidate"] = relationship(back_populates="vote_selections")
 
+
+class DataVersion(Base):
+    """Change counters used as cache validators; one row per scope (e.g. "catalog", "votes:<election_id>")."""
+    __tablename__ = "data_versions"
+
+    scope: Mapped[str] = mapped_column(String(100), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class TurnoutSeriesSnapshot(Base):
+    """Periodic snapshot of an election's in-memory turnout time series (see turnout_series.py)."""
+    __tablename__ = "turnout_series_snapshots"
+
+    election_id: Mapped[str] = mapped_column(UUID(as_uuid=False), ForeignKey("elections.id", ondelete="CASCADE"), primary_key=True)
+    as_of: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False)
+    data: Mapped[str] = mapped_column(Text, nullable=False)
+
+
+class RevokedSession(Base):
+    """Session token revoked before it expired (see session_tokens.py); rows are dropped once expired."""
+    __tablename__ = "revoked_sessions"
+
+    jti: Mapped[str] = mapped_column(String(32), primary_key=True)
+    user_id: Mapped[str] = mapped_column(UUID(as_uuid=False), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False, index=True)
+    revoked_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False, default=datetime.utcnow)
+
+
+# Elections, positions, departments and colleges are maintained outside the API
+# (seed scripts, SQL), so PostgreSQL bumps their versions from triggers:
+# "catalog" for any change, "departments" for departments and colleges, and
+# "election:<id>" for the election row and its positions.
+CATALOG_TABLES = ("elections", "positions", "departments", "colleges")
+ELECTION_TABLES = {"elections": "id", "positions": "election_id"}
+DATA_VERSION_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO data_versions (scope, version, updated_at) VALUES (TG_ARGV[0], 1, now() at time zone 'utc')
+        ON CONFLICT (scope) DO UPDATE SET version = data_versions.version + 1, updated_at = EXCLUDED.updated_at;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION bump_election_version() RETURNS trigger AS $$
+    DECLARE
+        changed jsonb := to_jsonb(CASE WHEN TG_OP = 'DELETE' THEN OLD ELSE NEW END);
+    BEGIN
+        INSERT INTO data_versions (scope, version, updated_at)
+        VALUES ('election:' || (changed ->> TG_ARGV[0]), 1, now() at time zone 'utc')
+        ON CONFLICT (scope) DO UPDATE SET version = data_versions.version + 1, updated_at = EXCLUDED.updated_at;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    # Seed rows so that an existing database starts out tracked
+    "INSERT INTO data_versions (scope, version, updated_at) "
+    "SELECT scope, 1, now() at time zone 'utc' FROM (VALUES ('catalog'), ('departments')) AS s (scope) "
+    "UNION ALL SELECT 'election:' || id, 1, now() at time zone 'utc' FROM elections "
+    "ON CONFLICT (scope) DO NOTHING",
+]
+for _table in CATALOG_TABLES:
+    DATA_VERSION_DDL += [
+        f"DROP TRIGGER IF EXISTS trg_{_table}_catalog_version ON {_table}",
+        f"CREATE TRIGGER trg_{_table}_catalog_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {_table} "
+        f"FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('catalog')",
+    ]
+for _table in ("departments", "colleges"):
+    DATA_VERSION_DDL += [
+        f"DROP TRIGGER IF EXISTS trg_{_table}_departments_version ON {_table}",
+        f"CREATE TRIGGER trg_{_table}_departments_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {_table} "
+        f"FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('departments')",
+    ]
+for _table, _column in ELECTION_TABLES.items():
+    DATA_VERSION_DDL += [
+        f"DROP TRIGGER IF EXISTS trg_{_table}_election_version ON {_table}",
+        f"CREATE TRIGGER trg_{_table}_election_version AFTER INSERT OR UPDATE OR DELETE ON {_table} "
+        f"FOR EACH ROW EXECUTE FUNCTION bump_election_version('{_column}')",
+    ]
+DATA_VERSION_DDL.append("DROP FUNCTION IF EXISTS bump_catalog_version()")
+for _statement in DATA_VERSION_DDL:
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+
 pool_size = int(os.getenv("DB_POOL_SIZE", "5"))
 max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "10"))
 pool_timeout = int(os.getenv("DB_POOL_TIMEOUT", "30"))
-engine = create_engine(
-    DATABASE_URL,
-    echo=os.getenv("SQLALCHEMY_ECHO", "false").lower() == "true",
-    pool_pre_ping=True,
-    pool_size=pool_size,
-    max_overflow=max_overflow,
-    pool_timeout=pool_timeout,
-)
+
+# Adaptive pools (see pool_control.py) keep between DB_POOL_MIN and DB_POOL_MAX connections open;
+# the ceiling is fixed, the controller only moves how many idle connections are retained
+POOL_ADAPTIVE = os.getenv("DB_POOL_ADAPTIVE", "false").lower() == "true"
+pool_min = int(os.getenv("DB_POOL_MIN", str(pool_size)))
+pool_max = int(os.getenv("DB_POOL_MAX", str(pool_size + max_overflow)))
+if POOL_ADAPTIVE:
+    pool_size, max_overflow = pool_min, max(pool_max - pool_min, 0)
+
+# PgBouncer in transaction mode hands each transaction to any server connection, so nothing may
+# rely on server-side session state: psycopg must not create named prepared statements
+PGBOUNCER = os.getenv("DB_PGBOUNCER", "false").lower() == "true"
+
+# psycopg prepares a statement on the server once a connection has executed the same SQL this many
+# times ("off" never prepares), and keeps the DB_PREPARED_MAX most recently used per connection.
+# SQLAlchemy's compiled cache (DB_QUERY_CACHE_SIZE entries) is what keeps the SQL text identical.
+_prepare_threshold = os.getenv("DB_PREPARE_THRESHOLD", "off" if PGBOUNCER else "5").lower()
+PREPARE_THRESHOLD = None if _prepare_threshold in ("off", "none", "") else int(_prepare_threshold)
+PREPARED_MAX = int(os.getenv("DB_PREPARED_MAX", "100"))
+QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", "500"))
+
+
+def _engine_options(url: str) -> dict:
+    options = {
+        "echo": os.getenv("SQLALCHEMY_ECHO", "false").lower() == "true",
+        "pool_pre_ping": True,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": pool_timeout,
+        "query_cache_size": QUERY_CACHE_SIZE,
+    }
+    if url.startswith("postgresql+psycopg"):
+        options["connect_args"] = {"prepare_threshold": PREPARE_THRESHOLD}
+    return options
+
+
+def _limit_prepared_statements(dbapi_connection, connection_record) -> None:
+    if hasattr(dbapi_connection, "prepared_max"):
+        dbapi_connection.prepared_max = PREPARED_MAX
+
+
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+event.listen(engine, "connect", _limit_prepared_statements)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
 
+# Optional streaming replica for read-only endpoints (see replica.py); None when not configured
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+replica_engine = create_engine(
+    DATABASE_REPLICA_URL, **_engine_options(DATABASE_REPLICA_URL)
+) if DATABASE_REPLICA_URL else None
+if replica_engine is not None:
+    event.listen(replica_engine, "connect", _limit_prepared_statements)
+ReplicaSessionLocal = sessionmaker(
+    bind=replica_engine, autoflush=False, autocommit=False, expire_on_commit=False
+) if replica_engine is not None else None
+
+# Set while a view routed to the replica runs; get_session() then opens replica sessions
+_use_replica: ContextVar[bool] = ContextVar("use_replica", default=False)
+
+
+@contextmanager
+def replica_reads():
+    """Route get_session() in this context to the replica, if one is configured."""
+    token = _use_replica.set(ReplicaSessionLocal is not None)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def reading_from_replica() -> bool:
+    return _use_replica.get()
+
 
 def ensure_database_initialized() -> None:
     Base.metadata.create_all(bind=engine)
@@ -261,9 +420,93 @@ def create_all_tables() -> None:
     Base.metadata.create_all(bind=engine)
 
 
+def run_after_commit(session: Session, callback) -> None:
+    """Run callback once the session's current transaction has committed."""
+    session.info.setdefault("after_commit", []).append(callback)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _run_after_commit_callbacks(session: Session) -> None:
+    for callback in session.info.pop("after_commit", []):
+        try:
+            callback()
+        except Exception as e:
+            print(f"⚠️  after-commit callback failed: {e}")
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_after_commit_callbacks(session: Session) -> None:
+    session.info.pop("after_commit", None)
+
+
+def use_snapshot(session) -> None:
+    """Make the session's queries see one snapshot (REPEATABLE READ); call before its first query."""
+    if session.get_bind().dialect.name == "postgresql":
+        session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+
 @contextmanager
-def get_session():
+def get_snapshot_session():
+    """Read-only session whose queries all see one consistent snapshot of the database."""
     session = SessionLocal()
+    try:
+        use_snapshot(session)
+        yield session
+    finally:
+        session.close()
+
+
+# Multi-statement writes send their statements in one flight with psycopg's pipeline mode
+DB_PIPELINE = os.getenv("DB_PIPELINE", "true").lower() == "true"
+
+
+def _pipeline_supported(connection) -> bool:
+    if not DB_PIPELINE or connection.dialect.driver != "psycopg":
+        return False
+    import psycopg
+    return psycopg.Pipeline.is_supported()
+
+
+@contextmanager
+def pipelined(session: Session):
+    """Pipeline the session's statements inside the block.
+
+    Each statement is sent as soon as it is executed, without waiting for the
+    previous one's result. The first statement whose rows are read (a
+    RETURNING, say) ends the pipeline: it waits once for all the results, and
+    statements after it run as usual. So a write transaction that ends with
+    one RETURNING costs a single round trip plus the commit. Only flush and
+    execute inside the block; commit after it. Yields False, and runs the
+    block as usual, on drivers other than psycopg, with a libpq without
+    pipeline support, or with DB_PIPELINE=false.
+    """
+    connection = session.connection()
+    if not _pipeline_supported(connection):
+        yield False
+        return
+    with ExitStack() as stack:
+        stack.enter_context(connection.connection.driver_connection.pipeline())
+        connection.info["pipeline"] = stack
+        try:
+            yield True
+        finally:
+            connection.info.pop("pipeline", None)
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_pipeline_for_rows(conn, cursor, statement, parameters, context, executemany) -> None:
+    # SQLAlchemy decides from cursor.description whether a statement returned rows, and a pipelined
+    # cursor has none until its results arrive. Leaving the pipeline collects them; a plain sync would
+    # cost a round trip of its own, since leaving always waits for one more.
+    if "pipeline" not in conn.info or cursor.description is not None or context.compiled is None:
+        return
+    if context.compiled.effective_returning or getattr(context.compiled.statement, "is_select", False):
+        conn.info.pop("pipeline").close()
+
+
+@contextmanager
+def get_session():
+    session = ReplicaSessionLocal() if _use_replica.get() else SessionLocal()
     try:
         print("🔍 DEBUG: Starting database session")
         yield session
@@ -0,0 +1,228 @@
+"""
+Read-only degraded mode while the database is unreachable.
+
+The engine's ``handle_error`` events tell us when the database goes away:
+a failed pool pre-ping makes the pool reconnect, and when that new
+connection cannot be made either, the database is marked down. From then
+on:
+
+* Views marked ``@snapshot_read`` (catalog, candidate and results reads)
+  answer with the last 200 response they produced for the same URL, as
+  JSON with ``"stale": true`` and ``"stale_as_of"`` added, and with an
+  ``X-Stale: true`` header. Without a snapshot they return 503.
+* All other API requests, writes included, get 503 with ``Retry-After``
+  before they touch the pool, instead of waiting ``DB_POOL_TIMEOUT``.
+
+A background thread tries a fresh connection every
+``DEGRADED_PROBE_SECONDS`` and leaves degraded mode as soon as one
+succeeds. Snapshots are kept per process in an LRU bounded by
+``DEGRADED_SNAPSHOT_MAX_BYTES``. Put ``@snapshot_read`` directly under
+the route decorator so version lookups and replica routing happen inside
+it.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import Flask, current_app, jsonify, make_response, request
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+
+from admission import EXEMPT_ENDPOINTS
+from database import engine
+
+
+class DatabaseHealth:
+    """Tracks whether the database can be reached, from connection errors and a recovery probe."""
+
+    def __init__(self, engine, probe_seconds: float, retry_after: int):
+        self.engine = engine
+        self.probe_seconds = probe_seconds
+        self.retry_after = retry_after
+        self.down = False
+        self.since = None
+        self.last_error = None
+        self.outages = 0
+        self.pre_ping_failures = 0
+        self._installed = False
+        self._lock = threading.Lock()
+
+    def install(self) -> None:
+        if not self._installed:
+            event.listen(self.engine, "handle_error", self._on_error)
+            self._installed = True
+
+    def _on_error(self, context) -> None:
+        if context.is_pre_ping:
+            # The pool replaces the stale connection next; only a failure to do so means an outage
+            self.pre_ping_failures += 1
+        elif context.connection is None:
+            self.mark_down(context.original_exception)
+
+    def mark_down(self, error: BaseException) -> None:
+        with self._lock:
+            self.last_error = str(error).strip().split("\n")[0] or type(error).__name__
+            if self.down:
+                return
+            self.down = True
+            self.since = time.time()
+            self.outages += 1
+        print(f"🛑 Database unreachable, serving cached reads only: {self.last_error}")
+        threading.Thread(target=self._probe, name="db-probe", daemon=True).start()
+
+    def _probe(self) -> None:
+        while True:
+            time.sleep(self.probe_seconds)
+            try:
+                with self.engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+            except Exception:
+                continue
+            with self._lock:
+                self.down = False
+            print(f"✅ Database reachable again after {time.time() - self.since:.0f}s")
+            return
+
+    def stats(self) -> dict:
+        return {
+            "down": self.down,
+            "since": datetime.fromtimestamp(self.since, timezone.utc).isoformat() if self.down else None,
+            "last_error": self.last_error,
+            "outages": self.outages,
+            "pre_ping_failures": self.pre_ping_failures,
+        }
+
+
+db_health = DatabaseHealth(
+    engine,
+    probe_seconds=float(os.getenv("DEGRADED_PROBE_SECONDS", "2")),
+    retry_after=int(os.getenv("DEGRADED_RETRY_AFTER", "5")),
+)
+
+
+class SnapshotStore:
+    """Byte-bounded LRU of the last good JSON body per request, with the time it was produced."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.served = 0
+        self.missing = 0
+        self._entries: OrderedDict[tuple, tuple[bytes, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> tuple[bytes, float] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.missing += 1
+                return None
+            self.served += 1
+            return entry
+
+    def put(self, key, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous[0])
+            self._entries[key] = (body, time.time())
+            self.current_bytes += len(body)
+            while self.current_bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "served": self.served,
+                "missing": self.missing,
+            }
+
+
+def _unavailable():
+    response = jsonify({"error": "The database is temporarily unavailable, please try again shortly"})
+    response.status_code = 503
+    response.headers["Retry-After"] = str(db_health.retry_after)
+    return response
+
+
+def _stale(body: bytes, stored_at: float):
+    stale_as_of = datetime.fromtimestamp(stored_at, timezone.utc).isoformat()
+    data = json.loads(body)
+    if isinstance(data, dict):
+        data = {**data, "stale": True, "stale_as_of": stale_as_of}
+    response = jsonify(data)
+    response.headers["X-Stale"] = "true"
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+def snapshot_read(view):
+    """Remember the view's 200 JSON responses and serve them, marked stale, while the database is down."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        store = current_app.extensions.get("snapshots")
+        if store is None:
+            return view(*args, **kwargs)
+        key = (request.endpoint, tuple(sorted(kwargs.items())), request.query_string)
+        if not db_health.down:
+            try:
+                response = make_response(view(*args, **kwargs))
+            except DBAPIError:
+                if not db_health.down:
+                    raise
+            else:
+                if response.status_code == 200 and response.mimetype == "application/json" and not response.is_streamed:
+                    store.put(key, response.get_data())
+                # Views that catch their own errors answer 500 when the connection fails mid-request
+                if response.status_code < 500 or not db_health.down:
+                    return response
+        entry = store.get(key)
+        return _unavailable() if entry is None else _stale(*entry)
+    wrapper.snapshot_read = True
+    return wrapper
+
+
+def init_degraded_mode(app: Flask) -> SnapshotStore:
+    store = SnapshotStore(int(os.getenv("DEGRADED_SNAPSHOT_MAX_BYTES", str(32 * 1024 * 1024))))
+    app.extensions["snapshots"] = store
+    db_health.install()
+
+    def database_free() -> bool:
+        path = request.path
+        view = app.view_functions.get(request.endpoint)
+        return (
+            request.method == "OPTIONS"
+            or not path.startswith("/api/")
+            or path.startswith("/api/health")
+            or request.endpoint in EXEMPT_ENDPOINTS
+            or getattr(view, "snapshot_read", False)
+        )
+
+    @app.before_request
+    def shed_while_down():
+        if db_health.down and not database_free():
+            return _unavailable()
+
+    @app.after_request
+    def unavailable_not_failed(response):
+        # A request that found the database gone mid-way should read as "retry later", not a server bug
+        if response.status_code >= 500 and response.status_code != 503 and db_health.down and not database_free():
+            return _unavailable()
+        return response
+
+    @app.get("/api/health/database")
+    def database_health():
+        return jsonify({**db_health.stats(), "snapshots": store.stats()})
+
+    return store
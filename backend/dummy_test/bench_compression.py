@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark CPU cost versus bytes saved for response compression.
+
+Builds a payload shaped like /api/candidates/all-candidates and
+/api/voting/results/<id> and compresses it with each encoding/level the
+compression middleware can use. No database is required.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+import uuid
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compression import CompressedCache, brotli, compress
+
+DEPARTMENTS = ["Computer Science and Engineering", "Electronics and Communication Engineering",
+               "Mechanical Engineering", "Civil Engineering", "Chemical Engineering"]
+POSITIONS = ["President", "Vice President", "General Secretary", "Cultural Secretary", "Sports Secretary"]
+
+
+def build_results_payload(candidates_per_position: int) -> bytes:
+    """Build a results-style JSON body."""
+    results = []
+    for position in POSITIONS:
+        candidates = []
+        for i in range(candidates_per_position):
+            candidates.append({
+                "candidate_id": str(uuid.uuid4()),
+                "candidate_name": f"Student{i} Surname{i}",
+                "department": DEPARTMENTS[i % len(DEPARTMENTS)],
+                "year_of_study": f"{i % 4 + 1}th Year",
+                "platform_statement": "I will work for better facilities, transparent budgets and more "
+                                      "student representation in every committee. " * 3,
+                "photo_url": f"/uploads/candidates/ab/cd/{uuid.uuid4().hex}.jpg",
+                "vote_count": i * 7,
+            })
+        results.append({
+            "position_id": str(uuid.uuid4()),
+            "position_name": position,
+            "candidates": candidates,
+            "none_of_the_above_votes": 12,
+            "total_votes": 1000,
+        })
+    return json.dumps({"results": results}, separators=(",", ":")).encode()
+
+
+def time_compression(body: bytes, encoding: str, iterations: int, **levels):
+    """Return (ms per call, compressed size)."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        compressed = compress(body, encoding, **levels)
+    elapsed = time.perf_counter() - start
+    return elapsed / iterations * 1000, len(compressed)
+
+
+def main():
+    iterations = int(os.getenv("BENCH_ITERATIONS", "50"))
+    settings = [("gzip", {"gzip_level": level}) for level in (1, 6, 9)]
+    if brotli is not None:
+        settings += [("br", {"br_quality": quality}) for quality in (1, 4, 9, 11)]
+
+    for per_position in (5, 20, 80):
+        body = build_results_payload(per_position)
+        print(f"\n📦 Payload: {len(body):,} bytes ({per_position} candidates per position)")
+        print(f"{'encoding':<10}{'level':>6}{'ms/call':>10}{'bytes':>10}{'saved':>8}")
+        for encoding, levels in settings:
+            runs = max(1, iterations // 10) if levels.get("br_quality") == 11 else iterations
+            ms, size = time_compression(body, encoding, runs, **levels)
+            level = next(iter(levels.values()))
+            print(f"{encoding:<10}{level:>6}{ms:>10.3f}{size:>10,}{1 - size / len(body):>8.1%}")
+
+        # Cost of serving a cached snapshot: digest + LRU lookup
+        cache = CompressedCache(32 * 1024 * 1024)
+        key = ("gzip", hashlib.blake2b(body, digest_size=16).digest())
+        cache.put(key, compress(body, "gzip", gzip_level=9))
+        start = time.perf_counter()
+        for _ in range(iterations):
+            cache.get(("gzip", hashlib.blake2b(body, digest_size=16).digest()))
+        ms = (time.perf_counter() - start) / iterations * 1000
+        print(f"{'cached':<10}{'-':>6}{ms:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
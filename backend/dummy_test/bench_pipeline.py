@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Pipelined vs. plain multi-statement writes at simulated database latency.
+
+Runs POST /api/voting/submit, /api/auth/register and
+/api/candidates/apply through the Flask test client against a real
+PostgreSQL (pipeline mode needs psycopg and libpq 14+), with
+DB_PIPELINE off and on. The app connects through a small TCP proxy that
+holds every packet for half of BENCH_LATENCIES_MS (default "1,5") in
+each direction, so each round trip costs that much more, as it would
+with the database in another zone. The proxy also counts round trips
+(client sends that follow a reply from the server) per request.
+
+BENCH_PG_URL must name a scratch database, e.g.
+postgresql+psycopg://postgres@/digivote_bench?host=/tmp/pgdata
+(a unix socket works). Its tables are dropped and recreated.
+"""
+
+import contextlib
+import io
+import os
+import queue
+import socket
+import statistics
+import sys
+import threading
+import time
+import uuid
+
+from sqlalchemy.engine import make_url
+
+BENCH_PG_URL = os.getenv("BENCH_PG_URL")
+if not BENCH_PG_URL:
+    sys.exit("Set BENCH_PG_URL to a scratch PostgreSQL database (its tables are dropped)")
+LATENCIES_MS = [float(ms) for ms in os.getenv("BENCH_LATENCIES_MS", "1,5").split(",")]
+RUNS = int(os.getenv("BENCH_RUNS", "30"))
+
+
+class LatencyProxy:
+    """TCP proxy that delays each chunk by half of `latency` seconds in each direction."""
+
+    def __init__(self, upstream):
+        self.upstream = upstream  # a unix socket path or a (host, port) pair
+        self.latency = 0.0
+        self.round_trips = 0  # client sends that follow a server reply
+        self._replied = True
+        self.listener = socket.create_server(("127.0.0.1", 0))
+        self.port = self.listener.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            client, _ = self.listener.accept()
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if isinstance(self.upstream, str):
+                server = socket.socket(socket.AF_UNIX)
+            else:
+                server = socket.socket()
+                server.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            server.connect(self.upstream)
+            self._forward(client, server, from_client=True)
+            self._forward(server, client, from_client=False)
+
+    def _forward(self, source, target, from_client):
+        pending = queue.Queue()
+
+        def read():
+            while True:
+                try:
+                    data = source.recv(65536)
+                except OSError:
+                    data = b""
+                if data and from_client and self._replied:
+                    self.round_trips += 1
+                self._replied = not from_client
+                pending.put((time.perf_counter() + self.latency / 2, data))
+                if not data:
+                    return
+
+        def write():
+            while True:
+                due, data = pending.get()
+                if not data:
+                    with contextlib.suppress(OSError):
+                        target.shutdown(socket.SHUT_WR)
+                    return
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                with contextlib.suppress(OSError):
+                    target.sendall(data)
+
+        threading.Thread(target=read, daemon=True).start()
+        threading.Thread(target=write, daemon=True).start()
+
+
+def start_proxy(url):
+    host = url.host or url.query.get("host")
+    port = url.port or 5432
+    upstream = f"{host}/.s.PGSQL.{port}" if host and host.startswith("/") else (host or "localhost", port)
+    proxy = LatencyProxy(upstream)
+    query = {key: value for key, value in url.query.items() if key != "host"}
+    return proxy, url.set(host="127.0.0.1", port=proxy.port, query=query)
+
+
+_proxy, _proxied_url = start_proxy(make_url(BENCH_PG_URL))
+os.environ["DATABASE_URL"] = _proxied_url.render_as_string(hide_password=False)
+os.environ["SMTP_USERNAME"] = ""  # print OTPs instead of mailing them
+os.environ.setdefault("PHOTO_GC_ENABLED", "false")
+os.environ.setdefault("BENCH_VOTERS", "10")
+os.environ.setdefault("SESSION_REVOCATION_REFRESH_SECONDS", "3600")
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+import database
+from bench_read_models import seed
+from database import Base, Candidate, Department, Election, Position, SessionLocal, Student, User, engine
+from server import create_app
+
+
+def make_students(session, department_id, count, prefix):
+    students = []
+    for _ in range(count):
+        user = User(email=f"{prefix}-{uuid.uuid4().hex[:12]}@student.nitw.ac.in", password_hash="x",
+                    first_name="Bench", last_name="Student", is_verified=True)
+        students.append(Student(user=user, year_of_study="2nd Year", department_id=department_id))
+    session.add_all(students)
+    session.flush()
+    return [student.id for student in students]
+
+
+def timed(call, expected_status):
+    """(milliseconds, round trips to the database) of one request."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        round_trips = _proxy.round_trips
+        start = time.perf_counter()
+        response = call()
+        elapsed = time.perf_counter() - start
+    if response.status_code != expected_status:
+        raise RuntimeError(f"{response.status_code}: {response.get_data(as_text=True)[:200]}")
+    return elapsed * 1000, _proxy.round_trips - round_trips
+
+
+def main():
+    rounds = len(LATENCIES_MS) * 2
+    with contextlib.redirect_stdout(io.StringIO()):
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        with SessionLocal() as session:
+            election_id = seed(session)
+            position_ids = session.execute(select(Position.id).where(Position.election_id == election_id)).scalars().all()
+            candidates = dict(session.execute(select(Candidate.position_id, Candidate.id)).all())
+            department_id = session.execute(select(Department.id)).scalar_one()
+            upcoming = Election(
+                title="Upcoming Bench Election", election_year="2026", status="UPCOMING",
+                start_time=datetime.utcnow() + timedelta(days=7), end_time=datetime.utcnow() + timedelta(days=8),
+            )
+            session.add(upcoming)
+            session.flush()
+            position = Position(election_id=upcoming.id, name="Bench Position")
+            session.add(position)
+            session.flush()
+            voters = make_students(session, department_id, RUNS * rounds, "voter")
+            applicants = make_students(session, department_id, RUNS * rounds, "applicant")
+            upcoming_id, upcoming_position_id = upcoming.id, position.id
+            session.commit()
+        app = create_app()
+    app.extensions.pop("response_cache", None)
+    client = app.test_client()
+    votes = {position_id: candidates.get(position_id) for position_id in position_ids}
+
+    endpoints = {
+        "POST /voting/submit": lambda i: timed(lambda: client.post("/api/voting/submit", json={
+            "election_id": election_id, "student_id": voters[i], "votes": votes,
+        }), 201),
+        "POST /auth/register": lambda i: timed(lambda: client.post("/api/auth/register", json={
+            "first_name": "Bench", "last_name": "Register", "password": "bench-password",
+            "email": f"register-{uuid.uuid4().hex[:12]}@student.nitw.ac.in",
+            "phone": f"9{uuid.uuid4().int % 10**9:09d}",  # with a phone, registration also creates an SMS OTP
+            "year_of_study": "1st Year", "department_id": department_id,
+        }), 201),
+        "POST /candidates/apply": lambda i: timed(lambda: client.post("/api/candidates/apply", json={
+            "student_id": applicants[i], "election_id": upcoming_id, "position_id": upcoming_position_id,
+            "platform_statement": "Bench platform",
+        }), 201),
+    }
+
+    print(f"{'latency':>8}  {'request':<24}{'plain p50':>11}{'trips':>7}{'pipelined p50':>15}{'trips':>7}{'saved':>9}")
+    for round_index, latency_ms in enumerate(LATENCIES_MS):
+        _proxy.latency = latency_ms / 1000
+        for name, call in endpoints.items():
+            medians, trips = {}, {}
+            for pipeline in (False, True):
+                database.DB_PIPELINE = pipeline
+                first = (round_index * 2 + pipeline) * RUNS  # each run needs a fresh voter / applicant
+                call(first)  # warm the pool connection and the statement caches
+                samples = [call(i) for i in range(first + 1, first + RUNS)]
+                medians[pipeline] = statistics.median(ms for ms, _ in samples)
+                trips[pipeline] = statistics.median(count for _, count in samples)
+            plain, pipelined = medians[False], medians[True]
+            print(f"{latency_ms:>6.0f}ms  {name:<24}{plain:>9.1f}ms{trips[False]:>7.0f}{pipelined:>13.1f}ms"
+                  f"{trips[True]:>7.0f}{plain - pipelined:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Compare per-request allocations of the ORM listing/results queries with
+the Core read models in read_models.py.
+
+Seeds an in-memory SQLite database (no PostgreSQL needed), then runs each
+variant under tracemalloc and reports peak memory, allocated blocks and
+wall time per call.
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import joinedload, sessionmaker
+
+import read_models
+from database import (
+    Base, Ballot, Candidate, College, Department, Election, Position, Student, User, VoteSelection
+)
+
+CANDIDATES = int(os.getenv("BENCH_CANDIDATES", "1000"))
+VOTERS = int(os.getenv("BENCH_VOTERS", "2000"))
+POSITIONS = 10
+
+
+def seed(session):
+    session.add(College(id="bench", name="Bench College"))
+    department = Department(college_id="bench", name="Computer Science and Engineering")
+    session.add(department)
+    election = Election(
+        title="Bench Election", election_year="2026", status="ACTIVE",
+        description="Long description " * 200,
+        start_time=datetime.utcnow(), end_time=datetime.utcnow() + timedelta(days=1),
+    )
+    session.add(election)
+    session.flush()
+    positions = [Position(election_id=election.id, name=f"Position {i}") for i in range(POSITIONS)]
+    session.add_all(positions)
+    session.flush()
+
+    students = []
+    for i in range(max(CANDIDATES, VOTERS)):
+        user = User(email=f"bench{i}@student.nitw.ac.in", password_hash="x" * 100,
+                    first_name=f"First{i}", last_name=f"Last{i}", is_verified=True)
+        session.add(user)
+        students.append(Student(user=user, year_of_study="3rd Year", department=department))
+    session.add_all(students)
+    session.flush()
+
+    candidates = [
+        Candidate(student_id=students[i].id, position_id=positions[i % POSITIONS].id, election_id=election.id,
+                  platform_statement="My platform statement. " * 100, is_approved=True)
+        for i in range(CANDIDATES)
+    ]
+    session.add_all(candidates)
+    session.flush()
+
+    for i in range(VOTERS):
+        ballot = Ballot(election_id=election.id, student_id=students[i].id)
+        session.add(ballot)
+        session.flush()
+        for position_index, position in enumerate(positions):
+            candidate = candidates[(i + position_index * 7) % CANDIDATES]
+            session.add(VoteSelection(ballot_id=ballot.id, position_id=position.id,
+                                      candidate_id=candidate.id if candidate.position_id == position.id else None))
+    session.commit()
+    return election.id
+
+
+def orm_all_candidates(session, election_id):
+    candidates = session.query(Candidate).options(
+        joinedload(Candidate.student).joinedload(Student.user),
+        joinedload(Candidate.position),
+        joinedload(Candidate.election)
+    ).filter(Candidate.is_approved == True).all()
+    return [
+        {"id": c.id, "name": f"{c.student.user.first_name} {c.student.user.last_name}",
+         "position": c.position.name, "election": c.election.title}
+        for c in candidates
+    ]
+
+
+def core_all_candidates(session, election_id):
+    rows = session.execute(read_models.candidate_listing_select()).all()
+    return [
+        {"id": r.id, "name": f"{r.first_name} {r.last_name}", "position": r.position_name, "election": r.election_title}
+        for r in rows
+    ]
+
+
+def orm_results(session, election_id):
+    results = []
+    for position in session.query(Position).filter(Position.election_id == election_id).all():
+        selections = session.query(VoteSelection).filter(
+            VoteSelection.position_id == position.id
+        ).join(Ballot).filter(Ballot.election_id == election_id).all()
+        counts = {}
+        for selection in selections:
+            if selection.candidate_id:
+                counts[str(selection.candidate_id)] = counts.get(str(selection.candidate_id), 0) + 1
+        candidates = session.query(Candidate).options(
+            joinedload(Candidate.student).joinedload(Student.user),
+            joinedload(Candidate.student).joinedload(Student.department)
+        ).filter(Candidate.position_id == position.id, Candidate.is_approved == True).all()
+        results.append([(c.id, c.student.user.first_name, c.student.department.name, counts.get(str(c.id), 0))
+                        for c in candidates])
+    return results
+
+
+def core_results(session, election_id):
+    counts = read_models.vote_counts(session, election_id)
+    by_position = {}
+    for c in read_models.result_candidates(session, election_id):
+        by_position.setdefault(str(c.position_id), []).append(
+            (c.id, c.first_name, c.department_name, counts.get(str(c.position_id), {}).get(str(c.id), 0))
+        )
+    return [by_position.get(str(p.id), []) for p in read_models.positions_for_election(session, election_id)]
+
+
+def measure(Session, fn, election_id, iterations=5):
+    # Each call gets a fresh session, as each request does
+    with Session() as session:
+        fn(session, election_id)  # warm up statement caches
+
+    peaks, blocks, times = [], [], []
+    for _ in range(iterations):
+        with Session() as session:
+            tracemalloc.start()
+            start = time.perf_counter()
+            fn(session, election_id)
+            times.append(time.perf_counter() - start)
+            _, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+        peaks.append(peak)
+        blocks.append(sum(stat.count for stat in snapshot.statistics("filename")))
+    return min(peaks), min(blocks), min(times)
+
+
+def main():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    with Session() as session:
+        election_id = seed(session)
+
+    print(f"📊 {CANDIDATES} approved candidates, {VOTERS} ballots x {POSITIONS} positions (SQLite, tracemalloc)")
+    print(f"{'endpoint':<16}{'variant':<8}{'peak KiB':>10}{'live blocks':>13}{'ms':>9}")
+    for name, orm_fn, core_fn in (("all-candidates", orm_all_candidates, core_all_candidates),
+                                  ("results", orm_results, core_results)):
+        orm = measure(Session, orm_fn, election_id)
+        core = measure(Session, core_fn, election_id)
+        for variant, (peak, blocks, elapsed) in (("orm", orm), ("core", core)):
+            print(f"{name:<16}{variant:<8}{peak / 1024:>10.0f}{blocks:>13,}{elapsed * 1000:>9.1f}")
+        print(f"{'':<16}{'saved':<8}{1 - core[0] / orm[0]:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Python-side statement overhead of the ballot submission lookups.
+
+Runs the reads submit_vote makes before writing (student, user, election
+with positions, ballot existence, selected candidates) BENCH_REQUESTS
+times against a seeded SQLite file database, in three forms:
+
+* ``session.query`` with the compiled cache off: every call compiles
+* ``session.query`` as the routes used to run it: cached compile, but the
+  query is rebuilt and its cache key computed on every call
+* ``lookups`` lambda statements: built and keyed once per call site
+
+The SQL sent is nearly the same in each row (the lookups ask EXISTS
+instead of loading the ballot), so the differences are mostly the Python
+cost of building, keying and compiling statements. Server-side
+prepared statements (DB_PREPARE_THRESHOLD) save the matching planning
+work on PostgreSQL and do not show up here.
+
+Before timing, the candidate IN-list lookup is checked against a plain
+select for several id lists: a lambda statement caches its SQL by call
+site, so lists of the same length must still bind their own ids and lists
+of other lengths must not reuse a stale expansion. A mismatch exits 1.
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+DB_DIR = tempfile.mkdtemp(prefix="stmt-cache-")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_DIR}/stmt.db"
+os.environ.setdefault("BENCH_VOTERS", "200")
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import and_, select
+from sqlalchemy.orm import joinedload, sessionmaker
+
+import lookups
+from bench_read_models import seed
+from database import Ballot, Base, Candidate, Election, Position, SessionLocal, Student, User, engine
+
+REQUESTS = int(os.getenv("BENCH_REQUESTS", "3000"))
+
+
+def query_lookups(session, election_id, student_id, candidate_ids):
+    student = session.query(Student).filter(Student.id == student_id).first()
+    user = session.query(User).filter(User.id == student.user_id).first()
+    election = session.query(Election).options(
+        joinedload(Election.positions)
+    ).filter(Election.id == election_id).first()
+    ballot = session.query(Ballot).filter(
+        and_(Ballot.election_id == election_id, Ballot.student_id == student_id)
+    ).first()
+    approved = dict(session.query(Candidate.id, Candidate.position_id).filter(
+        and_(Candidate.id.in_(candidate_ids), Candidate.election_id == election_id, Candidate.is_approved == True)
+    ).all())
+    return user, election, ballot, approved
+
+
+def lambda_lookups(session, election_id, student_id, candidate_ids):
+    student = lookups.student_by_id(session, student_id)
+    user = lookups.user_by_id(session, student.user_id)
+    election = lookups.election_with_positions(session, election_id)
+    ballot = lookups.ballot_exists(session, election_id, student_id)
+    approved = lookups.approved_candidate_positions(session, election_id, candidate_ids)
+    return user, election, ballot, approved
+
+
+def check_candidate_lists(session, election_id, candidate_ids):
+    """Compare approved_candidate_positions with a plain select; return the mismatching lists."""
+    unknown = "00000000-0000-0000-0000-000000000000"
+    id_lists = [
+        candidate_ids[:2],
+        candidate_ids[2:4],  # same length, other ids
+        candidate_ids[:1],
+        candidate_ids,
+        candidate_ids[3:] + [unknown],
+        [unknown],
+        [],
+        candidate_ids[:2],  # first list again, after the others
+    ]
+    failures = []
+    results = []
+    for ids in id_lists:
+        got = lookups.approved_candidate_positions(session, election_id, ids)
+        expected = dict(session.execute(
+            select(Candidate.id, Candidate.position_id).where(
+                Candidate.id.in_(ids), Candidate.election_id == election_id, Candidate.is_approved == True
+            )
+        ).all())
+        if got != expected:
+            failures.append(ids)
+        results.append(got)
+    if results[0] == results[1]:
+        failures.append(id_lists[1])
+    return failures
+
+
+def run(session_factory, lookup, election_id, student_ids, candidate_ids):
+    """Microseconds per request."""
+    start = time.perf_counter()
+    for i in range(REQUESTS):
+        with session_factory() as session:
+            lookup(session, election_id, student_ids[i % len(student_ids)], candidate_ids)
+    return (time.perf_counter() - start) / REQUESTS * 1e6
+
+
+def main():
+    with contextlib.redirect_stdout(io.StringIO()):
+        Base.metadata.create_all(engine)
+        with SessionLocal() as session:
+            election_id = seed(session)
+            student_ids = session.execute(select(Student.id)).scalars().all()
+            candidate_ids = session.execute(
+                select(Candidate.id).join(Position).where(Position.election_id == election_id).limit(5)
+            ).scalars().all()
+            failures = check_candidate_lists(session, election_id, candidate_ids)
+
+    if failures:
+        for ids in failures:
+            print(f"approved_candidate_positions wrong or stale for {ids}")
+        sys.exit(1)
+    print("approved_candidate_positions matches a plain select for 8 id lists")
+
+    uncached = sessionmaker(bind=engine.execution_options(compiled_cache=None), expire_on_commit=False)
+    variants = [
+        ("session.query, no compiled cache", uncached, query_lookups),
+        ("session.query", SessionLocal, query_lookups),
+        ("lambda_stmt lookups", SessionLocal, lambda_lookups),
+    ]
+    for _, factory, lookup in variants:
+        run(factory, lookup, election_id, student_ids, candidate_ids)  # warm caches and the file cache
+
+    print(f"{REQUESTS} requests x 5 lookups, SQLite file database")
+    print(f"{'variant':<36}{'us/request':>12}")
+    baseline = None
+    for name, factory, lookup in variants:
+        per_request = run(factory, lookup, election_id, student_ids, candidate_ids)
+        baseline = baseline or per_request
+        print(f"{name:<36}{per_request:>12.0f}   {per_request / baseline:>5.0%}")
+
+
+if __name__ == "__main__":
+    main()
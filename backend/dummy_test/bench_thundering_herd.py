@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Thundering-herd benchmark for GET /api/voting/results/<election_id>.
+
+Fires BENCH_CLIENTS simultaneous identical requests at the app (threads,
+Flask test client, SQLite file database) and reports how many SQL queries
+they caused and the p50/p99 latency, with the response cache (single
+flight + stale-while-revalidate) disabled and enabled. The enabled run
+does a cold herd, then a herd right after a vote bumps the results
+version, where most requests are answered from the stale entry.
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+DB_DIR = tempfile.mkdtemp(prefix="herd-")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_DIR}/herd.db"
+os.environ.setdefault("PHOTO_GC_ENABLED", "false")
+os.environ.setdefault("BENCH_VOTERS", "3000")
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+
+from bench_read_models import POSITIONS, VOTERS, seed
+from conditional import bump_versions, votes_scope
+from database import Base, SessionLocal, engine, get_session
+from server import create_app
+
+CLIENTS = int(os.getenv("BENCH_CLIENTS", "200"))
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, *args):
+        with self._lock:
+            self.count += 1
+
+
+def herd(app, url):
+    """Send CLIENTS identical requests at once; return (latencies, X-Cache counts)."""
+    barrier = threading.Barrier(CLIENTS)
+    latencies, states = [], Counter()
+    lock = threading.Lock()
+
+    def one():
+        client = app.test_client()
+        barrier.wait()
+        start = time.perf_counter()
+        response = client.get(url)
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            states[response.headers.get("X-Cache", str(response.status_code))] += 1
+
+    threads = [threading.Thread(target=one) for _ in range(CLIENTS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(latencies), states
+
+
+def measure(name, counter, run):
+    before = counter.count
+    # Route handlers print debug lines; keep them out of the table
+    with contextlib.redirect_stdout(io.StringIO()):
+        latencies, states = run()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"{name:<26}{counter.count - before:>9}{p50:>10.1f}{p99:>10.1f}   {dict(states)}")
+
+
+def main():
+    with contextlib.redirect_stdout(io.StringIO()):
+        Base.metadata.create_all(engine)
+        with SessionLocal() as session:
+            election_id = seed(session)
+        # SQLite has no triggers; create the rows PostgreSQL maintains so responses are cacheable
+        with get_session() as session:
+            bump_versions(session, "catalog", "departments", f"election:{election_id}")
+        app = create_app()
+
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    url = f"/api/voting/results/{election_id}"
+
+    print(f"📊 {CLIENTS} concurrent GET {url.split('/')[-2]}/<id>, {VOTERS} ballots x {POSITIONS} positions (SQLite)")
+    print(f"{'variant':<26}{'queries':>9}{'p50 ms':>10}{'p99 ms':>10}   responses")
+
+    cache = app.extensions.pop("response_cache")
+    measure("no cache", counter, lambda: herd(app, url))
+
+    app.extensions["response_cache"] = cache
+    measure("single flight (cold)", counter, lambda: herd(app, url))
+    measure("cached", counter, lambda: herd(app, url))
+    with contextlib.redirect_stdout(io.StringIO()):
+        with get_session() as session:
+            bump_versions(session, votes_scope(election_id))
+    measure("after vote (swr)", counter, lambda: herd(app, url))
+    print(f"cache: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
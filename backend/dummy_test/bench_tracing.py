@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tracing overhead on the voting hot path.
+
+Seeds a SQLite file database, then times BENCH_REQUESTS sequential
+requests to the voting status and (uncached) results endpoints with
+tracing off, at the default 1% sample rate and with every request traced.
+Spans go to a temporary file. Reports the mean latency per request and
+the overhead relative to tracing off.
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+DB_DIR = tempfile.mkdtemp(prefix="trace-")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_DIR}/trace.db"
+os.environ["TRACE_FILE"] = os.path.join(DB_DIR, "spans.jsonl")
+os.environ.setdefault("PHOTO_GC_ENABLED", "false")
+os.environ.setdefault("BENCH_CANDIDATES", "200")
+os.environ.setdefault("BENCH_VOTERS", "500")
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+
+from bench_read_models import seed
+from conditional import bump_versions
+from database import Base, SessionLocal, Student, engine, get_session
+from server import create_app
+
+REQUESTS = int(os.getenv("BENCH_REQUESTS", "500"))
+ROUNDS = 5
+RATES = (0.0, 0.01, 1.0)
+
+
+def timed(client, url):
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        client.get(url)
+    return (time.perf_counter() - start) / REQUESTS
+
+
+def main():
+    with contextlib.redirect_stdout(io.StringIO()):
+        Base.metadata.create_all(engine)
+        with SessionLocal() as session:
+            election_id = seed(session)
+            student_id = session.execute(select(Student.id).limit(1)).scalar_one()
+        with get_session() as session:
+            bump_versions(session, "catalog", "departments", f"election:{election_id}")
+        app = create_app()
+    app.extensions.pop("response_cache")
+    tracer = app.extensions["tracer"]
+    client = app.test_client()
+
+    print(f"📊 {REQUESTS} sequential requests per variant, best of {ROUNDS} (SQLite)")
+    print(f"{'endpoint':<16}{'sample rate':>12}{'mean ms':>10}{'overhead':>10}")
+    for name, url in (("voting status", f"/api/voting/status/{student_id}/{election_id}"),
+                      ("results", f"/api/voting/results/{election_id}")):
+        best = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            timed(client, url)  # warm up
+            # Interleave the variants so drift (caches, CPU frequency) hits all of them alike
+            for _ in range(ROUNDS):
+                for rate in RATES:
+                    tracer.sample_rate = rate
+                    mean = timed(client, url)
+                    best[rate] = min(best.get(rate, mean), mean)
+        for rate in RATES:
+            print(f"{name:<16}{rate:>12.2f}{best[rate] * 1000:>10.3f}{(best[rate] / best[0.0] - 1) * 100:>9.1f}%")
+
+
+if __name__ == "__main__":
+    main()
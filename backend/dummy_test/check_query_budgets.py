@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Assert a query budget for the hot read endpoints and vote submission.
+
+Seeds a SQLite file database with bench_read_models.seed (no PostgreSQL
+needed), then calls each endpoint once with the response cache off and
+checks the number of SQL statements it ran against its budget. A request
+whose count grows with the number of positions, candidates or votes is an
+N+1 and fails here with the repeated statement listed. Exits non-zero if
+any budget is exceeded.
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+DB_DIR = tempfile.mkdtemp(prefix="budget-")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_DIR}/budget.db"
+os.environ.setdefault("PHOTO_GC_ENABLED", "false")
+os.environ.setdefault("BENCH_CANDIDATES", "50")
+os.environ.setdefault("BENCH_VOTERS", "60")
+# Periodic delta syncs of the in-memory indexes are amortized over many requests; keep them out of the counts
+os.environ.setdefault("VOTED_INDEX_SYNC_SECONDS", "3600")
+os.environ.setdefault("TURNOUT_SYNC_SECONDS", "3600")
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+
+from bench_read_models import seed
+from conditional import bump_versions
+from database import Base, Candidate, Position, SessionLocal, Student, User, engine, get_session
+from query_tracker import count_queries
+from server import create_app
+from session_tokens import session_tokens
+
+
+def main():
+    with contextlib.redirect_stdout(io.StringIO()):
+        Base.metadata.create_all(engine)
+        with SessionLocal() as session:
+            election_id = seed(session)
+            position_ids = session.execute(select(Position.id).where(Position.election_id == election_id)).scalars().all()
+            candidates = dict(session.execute(select(Candidate.position_id, Candidate.id)).all())
+            department_id = session.execute(select(Student.department_id).limit(1)).scalar_one()
+            voter = User(email="budget@student.nitw.ac.in", password_hash="x", first_name="B", last_name="V", is_verified=True)
+            student = Student(user=voter, year_of_study="3rd Year", department_id=department_id)
+            token_voter = User(email="token@student.nitw.ac.in", password_hash="x", first_name="T", last_name="V", is_verified=True)
+            token_student = Student(user=token_voter, year_of_study="2nd Year", department_id=department_id)
+            session.add_all([student, token_student])
+            session.commit()
+            student_id, candidate_id = student.id, next(iter(candidates.values()))
+            token, _ = session_tokens.issue(token_voter, token_student)
+        # SQLite has no triggers; create the rows PostgreSQL maintains
+        with get_session() as session:
+            bump_versions(session, "catalog", "departments", f"election:{election_id}")
+        app = create_app()
+    app.extensions.pop("response_cache")
+    client = app.test_client()
+
+    # (description, budget, call) -- budgets are per request and must not depend on data size
+    checks = [
+        ("GET results", 5, lambda: client.get(f"/api/voting/results/{election_id}")),
+        ("GET position results", 5, lambda: client.get(f"/api/voting/results/{election_id}/position/{position_ids[0]}")),
+        ("GET turnout", 2, lambda: client.get(f"/api/voting/results/{election_id}/turnout")),
+        ("GET timeline", 0, lambda: client.get(f"/api/voting/results/{election_id}/timeline?resolution=1s")),
+        ("GET voting candidates", 3, lambda: client.get(f"/api/candidates/voting/elections/{election_id}/candidates")),
+        ("GET election candidates", 3, lambda: client.get(f"/api/candidates/election/{election_id}")),
+        ("GET admin statistics", 1, lambda: client.get("/api/candidates/admin/statistics")),
+        ("GET voting status", 1, lambda: client.get(f"/api/voting/status/{student_id}")),
+        ("POST submit (all positions)", 7, lambda: client.post("/api/voting/submit", json={
+            "election_id": election_id,
+            "student_id": student_id,
+            "votes": {position_id: candidates.get(position_id) for position_id in position_ids},
+        })),
+        # The session token replaces the student and user lookups
+        ("POST submit (session token)", 5, lambda: client.post("/api/voting/submit", json={
+            "election_id": election_id,
+            "votes": {position_id: candidates.get(position_id) for position_id in position_ids},
+        }, headers={"Authorization": f"Bearer {token}"})),
+    ]
+
+    failures = 0
+    print(f"{'request':<30}{'queries':>8}{'budget':>8}  status")
+    for name, budget, call in checks:
+        with contextlib.redirect_stdout(io.StringIO()), count_queries() as queries:
+            response = call()
+        try:
+            queries.assert_budget(budget)
+            verdict = "ok"
+        except AssertionError as e:
+            verdict = f"OVER BUDGET: {e}"
+            failures += 1
+        print(f"{name:<30}{queries.total:>8}{budget:>8}  {response.status_code} {verdict}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
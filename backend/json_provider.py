@@ -0,0 +1,95 @@
+"""
+Fast JSON provider for Flask responses.
+
+Uses orjson when it is installed (``JSON_BACKEND=auto`` or ``orjson``) and
+the standard library otherwise (``JSON_BACKEND=stdlib``). Both backends
+produce the same bytes: compact separators, sorted keys, UTF-8 text, and
+``datetime``/``date`` as ISO 8601 and ``uuid.UUID`` as the canonical
+string, so routes can return these objects without stringifying them.
+"""
+
+import dataclasses
+import decimal
+import json
+import os
+import uuid
+from datetime import date, datetime
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib backend is always available
+    orjson = None
+
+
+def _default(o):
+    """Serialize types the json module does not handle natively."""
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """DefaultJSONProvider with an orjson fast path and ISO 8601 datetimes."""
+
+    default = staticmethod(_default)
+    # orjson always emits UTF-8, so the stdlib path does too for identical bytes
+    ensure_ascii = False
+
+    def __init__(self, app, backend: str | None = None):
+        super().__init__(app)
+        backend = (backend or os.getenv("JSON_BACKEND", "auto")).lower()
+        if backend == "orjson" and orjson is None:
+            print("⚠️  JSON_BACKEND=orjson but orjson is not installed, using stdlib json")
+        self.use_orjson = orjson is not None and backend in ("auto", "orjson")
+        self.backend = "orjson" if self.use_orjson else "stdlib"
+
+    def _orjson_options(self, indent: bool) -> int:
+        # Dataclasses go through _default so their keys are sorted like dicts
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs) -> str:
+        # Callers passing json.dumps-specific arguments get the stdlib behaviour
+        if self.use_orjson and set(kwargs) <= {"indent", "separators"}:
+            try:
+                return orjson.dumps(
+                    obj, default=self.default, option=self._orjson_options(bool(kwargs.get("indent")))
+                ).decode()
+            except orjson.JSONEncodeError:
+                pass  # e.g. integers wider than 64 bits; json handles them
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.use_orjson and not kwargs:
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                pass  # let json produce its usual error (or accept NaN/Infinity)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if not self.use_orjson:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        try:
+            body = orjson.dumps(obj, default=self.default, option=self._orjson_options(indent))
+        except orjson.JSONEncodeError:
+            return super().response(*args, **kwargs)
+        # Build the body as bytes directly instead of round-tripping through str
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
@@ -0,0 +1,89 @@
+"""
+Point lookups on the hot paths, as cached lambda statements.
+
+Ballot submission, login and candidate applications look up the same few
+rows on every request: a student, a user, an election and whether a
+ballot exists. ``session.query(...)`` rebuilds such a statement on every
+call and walks all of it to compute its cache key. ``lambda_stmt`` builds
+and analyses the statement once per call site. After that, a call only
+reads the bound values from the lambda's closure, and the engine's
+compiled cache supplies the SQL. psycopg then prepares that SQL on the
+server once a connection has run it ``DB_PREPARE_THRESHOLD`` times (see
+database.py).
+
+Keep the lambdas free of logic. Values that change between calls must be
+closure variables, so they become bound parameters. Anything else is
+fixed on the first call.
+"""
+
+from sqlalchemy import exists, lambda_stmt, select
+from sqlalchemy.orm import joinedload
+
+from database import Ballot, Candidate, Election, Student, User
+
+
+def student_by_id(session, student_id: str) -> Student | None:
+    return session.execute(
+        lambda_stmt(lambda: select(Student).where(Student.id == student_id))
+    ).scalars().first()
+
+
+def student_by_user_id(session, user_id: str) -> Student | None:
+    return session.execute(
+        lambda_stmt(lambda: select(Student).where(Student.user_id == user_id).limit(1))
+    ).scalars().first()
+
+
+def user_by_id(session, user_id: str) -> User | None:
+    return session.execute(
+        lambda_stmt(lambda: select(User).where(User.id == user_id))
+    ).scalars().first()
+
+
+def user_by_id_with_student(session, user_id: str) -> User | None:
+    """User with its student profile loaded, or None."""
+    return session.execute(
+        lambda_stmt(lambda: select(User).options(joinedload(User.student)).where(User.id == user_id))
+    ).scalars().first()
+
+
+def user_by_email_or_phone(session, identifier: str) -> User | None:
+    """User whose email, or failing that phone, is identifier, with its student profile loaded."""
+    user = session.execute(
+        lambda_stmt(lambda: select(User).options(joinedload(User.student)).where(User.email == identifier))
+    ).scalars().first()
+    if user is None:
+        user = session.execute(
+            lambda_stmt(lambda: select(User).options(joinedload(User.student)).where(User.phone == identifier))
+        ).scalars().first()
+    return user
+
+
+def election_by_id(session, election_id: str) -> Election | None:
+    return session.execute(
+        lambda_stmt(lambda: select(Election).where(Election.id == election_id))
+    ).scalars().first()
+
+
+def election_with_positions(session, election_id: str) -> Election | None:
+    """Election with its positions loaded, or None."""
+    return session.execute(
+        lambda_stmt(lambda: select(Election).options(joinedload(Election.positions)).where(Election.id == election_id))
+    ).unique().scalars().first()
+
+
+def ballot_exists(session, election_id: str, student_id: str) -> bool:
+    return session.execute(
+        lambda_stmt(lambda: select(exists().where(Ballot.election_id == election_id, Ballot.student_id == student_id)))
+    ).scalar()
+
+
+def approved_candidate_positions(session, election_id: str, candidate_ids: list[str]) -> dict[str, str]:
+    """Position id of each approved candidate of the election among candidate_ids."""
+    return dict(session.execute(
+        lambda_stmt(lambda: select(Candidate.id, Candidate.position_id).where(
+            Candidate.id.in_(candidate_ids),
+            Candidate.election_id == election_id,
+            Candidate.is_approved == True,
+        ))
+    ).all())
@@ -0,0 +1,178 @@
+"""
+Prometheus metrics, served at ``GET /metrics``.
+
+Request latency and status counts are labelled by blueprint and route rule
+(never by raw path, so IDs don't explode the label set). The SQLAlchemy pool
+is instrumented for checkouts, connections in use, overflow and time spent
+waiting for a connection; SQL statements per request come from
+query_tracker.py.
+
+Collection uses prometheus_client. Under a preforking server, set
+``PROMETHEUS_MULTIPROC_DIR`` to an empty directory shared by the workers
+(before they start): each worker then writes its samples to memory-mapped
+files there and ``/metrics`` aggregates all of them, whichever worker
+answers. Call ``mark_process_dead(pid)`` when a worker exits (e.g. from
+gunicorn's ``child_exit`` hook) so its live gauges stop counting.
+"""
+
+import os
+import time
+from functools import wraps
+
+from flask import Flask, Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by blueprint and route",
+    ["blueprint", "route", "method"],
+)
+REQUESTS = Counter(
+    "http_requests_total", "Responses by blueprint, route and status code",
+    ["blueprint", "route", "method", "status"],
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements executed per request",
+    ["blueprint", "route"], buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+
+POOL_CHECKOUTS = Counter("db_pool_checkouts_total", "Connections checked out of the pool")
+POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "Checkouts that gave up waiting for a connection")
+POOL_WAIT = Histogram(
+    "db_pool_wait_seconds", "Time spent waiting to check a connection out of the pool",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+POOL_IN_USE = Gauge("db_pool_checked_out", "Connections currently checked out", multiprocess_mode="livesum")
+POOL_OVERFLOW = Gauge("db_pool_overflow", "Connections open beyond pool_size", multiprocess_mode="livesum")
+POOL_TARGET_SIZE = Gauge(
+    "db_pool_target_size", "Idle connections the adaptive pool controller retains", multiprocess_mode="livesum",
+)
+POOL_RESIZES = Counter("db_pool_resizes_total", "Adaptive pool resize decisions", ["direction"])
+
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight", "Admitted requests running, by request class", ["request_class"],
+    multiprocess_mode="livesum",
+)
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total", "Requests shed with 503, by request class and reason (queue_full or timeout)",
+    ["request_class", "reason"],
+)
+
+BALLOTS = Counter("ballots_submitted_total", "Committed ballots (use rate() for the submission rate)")
+
+OTP_IN_FLIGHT = Gauge(
+    "otp_deliveries_in_flight", "OTP messages currently being delivered", ["channel"], multiprocess_mode="livesum",
+)
+OTP_DELIVERIES = Counter("otp_deliveries_total", "OTP delivery attempts by outcome", ["channel", "result"])
+OTP_LATENCY = Histogram("otp_delivery_seconds", "Time to hand an OTP message to its transport", ["channel"])
+
+
+def init_metrics(app: Flask, engine) -> None:
+    """Record request metrics for app, instrument engine's pool and expose GET /metrics."""
+
+    @app.before_request
+    def start_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop("metrics_started", None)
+        if started is None:
+            return response
+        blueprint = request.blueprint or ""
+        route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        REQUEST_LATENCY.labels(blueprint, route, request.method).observe(time.perf_counter() - started)
+        REQUESTS.labels(blueprint, route, request.method, str(response.status_code)).inc()
+        tracker = g.get("query_tracker")
+        if tracker is not None:
+            REQUEST_QUERIES.labels(blueprint, route).observe(tracker.total)
+        return response
+
+    instrument_engine(engine)
+
+    @app.get("/metrics")
+    def metrics():
+        if MULTIPROCESS:
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+
+def instrument_engine(engine) -> None:
+    pool = engine.pool
+    if getattr(pool.connect, "timed", False):
+        return  # already instrumented by an earlier app
+
+    # Only QueuePool has overflow connections
+    overflow = getattr(pool, "overflow", lambda: 0)
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(*args):
+        POOL_CHECKOUTS.inc()
+        POOL_IN_USE.inc()
+        POOL_OVERFLOW.set(max(overflow(), 0))
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(*args):
+        POOL_IN_USE.dec()
+        POOL_OVERFLOW.set(max(overflow(), 0))
+
+    # The pool has no "checkout requested" event, so time the acquisition itself
+    connect = pool.connect
+
+    @wraps(connect)  # also carries over markers of other wrappers (e.g. the pool controller)
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return connect()
+        except PoolTimeoutError:
+            POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - started)
+
+    timed_connect.timed = True
+    pool.connect = timed_connect
+
+
+def record_ballot() -> None:
+    BALLOTS.inc()
+
+
+def track_delivery(channel: str):
+    """Count and time an OTP sender returning True on success."""
+    def decorator(send):
+        @wraps(send)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            OTP_IN_FLIGHT.labels(channel).inc()
+            result = False
+            try:
+                result = send(*args, **kwargs)
+                return result
+            finally:
+                OTP_IN_FLIGHT.labels(channel).dec()
+                OTP_LATENCY.labels(channel).observe(time.perf_counter() - started)
+                OTP_DELIVERIES.labels(channel, "sent" if result else "failed").inc()
+        return wrapper
+    return decorator
+
+
+def mark_process_dead(pid: int) -> None:
+    """Drop a dead worker's live gauges (multiprocess mode only)."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,92 @@
+"""add election-scoped data version triggers
+
+Revision ID: b71e4c09d3a5
+Revises: 8d3f1b6c2a47
+Create Date: 2026-10-19 12:20:05.913377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b71e4c09d3a5'
+down_revision = '8d3f1b6c2a47'
+branch_labels = None
+depends_on = None
+
+CATALOG_TABLES = ('elections', 'positions', 'departments', 'colleges')
+DEPARTMENT_TABLES = ('departments', 'colleges')
+ELECTION_TABLES = {'elections': 'id', 'positions': 'election_id'}
+
+
+def upgrade() -> None:
+    op.execute("""
+    CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO data_versions (scope, version, updated_at) VALUES (TG_ARGV[0], 1, now() at time zone 'utc')
+        ON CONFLICT (scope) DO UPDATE SET version = data_versions.version + 1, updated_at = EXCLUDED.updated_at;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+    CREATE OR REPLACE FUNCTION bump_election_version() RETURNS trigger AS $$
+    DECLARE
+        changed jsonb := to_jsonb(CASE WHEN TG_OP = 'DELETE' THEN OLD ELSE NEW END);
+    BEGIN
+        INSERT INTO data_versions (scope, version, updated_at)
+        VALUES ('election:' || (changed ->> TG_ARGV[0]), 1, now() at time zone 'utc')
+        ON CONFLICT (scope) DO UPDATE SET version = data_versions.version + 1, updated_at = EXCLUDED.updated_at;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """)
+    op.execute(
+        "INSERT INTO data_versions (scope, version, updated_at) "
+        "SELECT scope, 1, now() at time zone 'utc' FROM (VALUES ('catalog'), ('departments')) AS s (scope) "
+        "UNION ALL SELECT 'election:' || id, 1, now() at time zone 'utc' FROM elections "
+        "ON CONFLICT (scope) DO NOTHING"
+    )
+    for table in CATALOG_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_catalog_version ON {table}")
+        op.execute(
+            f"CREATE TRIGGER trg_{table}_catalog_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('catalog')"
+        )
+    for table in DEPARTMENT_TABLES:
+        op.execute(
+            f"CREATE TRIGGER trg_{table}_departments_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('departments')"
+        )
+    for table, column in ELECTION_TABLES.items():
+        op.execute(
+            f"CREATE TRIGGER trg_{table}_election_version AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION bump_election_version('{column}')"
+        )
+    op.execute("DROP FUNCTION IF EXISTS bump_catalog_version()")
+
+
+def downgrade() -> None:
+    op.execute("""
+    CREATE OR REPLACE FUNCTION bump_catalog_version() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO data_versions (scope, version, updated_at) VALUES ('catalog', 1, now() at time zone 'utc')
+        ON CONFLICT (scope) DO UPDATE SET version = data_versions.version + 1, updated_at = EXCLUDED.updated_at;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """)
+    for table, column in ELECTION_TABLES.items():
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_election_version ON {table}")
+    for table in DEPARTMENT_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_departments_version ON {table}")
+    for table in CATALOG_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_catalog_version ON {table}")
+        op.execute(
+            f"CREATE TRIGGER trg_{table}_catalog_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_version()"
+        )
+    op.execute("DROP FUNCTION IF EXISTS bump_election_version()")
+    op.execute("DROP FUNCTION IF EXISTS bump_data_version()")
+    op.execute("DELETE FROM data_versions WHERE scope = 'departments' OR starts_with(scope, 'election:')")
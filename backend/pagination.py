@@ -0,0 +1,81 @@
+"""
+Keyset (cursor) pagination helpers for listing endpoints.
+
+A page is requested with ``?limit=N`` and continued with ``?cursor=...``
+taken from the previous page's ``next_cursor``. The cursor encodes the
+ordering key of the last row returned, so the next page is a range scan
+on an index instead of an OFFSET that re-reads every earlier row.
+"""
+
+import base64
+import json
+import uuid
+
+from flask import request
+from sqlalchemy import literal, tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def get_page_args(key_length: int = 2):
+    """Return (limit, cursor) from the query string, or None if the client did not ask for paging.
+
+    Ordering keys are UUID columns, so the cursor must decode to key_length
+    UUID strings. Raises ValueError for a malformed limit or cursor.
+    """
+    if "limit" not in request.args and "cursor" not in request.args:
+        return None
+
+    limit = int(request.args.get("limit", DEFAULT_PAGE_SIZE))
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    limit = min(limit, MAX_PAGE_SIZE)
+
+    cursor = request.args.get("cursor")
+    if not cursor:
+        return limit, None
+
+    values = decode_cursor(cursor)
+    if len(values) != key_length:
+        raise ValueError("invalid cursor")
+    for value in values:
+        uuid.UUID(str(value))
+    return limit, values
+
+
+def encode_cursor(values: list) -> str:
+    """Encode ordering key values as an opaque URL-safe cursor."""
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("invalid cursor") from e
+    if not isinstance(values, list):
+        raise ValueError("invalid cursor")
+    return values
+
+
+def paginate(session, stmt, order_columns: list, limit: int, cursor: list | None):
+    """Fetch one page of the select statement ordered by order_columns.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    if cursor is not None:
+        # Bind with the column types so values get the same processing as stored keys
+        cursor_values = [literal(value, column.type) for column, value in zip(order_columns, cursor)]
+        stmt = stmt.where(tuple_(*order_columns) > tuple_(*cursor_values))
+
+    rows = session.execute(stmt.order_by(*order_columns).limit(limit + 1)).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, column.key) for column in order_columns])
@@ -0,0 +1,214 @@
+"""
+Content-addressed storage for candidate photos.
+
+Photos are stored once per unique content under
+``<root>/<aa>/<bb>/<sha256>.<ext>`` so re-uploads of the same image share a
+file and no single directory grows without bound. A file is referenced when
+some ``Candidate.photo_url`` points at it; unreferenced files are removed by a
+background collector in small batches.
+"""
+
+import hashlib
+import os
+import threading
+import time
+import uuid
+
+from flask import current_app
+from sqlalchemy import select
+
+from database import get_session, Candidate
+
+PHOTO_URL_PREFIX = "/uploads/candidates/"
+CHUNK_SIZE = 64 * 1024
+
+
+class PhotoStore:
+    """Deduplicating photo store with reference-counted garbage collection."""
+
+    def __init__(self, root: str, grace_seconds: int = 600, batch_size: int = 500, interval_seconds: int = 3600):
+        self.root = root
+        self.grace_seconds = grace_seconds
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+        self._released: set[str] = set()
+        self._lock = threading.Lock()
+        # Held while save() reuses or creates a file and while the collector removes one
+        self._files_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def save(self, stream, extension: str) -> str:
+        """Store the stream's content and return its URL path."""
+        tmp_path = os.path.join(self.root, f".{uuid.uuid4().hex}.tmp")
+        digest = hashlib.sha256()
+        try:
+            with open(tmp_path, "wb") as tmp_file:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    tmp_file.write(chunk)
+
+            name = digest.hexdigest()
+            relative_path = f"{name[:2]}/{name[2:4]}/{name}.{extension}"
+            file_path = os.path.join(self.root, relative_path)
+
+            with self._files_lock:
+                if os.path.exists(file_path):
+                    # Same content is already stored; refresh its mtime so the
+                    # collector's grace period covers the new reference too.
+                    os.utime(file_path)
+                else:
+                    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                    try:
+                        os.replace(tmp_path, file_path)
+                    except FileNotFoundError:
+                        # Another worker's collector pruned the shard directory in between
+                        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                        os.replace(tmp_path, file_path)
+        finally:
+            # Left over when the content was already stored or the upload failed
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        return PHOTO_URL_PREFIX + relative_path
+
+    def release(self, url: str | None) -> None:
+        """Mark a photo URL as possibly unreferenced so the collector checks it soon."""
+        if not url or not url.startswith(PHOTO_URL_PREFIX):
+            return
+        with self._lock:
+            self._released.add(url)
+        self._wakeup.set()
+
+    # ------------------------------------------------------------------
+    # Garbage collection
+    # ------------------------------------------------------------------
+
+    def collect_released(self) -> int:
+        """Delete released photos that are no longer referenced."""
+        with self._lock:
+            urls = list(self._released)
+            self._released.clear()
+        paths = [path for path in map(self._path_for, urls) if path]
+        if not paths:
+            return 0
+        return self._delete_unreferenced(paths)
+
+    def sweep(self) -> int:
+        """Walk the store and delete every unreferenced file, batch by batch."""
+        removed = 0
+        batch = []
+        for path in self._iter_files():
+            batch.append(path)
+            if len(batch) >= self.batch_size:
+                removed += self._delete_unreferenced(batch)
+                batch = []
+        if batch:
+            removed += self._delete_unreferenced(batch)
+        return removed
+
+    def start_collector(self) -> None:
+        """Start the background collector thread (idempotent)."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run_collector, name="photo-gc", daemon=True)
+        self._thread.start()
+
+    def _run_collector(self) -> None:
+        next_sweep = time.monotonic() + self.interval_seconds
+        while True:
+            self._wakeup.wait(timeout=max(0.0, next_sweep - time.monotonic()))
+            self._wakeup.clear()
+            try:
+                removed = self.collect_released()
+                if time.monotonic() >= next_sweep:
+                    removed += self.sweep()
+                    next_sweep = time.monotonic() + self.interval_seconds
+                if removed:
+                    print(f"🧹 Photo GC removed {removed} unreferenced file(s)")
+            except Exception as e:
+                print(f"❌ Photo GC failed: {e}")
+
+    def _delete_unreferenced(self, paths: list[str]) -> int:
+        cutoff = time.time() - self.grace_seconds
+        candidates = {}
+        for path in paths:
+            try:
+                if os.stat(path).st_mtime <= cutoff:
+                    candidates[self._url_for(path)] = path
+            except FileNotFoundError:
+                continue
+        if not candidates:
+            return 0
+
+        with get_session() as session:
+            referenced = set(session.execute(
+                select(Candidate.photo_url).where(Candidate.photo_url.in_(list(candidates)))
+            ).scalars())
+
+        removed = 0
+        for url, path in candidates.items():
+            if url in referenced:
+                continue
+            # A save() of the same content since the stat above refreshed the mtime and may
+            # already be referenced by a row the query could not see; check again under its lock
+            with self._files_lock:
+                try:
+                    if os.stat(path).st_mtime > cutoff:
+                        continue
+                    os.remove(path)
+                    removed += 1
+                except FileNotFoundError:
+                    continue
+                # Still under the lock, so save() never finds its shard directory gone
+                self._prune_empty_dirs(os.path.dirname(path))
+        return removed
+
+    def _iter_files(self):
+        for dir_path, _, file_names in os.walk(self.root):
+            for file_name in file_names:
+                yield os.path.join(dir_path, file_name)
+
+    def _prune_empty_dirs(self, dir_path: str) -> None:
+        root = os.path.abspath(self.root)
+        dir_path = os.path.abspath(dir_path)
+        while dir_path != root and dir_path.startswith(root):
+            try:
+                os.rmdir(dir_path)
+            except OSError:
+                return
+            dir_path = os.path.dirname(dir_path)
+
+    def _path_for(self, url: str) -> str | None:
+        # photo_url can be client supplied, so never resolve outside the store
+        root = os.path.abspath(self.root)
+        path = os.path.abspath(os.path.join(root, *url[len(PHOTO_URL_PREFIX):].split("/")))
+        if not path.startswith(root + os.sep):
+            return None
+        return path
+
+    def _url_for(self, path: str) -> str:
+        relative_path = os.path.relpath(path, self.root).replace(os.sep, "/")
+        return PHOTO_URL_PREFIX + relative_path
+
+
+def create_photo_store(root: str) -> PhotoStore:
+    """Build a PhotoStore configured from environment variables."""
+    return PhotoStore(
+        root,
+        grace_seconds=int(os.getenv("PHOTO_GC_GRACE_SECONDS", "600")),
+        batch_size=int(os.getenv("PHOTO_GC_BATCH_SIZE", "500")),
+        interval_seconds=int(os.getenv("PHOTO_GC_INTERVAL_SECONDS", "3600")),
+    )
+
+
+def get_photo_store() -> PhotoStore:
+    """Return the photo store registered on the current app."""
+    return current_app.extensions["photo_store"]
@@ -0,0 +1,194 @@
+"""
+Adaptive connection pool sizing.
+
+With ``DB_POOL_ADAPTIVE=true`` the engine may open up to ``DB_POOL_MAX``
+connections, and a controller thread decides how many of them stay open
+when idle, between ``DB_POOL_MIN`` and ``DB_POOL_MAX``. Every
+``DB_POOL_ADJUST_SECONDS`` it looks at the checkouts since the last look:
+
+* grow by ``DB_POOL_STEP`` when more than 5% of checkouts waited longer
+  than ``DB_POOL_GROW_WAIT_MS`` (cold connects or queueing), any checkout
+  timed out, or peak usage reached the retained size;
+* shrink by one step after ``DB_POOL_SHRINK_AFTER`` consecutive quiet
+  intervals in which peak usage stayed under half the retained size.
+
+So a quiet week keeps a handful of warm connections, and poll opening
+stops paying for connects after the first few seconds. Decisions are
+printed and exported as ``db_pool_target_size`` and
+``db_pool_resizes_total``.
+
+QueuePool has no public resize, so the controller adjusts its idle queue's
+bound and overflow count directly. requirements.txt pins SQLAlchemy to the
+release this was written against. At startup the controller checks that
+those internals are still there; if they are not, the pool keeps its
+fixed size and a warning is printed.
+"""
+
+import os
+import threading
+import time
+from functools import wraps
+
+import sqlalchemy
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.util import queue as sqla_queue
+
+from metrics import POOL_RESIZES, POOL_TARGET_SIZE
+
+_controllers: dict = {}  # pool -> PoolController, so several apps share one controller
+
+# The SQLAlchemy release whose QueuePool internals _resize relies on (pinned in requirements.txt)
+TESTED_SQLALCHEMY = "2.0.35"
+
+
+class PoolController:
+    """Resizes a QueuePool's retained connections from checkout wait times and peak usage."""
+
+    def __init__(self, pool: QueuePool, min_size: int, max_size: int, interval: float,
+                 grow_wait_ms: float, step: int, shrink_after: int):
+        self.pool = pool
+        self.min_size = min_size
+        self.max_size = max_size
+        self.interval = interval
+        self.grow_wait = grow_wait_ms / 1000
+        self.step = step
+        self.shrink_after = shrink_after
+        self.size = pool.size()
+        self.decisions: list[dict] = []
+        self._quiet = 0
+        self._checkouts = 0
+        self._slow = 0
+        self._timeouts = 0
+        self._peak = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        POOL_TARGET_SIZE.set(self.size)
+
+    def install(self) -> None:
+        connect = self.pool.connect
+
+        @wraps(connect)
+        def observed_connect():
+            started = time.perf_counter()
+            try:
+                return connect()
+            except PoolTimeoutError:
+                with self._lock:
+                    self._timeouts += 1
+                raise
+            finally:
+                waited = time.perf_counter() - started
+                with self._lock:
+                    self._checkouts += 1
+                    self._slow += waited > self.grow_wait
+
+        self.pool.connect = observed_connect
+
+        @event.listens_for(self.pool, "checkout")
+        def track_peak(*args):
+            in_use = self.pool.checkedout()
+            if in_use > self._peak:
+                self._peak = in_use
+
+        self._thread = threading.Thread(target=self._run, name="pool-controller", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.adjust()
+            except Exception as e:
+                print(f"⚠️  Pool controller failed: {e}")
+
+    def adjust(self) -> int:
+        """Apply one decision from the interval's telemetry; return the new retained size."""
+        with self._lock:
+            checkouts, slow, timeouts, peak = self._checkouts, self._slow, self._timeouts, self._peak
+            self._checkouts = self._slow = self._timeouts = 0
+            self._peak = self.pool.checkedout()
+
+        size = self.size
+        if timeouts or peak >= size or (checkouts and slow / checkouts > 0.05):
+            self._quiet = 0
+            size = min(size + self.step, self.max_size)
+        elif peak < size / 2:
+            self._quiet += 1
+            if self._quiet >= self.shrink_after:
+                self._quiet = 0
+                size = max(size - self.step, self.min_size)
+        else:
+            self._quiet = 0
+
+        if size != self.size:
+            direction = "grow" if size > self.size else "shrink"
+            print(f"{'📈' if direction == 'grow' else '📉'} DB pool {direction}: {self.size} -> {size} "
+                  f"(peak {peak}, {slow}/{checkouts} slow checkouts, {timeouts} timeouts)")
+            self._resize(size)
+            POOL_RESIZES.labels(direction).inc()
+            POOL_TARGET_SIZE.set(size)
+            self.decisions = (self.decisions + [{
+                "at": time.time(), "from": self.size, "to": size, "peak": peak,
+                "checkouts": checkouts, "slow": slow, "timeouts": timeouts,
+            }])[-20:]
+            self.size = size
+        return size
+
+    def _resize(self, size: int) -> None:
+        # QueuePool has no public resize. Its total ceiling (pool_size + max_overflow at creation) stays
+        # at max_size; only the idle queue's bound changes, and returns beyond it close the connection.
+        self.pool._pool.maxsize = size
+        # The queue only reports "full" at exactly maxsize, so close idle connections above it now
+        while self.pool.checkedin() > size:
+            try:
+                record = self.pool._pool.get(False)
+            except sqla_queue.Empty:
+                break
+            try:
+                record.close()
+            finally:
+                self.pool._dec_overflow()
+
+    def stats(self) -> dict:
+        return {
+            "retained_size": self.size,
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "checked_out": self.pool.checkedout(),
+            "idle": self.pool.checkedin(),
+            "recent_decisions": self.decisions,
+        }
+
+
+def _resizable(pool: QueuePool) -> bool:
+    """Whether the QueuePool internals _resize uses exist in the installed SQLAlchemy."""
+    idle = getattr(pool, "_pool", None)
+    return (
+        isinstance(idle, sqla_queue.Queue) and isinstance(getattr(idle, "maxsize", None), int)
+        and callable(getattr(idle, "get", None)) and callable(getattr(pool, "_dec_overflow", None))
+    )
+
+
+def init_pool_controller(engine, min_size: int, max_size: int) -> PoolController | None:
+    """Start adapting engine's pool; None if its pool cannot be resized."""
+    if not isinstance(engine.pool, QueuePool):
+        return None
+    if sqlalchemy.__version__ != TESTED_SQLALCHEMY:
+        print(f"⚠️  Adaptive pool sizing was written against SQLAlchemy {TESTED_SQLALCHEMY}, "
+              f"running {sqlalchemy.__version__}")
+    if not _resizable(engine.pool):
+        print("⚠️  QueuePool internals changed; DB_POOL_ADAPTIVE is ignored and the pool keeps its size")
+        return None
+    if engine.pool in _controllers:
+        return _controllers[engine.pool]
+    controller = _controllers[engine.pool] = PoolController(
+        engine.pool, min_size, max_size,
+        interval=float(os.getenv("DB_POOL_ADJUST_SECONDS", "10")),
+        grow_wait_ms=float(os.getenv("DB_POOL_GROW_WAIT_MS", "20")),
+        step=int(os.getenv("DB_POOL_STEP", "2")),
+        shrink_after=int(os.getenv("DB_POOL_SHRINK_AFTER", "6")),
+    )
+    controller.install()
+    return controller
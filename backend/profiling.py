@@ -0,0 +1,184 @@
+"""
+On-demand request profiling with collapsed-stack (flamegraph) output.
+
+A request is profiled when it carries a valid ``X-Profile-Token`` header
+(an expiry signed with ``PROFILE_SECRET``, see ``make_token``) or, without
+one, with probability ``PROFILE_SAMPLE_RATE``. While it runs, a sampler
+thread records the request thread's stack every ``PROFILE_INTERVAL_MS``.
+The samples are written to ``PROFILE_DIR`` in the collapsed-stack format
+read by flamegraph.pl, speedscope and inferno, named after the time, route
+and duration. Only the newest ``PROFILE_MAX_FILES`` files are kept. The
+response names its file in ``X-Profile-File`` only when the request
+carried a valid token.
+
+Profiles are listed at ``GET /api/admin/profiles`` and downloaded from
+``GET /api/admin/profiles/<name>``; both need a valid token too.
+
+Generate a token on a machine that has the secret::
+
+    PROFILE_SECRET=... python profiling.py 600
+"""
+
+import hashlib
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from flask import Flask, g, jsonify, request, send_from_directory
+
+TOKEN_HEADER = "X-Profile-Token"
+
+
+def make_token(secret: str, ttl_seconds: int = 300) -> str:
+    expires = str(int(time.time()) + ttl_seconds)
+    signature = hmac.new(secret.encode(), f"profile:{expires}".encode(), hashlib.sha256).hexdigest()
+    return f"{expires}.{signature}"
+
+
+def verify_token(secret: str, token: str | None) -> bool:
+    if not secret or not token or "." not in token:
+        return False
+    expires, signature = token.split(".", 1)
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    expected = hmac.new(secret.encode(), f"profile:{expires}".encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(signature, expected)
+
+
+class StackSampler:
+    """Samples one thread's Python stack at a fixed interval from a helper thread."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+
+class RequestProfiler:
+    """Decides which requests to profile and keeps a bounded directory of their profiles."""
+
+    def __init__(self, directory: str, secret: str, sample_rate: float, interval_ms: float, max_files: int):
+        self.directory = directory
+        self.secret = secret
+        self.sample_rate = sample_rate
+        self.interval = interval_ms / 1000
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def authorized(self) -> bool:
+        return verify_token(self.secret, request.headers.get(TOKEN_HEADER))
+
+    def sampled(self) -> bool:
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def write(self, route: str, elapsed: float, stacks: Counter) -> str:
+        """Write the collapsed stacks and prune the oldest files; return the file name."""
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", route).strip("-") or "root"
+        name = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}_{slug}_{elapsed * 1000:.0f}ms.collapsed"
+        with open(os.path.join(self.directory, name), "w") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        with self._lock:
+            for stale in self.files()[self.max_files:]:
+                try:
+                    os.remove(os.path.join(self.directory, stale))
+                except FileNotFoundError:
+                    pass
+        return name
+
+    def files(self) -> list[str]:
+        """Profile file names, newest first."""
+        return sorted((name for name in os.listdir(self.directory) if name.endswith(".collapsed")), reverse=True)
+
+
+def init_profiling(app: Flask) -> RequestProfiler:
+    profiler = RequestProfiler(
+        directory=os.getenv("PROFILE_DIR", os.path.join(os.path.dirname(__file__), "profiles")),
+        secret=os.getenv("PROFILE_SECRET", ""),
+        sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+        interval_ms=float(os.getenv("PROFILE_INTERVAL_MS", "5")),
+        max_files=int(os.getenv("PROFILE_MAX_FILES", "50")),
+    )
+    app.extensions["profiler"] = profiler
+
+    @app.before_request
+    def start_profile():
+        if request.path.startswith("/api/admin/profiles"):
+            return
+        requested = profiler.authorized()
+        if not requested and not profiler.sampled():
+            return
+        g.profile_requested = requested
+        g.profile_started = time.perf_counter()
+        g.profile_sampler = StackSampler(threading.get_ident(), profiler.interval)
+        g.profile_sampler.start()
+
+    @app.after_request
+    def finish_profile(response):
+        sampler = g.pop("profile_sampler", None)
+        if sampler is None:
+            return response
+        stacks = sampler.stop()
+        elapsed = time.perf_counter() - g.pop("profile_started")
+        rule = request.url_rule.rule if request.url_rule is not None else request.path
+        name = profiler.write(f"{request.method} {rule}", elapsed, stacks)
+        # Only the holder of a profile token learns file names; sampled requests come from anyone
+        if g.pop("profile_requested", False):
+            response.headers["X-Profile-File"] = name
+        return response
+
+    @app.teardown_request
+    def abandon_profile(exc):
+        # after_request is skipped if the error handler itself failed; never leave a sampler running
+        sampler = g.pop("profile_sampler", None)
+        if sampler is not None:
+            sampler.stop()
+
+    @app.get("/api/admin/profiles")
+    def list_profiles():
+        if not profiler.authorized():
+            return jsonify({"error": "Valid X-Profile-Token required"}), 403
+        return jsonify({"profiles": profiler.files()})
+
+    @app.get("/api/admin/profiles/<name>")
+    def download_profile(name):
+        if not profiler.authorized():
+            return jsonify({"error": "Valid X-Profile-Token required"}), 403
+        return send_from_directory(profiler.directory, name, mimetype="text/plain")
+
+    return profiler
+
+
+if __name__ == "__main__":
+    secret = os.getenv("PROFILE_SECRET")
+    if not secret:
+        sys.exit("PROFILE_SECRET is not set")
+    print(make_token(secret, int(sys.argv[1]) if len(sys.argv) > 1 else 300))
@@ -0,0 +1,117 @@
+"""
+Per-request SQL statement counting and N+1 detection.
+
+A ``before_cursor_execute`` hook counts the statements each request runs
+(exported as ``http_request_db_queries`` by metrics.py). With
+``QUERY_DEBUG=true`` it also fingerprints them (statement text with
+whitespace and IN-lists normalised, since parameters are already bound
+separately) and warns when one fingerprint runs ``QUERY_REPEAT_THRESHOLD``
+or more times in a request, which is what an N+1 loop looks like. Debug
+responses carry an ``X-Query-Count`` header.
+
+Scripts and tests can assert a query budget for any block of code::
+
+    with count_queries() as queries:
+        client.get(f"/api/voting/results/{election_id}")
+    queries.assert_budget(6)
+"""
+
+import hashlib
+import os
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import Flask, g, has_request_context, request
+from sqlalchemy import event
+
+_WHITESPACE = re.compile(r"\s+")
+# "IN (?, ?, ?)", "IN (%(id_1_1)s, %(id_1_2)s)" and literal lists all collapse to "IN (...)"
+_IN_LIST = re.compile(r"\bIN\s*\((?:[^()]|\([^()]*\))*\)", re.IGNORECASE)
+
+_explicit: ContextVar[tuple] = ContextVar("query_trackers", default=())
+
+
+def fingerprint(statement: str) -> str:
+    normalized = _IN_LIST.sub("IN (...)", _WHITESPACE.sub(" ", statement).strip())
+    return hashlib.blake2b(normalized.encode(), digest_size=6).hexdigest()
+
+
+class QueryTracker:
+    """Statements executed in one request or block, optionally grouped by fingerprint."""
+
+    def __init__(self, fingerprints: bool = True):
+        self.total = 0
+        self.fingerprints = fingerprints
+        self.counts: Counter = Counter()
+        self.samples: dict[str, str] = {}
+
+    def add(self, statement: str) -> None:
+        self.total += 1
+        if self.fingerprints:
+            key = fingerprint(statement)
+            self.counts[key] += 1
+            self.samples.setdefault(key, statement)
+
+    def repeated(self, threshold: int) -> list[tuple[int, str]]:
+        """(count, statement) for fingerprints run at least threshold times, most frequent first."""
+        return [(count, self.samples[key]) for key, count in self.counts.most_common() if count >= threshold]
+
+    def assert_budget(self, max_queries: int) -> None:
+        if self.total > max_queries:
+            top = "\n".join(
+                f"  {count}x {_WHITESPACE.sub(' ', statement)[:200]}" for count, statement in self.repeated(2)[:5]
+            )
+            raise AssertionError(f"{self.total} queries, budget is {max_queries}" + (f"; repeated:\n{top}" if top else ""))
+
+
+@contextmanager
+def count_queries():
+    """Track every statement executed in this context (thread / request) while the block runs."""
+    tracker = QueryTracker()
+    token = _explicit.set(_explicit.get() + (tracker,))
+    try:
+        yield tracker
+    finally:
+        _explicit.reset(token)
+
+
+def install(engine) -> None:
+    """Feed engine's statements to the active trackers."""
+    if event.contains(engine, "before_cursor_execute", _on_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _on_execute)
+
+
+def _on_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        tracker = g.get("query_tracker")
+        if tracker is not None:
+            tracker.add(statement)
+    for tracker in _explicit.get():
+        tracker.add(statement)
+
+
+def init_query_tracking(app: Flask, engine) -> None:
+    """Track each request's statements; in debug mode warn about repeated ones."""
+    debug = os.getenv("QUERY_DEBUG", "false").lower() == "true"
+    threshold = int(os.getenv("QUERY_REPEAT_THRESHOLD", "3"))
+    install(engine)
+
+    @app.before_request
+    def start_tracking():
+        g.query_tracker = QueryTracker(fingerprints=debug)
+
+    if not debug:
+        return
+
+    @app.after_request
+    def report_queries(response):
+        tracker = g.get("query_tracker")
+        if tracker is None:
+            return response
+        response.headers["X-Query-Count"] = str(tracker.total)
+        for count, statement in tracker.repeated(threshold):
+            print(f"⚠️  N+1 suspected in {request.method} {request.path}: {count}x {_WHITESPACE.sub(' ', statement)[:200]}")
+        return response
@@ -0,0 +1,253 @@
+"""
+Read models for listing and results endpoints.
+
+Each function runs a Core ``select()`` that projects only the columns the
+endpoint serializes and returns plain ``Row`` tuples, so read-only routes
+skip ORM identity-map bookkeeping, never load columns such as
+``Candidate.platform_statement`` unless they are shown, and join each
+many-to-one relationship once instead of through chained ``joinedload``s.
+"""
+
+from sqlalchemy import func, select
+
+from database import Ballot, Candidate, Department, Election, Position, Student, User, VoteSelection
+
+ELECTION_SUMMARY_COLUMNS = (
+    Election.id,
+    Election.title,
+    Election.election_year,
+    Election.status,
+    Election.start_time,
+    Election.end_time,
+)
+
+
+# ----------------------------------------------------------------------------
+# Elections and positions
+# ----------------------------------------------------------------------------
+
+def election_summaries(session, statuses: list[str]):
+    """Elections in any of statuses, without their description."""
+    return session.execute(
+        select(*ELECTION_SUMMARY_COLUMNS).where(Election.status.in_(statuses))
+    ).all()
+
+
+def election_summary(session, election_id: str, with_ballot_count: bool = False):
+    """One election without its description, or None; with_ballot_count adds its ``ballot_count``."""
+    columns = list(ELECTION_SUMMARY_COLUMNS)
+    if with_ballot_count:
+        columns.append(
+            select(func.count()).where(Ballot.election_id == Election.id)
+            .correlate(Election).scalar_subquery().label("ballot_count")
+        )
+    return session.execute(select(*columns).where(Election.id == election_id)).first()
+
+
+def positions_by_election(session, election_ids: list[str]) -> dict[str, list]:
+    """Positions (id, name) of the given elections, grouped by election id."""
+    grouped = {election_id: [] for election_id in election_ids}
+    if not election_ids:
+        return grouped
+    rows = session.execute(
+        select(Position.id, Position.name, Position.election_id).where(Position.election_id.in_(election_ids))
+    )
+    for row in rows:
+        grouped[row.election_id].append(row)
+    return grouped
+
+
+def position_with_election(session, position_id: str):
+    """Position (id, name) with its election's summary columns, or None."""
+    return session.execute(
+        select(
+            Position.id,
+            Position.name,
+            Election.id.label("election_id"),
+            Election.title.label("election_title"),
+            Election.election_year,
+            Election.status.label("election_status"),
+        )
+        .join(Election, Position.election_id == Election.id)
+        .where(Position.id == position_id)
+    ).first()
+
+
+def position_election_id(session, position_id: str) -> str | None:
+    return session.execute(select(Position.election_id).where(Position.id == position_id)).scalar()
+
+
+def positions_for_election(session, election_id: str, position_id: str | None = None):
+    """Positions (id, name) of an election, optionally just one of them."""
+    stmt = select(Position.id, Position.name).where(Position.election_id == election_id)
+    if position_id is not None:
+        stmt = stmt.where(Position.id == position_id)
+    return session.execute(stmt).all()
+
+
+def department_names(session) -> dict[str, str]:
+    """Department names keyed by department id."""
+    return dict(session.execute(select(Department.id, Department.name)).all())
+
+
+def student_exists(session, student_id: str) -> bool:
+    return session.execute(select(Student.id).where(Student.id == student_id)).first() is not None
+
+
+# ----------------------------------------------------------------------------
+# Candidates
+# ----------------------------------------------------------------------------
+
+def candidate_listing_select():
+    """Approved candidates with name, position and election title only."""
+    return (
+        select(
+            Candidate.id,
+            Candidate.election_id,
+            User.first_name,
+            User.last_name,
+            Position.name.label("position_name"),
+            Election.title.label("election_title"),
+        )
+        .join(Student, Candidate.student_id == Student.id)
+        .join(User, Student.user_id == User.id)
+        .join(Position, Candidate.position_id == Position.id)
+        .join(Election, Candidate.election_id == Election.id)
+        .where(Candidate.is_approved == True)
+    )
+
+
+def voting_candidates(session, election_id: str):
+    """Approved candidates of an election with what the ballot page shows."""
+    return session.execute(
+        select(
+            Candidate.id,
+            Candidate.platform_statement,
+            Candidate.photo_url,
+            User.first_name,
+            User.last_name,
+            Position.id.label("position_id"),
+            Position.name.label("position_name"),
+        )
+        .join(Student, Candidate.student_id == Student.id)
+        .join(User, Student.user_id == User.id)
+        .join(Position, Candidate.position_id == Position.id)
+        .where(Candidate.election_id == election_id, Candidate.is_approved == True)
+    ).all()
+
+
+def candidate_profile_select(with_election: bool = False):
+    """Candidates with student, user, department and position details.
+
+    Election summary columns are added (prefixed ``election_``) when
+    with_election is set.
+    """
+    columns = [
+        Candidate.id,
+        Candidate.election_id,
+        Candidate.platform_statement,
+        Candidate.photo_url,
+        Candidate.is_approved,
+        Student.id.label("student_id"),
+        Student.year_of_study,
+        User.first_name,
+        User.last_name,
+        User.email,
+        Department.id.label("department_id"),
+        Department.name.label("department_name"),
+        Position.id.label("position_id"),
+        Position.name.label("position_name"),
+    ]
+    if with_election:
+        columns += [
+            Election.title.label("election_title"),
+            Election.election_year,
+            Election.status.label("election_status"),
+        ]
+
+    stmt = (
+        select(*columns)
+        .join(Student, Candidate.student_id == Student.id)
+        .join(User, Student.user_id == User.id)
+        .outerjoin(Department, Student.department_id == Department.id)
+        .join(Position, Candidate.position_id == Position.id)
+    )
+    if with_election:
+        stmt = stmt.join(Election, Candidate.election_id == Election.id)
+    return stmt
+
+
+def application_select(student_id: str):
+    """A student's applications with position and election summary."""
+    return (
+        select(
+            Candidate.id,
+            Candidate.election_id,
+            Candidate.platform_statement,
+            Candidate.photo_url,
+            Candidate.is_approved,
+            Position.id.label("position_id"),
+            Position.name.label("position_name"),
+            Election.title.label("election_title"),
+            Election.election_year,
+            Election.status.label("election_status"),
+        )
+        .join(Position, Candidate.position_id == Position.id)
+        .join(Election, Candidate.election_id == Election.id)
+        .where(Candidate.student_id == student_id)
+    )
+
+
+# ----------------------------------------------------------------------------
+# Results
+# ----------------------------------------------------------------------------
+
+def result_candidates(session, election_id: str, position_id: str | None = None):
+    """Approved candidates of an election with the columns results pages show."""
+    stmt = (
+        select(
+            Candidate.id,
+            Candidate.position_id,
+            Candidate.platform_statement,
+            Candidate.photo_url,
+            User.first_name,
+            User.last_name,
+            Student.year_of_study,
+            Department.name.label("department_name"),
+        )
+        .join(Student, Candidate.student_id == Student.id)
+        .join(User, Student.user_id == User.id)
+        .outerjoin(Department, Student.department_id == Department.id)
+        .where(Candidate.election_id == election_id, Candidate.is_approved == True)
+    )
+    if position_id is not None:
+        stmt = stmt.where(Candidate.position_id == position_id)
+    return session.execute(stmt).all()
+
+
+def vote_counts(session, election_id: str, position_id: str | None = None) -> dict[str, dict]:
+    """Vote counts as {position_id: {candidate_id or None: count}} from one GROUP BY."""
+    stmt = (
+        select(VoteSelection.position_id, VoteSelection.candidate_id, func.count())
+        .join(Ballot, VoteSelection.ballot_id == Ballot.id)
+        .where(Ballot.election_id == election_id)
+        .group_by(VoteSelection.position_id, VoteSelection.candidate_id)
+    )
+    if position_id is not None:
+        stmt = stmt.where(VoteSelection.position_id == position_id)
+
+    counts: dict[str, dict] = {}
+    for pos_id, candidate_id, count in session.execute(stmt):
+        counts.setdefault(str(pos_id), {})[str(candidate_id) if candidate_id else None] = count
+    return counts
+
+
+def ballot_status(session, election_id: str, student_id: str):
+    """A student's ballot (id, submitted_at, votes_count) in an election, or None."""
+    votes_count = (
+        select(func.count()).where(VoteSelection.ballot_id == Ballot.id).correlate(Ballot).scalar_subquery()
+    )
+    return session.execute(
+        select(Ballot.id, Ballot.submitted_at, votes_count.label("votes_count"))
+        .where(Ballot.election_id == election_id, Ballot.student_id == student_id)
+    ).first()
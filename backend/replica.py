@@ -0,0 +1,98 @@
+"""
+Read-replica routing for read-only endpoints.
+
+Views decorated with ``@replica_read`` run with ``get_session()`` bound to
+the engine for ``DATABASE_REPLICA_URL``, so result and listing reads stop
+competing with ballot writes on the primary. Everything else, including
+writes and read-your-writes paths such as the voting status check, stays
+on the primary.
+
+A lag guard keeps reads on the primary while the replica is more than
+``REPLICA_MAX_LAG_SECONDS`` behind or unreachable. Lag is measured at most
+once per ``REPLICA_LAG_CHECK_SECONDS`` by whichever request comes first;
+the others use the last measurement. Put ``@replica_read`` directly under
+the route decorator so version lookups, caching and ETags read from the
+same database as the view.
+"""
+
+import os
+import threading
+import time
+from functools import wraps
+
+from sqlalchemy import text
+
+from database import replica_engine, replica_reads
+
+LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+""")
+
+
+class ReplicaRouter:
+    """Tracks replica lag and decides whether reads may go to the replica."""
+
+    def __init__(self, engine, max_lag_seconds: float, check_seconds: float):
+        self.engine = engine
+        self.max_lag = max_lag_seconds
+        self.check_seconds = check_seconds
+        self.lag = None  # seconds behind the primary at the last check; None if unknown or unreachable
+        self.checked_at = 0.0
+        self.routed = 0
+        self.fallbacks = 0
+        self._lock = threading.Lock()
+
+    def healthy(self) -> bool:
+        if self.engine is None:
+            return False
+        if time.monotonic() - self.checked_at >= self.check_seconds and self._lock.acquire(blocking=False):
+            try:
+                self.lag = self._measure_lag()
+            finally:
+                self.checked_at = time.monotonic()
+                self._lock.release()
+        return self.lag is not None and self.lag <= self.max_lag
+
+    def _measure_lag(self) -> float | None:
+        try:
+            with self.engine.connect() as conn:
+                lag = conn.execute(LAG_QUERY).scalar()
+            return None if lag is None else float(lag)
+        except Exception as e:
+            print(f"⚠️  Replica lag check failed: {e}")
+            return None
+
+    def stats(self) -> dict:
+        return {
+            "configured": self.engine is not None,
+            "lag_seconds": self.lag,
+            "max_lag_seconds": self.max_lag,
+            "routed": self.routed,
+            "fallbacks": self.fallbacks,
+        }
+
+
+router = ReplicaRouter(
+    replica_engine,
+    max_lag_seconds=float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5")),
+    check_seconds=float(os.getenv("REPLICA_LAG_CHECK_SECONDS", "1")),
+)
+
+
+def replica_read(view):
+    """Serve the view from the replica when one is configured and within the lag limit."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if router.engine is None:
+            return view(*args, **kwargs)
+        if not router.healthy():
+            router.fallbacks += 1
+            return view(*args, **kwargs)
+        router.routed += 1
+        with replica_reads():
+            return view(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,158 @@
+"""
+Server-side cache for election-scoped read endpoints.
+
+Responses are cached by route, view arguments and query string together
+with a generation: the versions of the data scopes the view depends on
+(see conditional.py). Candidate writes, votes and election edits bump only
+their own election's scopes, so they invalidate that election's entries and
+nothing else. A stale entry is replaced in place by the next response for
+the same key, and the whole cache is LRU-evicted under a byte budget.
+
+Misses are computed through a single flight, so a burst of identical
+requests (e.g. everyone opening the results page when they are announced)
+runs the view once per process. While that refresh is in flight, requests
+for a recently stored stale entry get it immediately instead of waiting
+(stale-while-revalidate, bounded by ``RESPONSE_CACHE_STALE_SECONDS``).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Flask, current_app, make_response, request
+
+from conditional import request_versions, versions_tracked
+from single_flight import SingleFlight
+
+
+class ResponseCache:
+    """Byte-bounded LRU of JSON bodies keyed by request, tagged with a generation."""
+
+    def __init__(self, max_bytes: int, stale_seconds: float = 0):
+        self.max_bytes = max_bytes
+        self.stale_seconds = stale_seconds
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        self.flights = SingleFlight()
+        # key -> (generation, body, monotonic time stored)
+        self._entries: OrderedDict[tuple, tuple[tuple, bytes, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, generation: tuple, record: bool = True) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != generation:
+                self.misses += record
+                return None
+            self._entries.move_to_end(key)
+            self.hits += record
+            return entry[1]
+
+    def get_stale(self, key) -> bytes | None:
+        """Body stored for key under any generation, if stored within stale_seconds."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[2] > self.stale_seconds:
+                return None
+            self.stale_hits += 1
+            return entry[1]
+
+    def put(self, key, generation: tuple, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous[1])
+            self._entries[key] = (generation, body, time.monotonic())
+            self.current_bytes += len(body)
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted, _) = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale_hits": self.stale_hits,
+                "evictions": self.evictions,
+                "executions": self.flights.executions,
+                "coalesced": self.flights.shared,
+            }
+
+
+def init_response_cache(app: Flask) -> ResponseCache:
+    app.config.setdefault("RESPONSE_CACHE_MAX_BYTES", int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))))
+    app.config.setdefault("RESPONSE_CACHE_STALE_SECONDS", float(os.getenv("RESPONSE_CACHE_STALE_SECONDS", "5")))
+    cache = ResponseCache(app.config["RESPONSE_CACHE_MAX_BYTES"], app.config["RESPONSE_CACHE_STALE_SECONDS"])
+    app.extensions["response_cache"] = cache
+    return cache
+
+
+def cached_response(*scope_templates: str, resolve=None):
+    """Cache the view's 200 JSON responses until one of its scopes changes.
+
+    Scope templates are formatted with the view arguments, plus whatever
+    resolve(**view_args) returns (e.g. the election of a position). If
+    resolve returns None the view runs uncached.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = current_app.extensions.get("response_cache")
+            params = dict(kwargs)
+            if resolve is not None:
+                resolved = resolve(**kwargs)
+                if resolved is None:
+                    return view(*args, **kwargs)
+                params.update(resolved)
+            versions = request_versions([template.format(**params) for template in scope_templates])
+            if cache is None or not versions_tracked(versions):
+                return view(*args, **kwargs)
+
+            key = (request.endpoint, tuple(sorted(kwargs.items())), request.query_string)
+            generation = tuple(versions.items())
+            body = cache.get(key, generation)
+            if body is not None:
+                return _cached(body, "HIT")
+
+            flight = (key, generation)
+            if cache.flights.in_flight(flight):
+                stale = cache.get_stale(key)
+                if stale is not None:
+                    return _cached(stale, "STALE")
+
+            def compute():
+                # The previous flight may have stored this generation just before we started
+                body = cache.get(key, generation, record=False)
+                if body is not None:
+                    return 200, body, "application/json"
+                response = make_response(view(*args, **kwargs))
+                body = response.get_data()
+                if response.status_code == 200 and response.mimetype == "application/json":
+                    cache.put(key, generation, body)
+                return response.status_code, body, response.mimetype
+
+            # Every caller builds its own Response; after_request hooks modify them in place
+            status, body, mimetype = cache.flights.do(flight, compute)
+            response = current_app.response_class(body, status=status, mimetype=mimetype)
+            response.headers["X-Cache"] = "MISS"
+            return response
+        return wrapper
+    return decorator
+
+
+def _cached(body: bytes, state: str):
+    response = current_app.response_class(body, mimetype="application/json")
+    response.headers["X-Cache"] = state
+    return response
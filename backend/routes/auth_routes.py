@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from datetime import datetime
+from functools import partial
 import uuid
 from sqlalchemy.orm import joinedload
 from sqlalchemy import cast, String
@@ -8,12 +9,21 @@ from werkzeug.security import generate_password_hash, check_password_hash
 
 from database import (
     get_session, 
+    run_after_commit,
+    pipelined,
     User, 
     Student, 
     College, 
     Department,
     COLLEGE_STATUS_ACTIVE
 )
+from conditional import conditional, bump_versions, CATALOG, STUDENTS
+from replica import replica_read
+from degraded import snapshot_read
+from turnout import turnout_analytics
+from tracing import span
+from session_tokens import current_session, session_tokens
+from lookups import user_by_id_with_student
 from utils import (
     validate_email_domain, validate_phone_number, format_phone_number,
     create_otp, verify_otp, send_email_otp, send_sms_otp, get_user_by_email_or_phone
@@ -64,7 +74,8 @@ def register():
     except (ValueError, TypeError, AttributeError):
         return jsonify({"error": "department_id must be a valid UUID format"}), 400
 
-    password_hash = generate_password_hash(password)
+    with span("password.hash"):
+        password_hash = generate_password_hash(password)
 
     # First, do all the validation checks
     with get_session() as session:
@@ -93,28 +104,34 @@ def register():
             is_admin=False,
             is_verified=False,  # User needs to verify via OTP
         )
-        session.add(user)
-        session.flush()  # get user.id
-        print(f"🔍 DEBUG: User created with ID: {user.id}")
-            
-        student = Student(
-            user_id=user.id,
-            year_of_study=year_of_study,
-            department_id=department_id,
-        )
-        session.add(student)
-        print(f"🔍 DEBUG: Student record created for user: {user.id}")
+        # User, student and OTP rows go out in one flight instead of a round trip each
+        with pipelined(session):
+            session.add(user)
+            session.flush()  # get user.id
+            print(f"🔍 DEBUG: User created with ID: {user.id}")
+                
+            student = Student(
+                user_id=user.id,
+                year_of_study=year_of_study,
+                department_id=department_id,
+            )
+            session.add(student)
+            print(f"🔍 DEBUG: Student record created for user: {user.id}")
+
+            # Generate OTPs for email and, if provided, phone verification
+            print(f"🔍 DEBUG: Creating email OTP for user: {user.id}")
+            otp_code = create_otp(user.id, 'email', session)
+            sms_otp_code = None
+            if phone:
+                print(f"🔍 DEBUG: Creating SMS OTP for user: {user.id}")
+                sms_otp_code = create_otp(user.id, 'phone', session)
+            session.flush()
 
-        # Generate and send OTP for email verification
-        print(f"🔍 DEBUG: Creating email OTP for user: {user.id}")
-        otp_code = create_otp(user.id, 'email', session)
         send_email_otp(email, otp_code)
         print(f"🔍 DEBUG: Email OTP created: {otp_code}")
 
         # If phone provided, also send SMS OTP
         if phone:
-            print(f"🔍 DEBUG: Creating SMS OTP for user: {user.id}")
-            sms_otp_code = create_otp(user.id, 'phone', session)
             send_sms_otp(phone, sms_otp_code)
             print(f"🔍 DEBUG: SMS OTP created: {sms_otp_code}")
 
@@ -146,22 +163,22 @@ def login():
         if not user:
             return jsonify({"error": "Invalid credentials"}), 401
 
-        if not check_password_hash(user.password_hash, password):
+        with span("password.verify"):
+            password_ok = check_password_hash(user.password_hash, password)
+        if not password_ok:
             return jsonify({"error": "Invalid credentials"}), 401
 
         if not user.is_verified:
             return jsonify({"error": "Account not verified. Please verify your email/phone first."}), 403
 
-        # Query user again in this session to get student relationship
-        user_with_student = session.query(User).options(joinedload(User.student)).filter(User.id == user.id).first()
-        
-        # Get student_id if user has a student profile
-        student_id = None
-        if user_with_student and user_with_student.student:
-            student_id = user_with_student.student.id
+        # The lookup loaded the student profile along with the user
+        student_id = user.student.id if user.student else None
+        token, expires_at = session_tokens.issue(user, user.student)
 
         return jsonify({
             "message": "Login successful",
+            "token": token,
+            "token_expires_at": expires_at,
             "user": {
                 "id": user.id,
                 "first_name": user.first_name,
@@ -186,7 +203,7 @@ def verify_otp_route():
         return jsonify({"error": "user_id, otp_code, and otp_type (email/phone) are required"}), 400
 
     with get_session() as session:
-        user = session.query(User).options(joinedload(User.student)).filter(User.id == user_id).first()
+        user = user_by_id_with_student(session, user_id)
         if not user:
             return jsonify({"error": "User not found"}), 404
 
@@ -267,9 +284,12 @@ def otp_login():
             student_id = None
             if user.student:
                 student_id = user.student.id
+            token, expires_at = session_tokens.issue(user, user.student)
 
             return jsonify({
                 "message": "OTP login successful",
+                "token": token,
+                "token_expires_at": expires_at,
                 "user": {
                     "id": user.id,
                     "first_name": user.first_name,
@@ -285,6 +305,15 @@ def otp_login():
             return jsonify({"error": "Invalid or expired OTP"}), 400
 
 
+@auth_bp.route('/logout', methods=['POST'])
+def logout():
+    """Revoke the request's session token."""
+    claims = current_session()
+    if claims is not None:
+        session_tokens.revoke(claims)
+    return jsonify({"message": "Logged out"}), 200
+
+
 @auth_bp.route('/send-login-otp', methods=['POST'])
 def send_login_otp():
     data = request.get_json() or {}
@@ -314,6 +343,9 @@ def send_login_otp():
 
 
 @auth_bp.route('/departments', methods=['GET'])
+@snapshot_read
+@replica_read
+@conditional(CATALOG)
 def get_departments():
     """Get all departments with their colleges."""
     with get_session() as session:
@@ -343,6 +375,9 @@ def get_departments():
 
 
 @auth_bp.route('/departments/<department_id>', methods=['GET'])
+@snapshot_read
+@replica_read
+@conditional(CATALOG)
 def get_department_by_id(department_id):
     """Get a specific department by its UUID."""
     # Validate UUID format
@@ -373,6 +408,16 @@ def get_department_by_id(department_id):
         }), 200
 
 
+def _reissue_session(session, claims, user, student):
+    """A fresh token carrying the changed profile, replacing the one the request came with."""
+    if claims is None:
+        return {}
+    # The old token's sid/dept/year claims are now stale; it stops working once the change commits
+    run_after_commit(session, partial(session_tokens.revoke, claims))
+    token, expires_at = session_tokens.issue(user, student)
+    return {"token": token, "token_expires_at": expires_at}
+
+
 @auth_bp.route('/create-student-profile', methods=['POST'])
 def create_student_profile():
     """Create or update student profile for authenticated user."""
@@ -406,6 +451,11 @@ def create_student_profile():
         # Get user from token (you might need to implement JWT token validation)
         # For now, we'll assume user_id is passed in the request
         user_id = data.get('user_id')
+        claims = current_session()
+        if claims is not None:
+            if user_id and str(user_id) != claims["uid"]:
+                return jsonify({"error": "This session belongs to a different user"}), 403
+            user_id = claims["uid"]
         if not user_id:
             return jsonify({"error": "user_id is required"}), 400
 
@@ -418,11 +468,17 @@ def create_student_profile():
         existing_student = session.query(Student).filter(Student.user_id == user_id).first()
         if existing_student:
             # Update existing profile
+            old_group = (existing_student.department_id, existing_student.year_of_study)
             existing_student.year_of_study = year_of_study
             existing_student.department_id = department_id
             existing_student.updated_at = datetime.utcnow()
+            versions = bump_versions(session, STUDENTS)
+            run_after_commit(session, partial(
+                turnout_analytics.record_student, old_group, (department_id, year_of_study), versions[STUDENTS]
+            ))
             
             return jsonify({
+                **_reissue_session(session, claims, user, existing_student),
                 "message": "Student profile updated successfully",
                 "student": {
                     "id": existing_student.id,
@@ -442,8 +498,13 @@ def create_student_profile():
             )
             session.add(student)
             session.flush()  # Get the student ID
+            versions = bump_versions(session, STUDENTS)
+            run_after_commit(session, partial(
+                turnout_analytics.record_student, None, (department_id, year_of_study), versions[STUDENTS]
+            ))
             
             return jsonify({
+                **_reissue_session(session, claims, user, student),
                 "message": "Student profile created successfully",
                 "student": {
                     "id": student.id,
@@ -457,6 +518,7 @@ def create_student_profile():
 
 
 @auth_bp.route('/student-profile/<user_id>', methods=['GET'])
+@conditional(CATALOG, STUDENTS)
 def get_student_profile(user_id):
     """Get student profile by user ID."""
     with get_session() as session:
@@ -475,7 +537,7 @@ def get_student_profile(user_id):
                 "department_id": student.department_id,
                 "department_name": student.department.name,
                 "college_name": student.department.college.name,
-                "created_at": student.created_at.isoformat(),
-                "updated_at": student.updated_at.isoformat()
+                "created_at": student.created_at,
+                "updated_at": student.updated_at
             }
         }), 200
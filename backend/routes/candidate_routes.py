@@ -1,10 +1,32 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify
 from datetime import datetime
-import os
-import uuid
+from functools import partial
 from werkzeug.utils import secure_filename
-from database import get_session, Candidate, Student, User, Election, Position, Department
-from sqlalchemy.orm import joinedload
+from database import get_session, run_after_commit, pipelined, Candidate, Student, User, Election, Position, Department
+from photo_store import get_photo_store
+from candidate_stats import candidate_statistics
+from compression import precompressed
+from conditional import (
+    conditional, bump_versions, candidates_scope, CATALOG, CANDIDATES, STUDENTS, ELECTION_CANDIDATE_SCOPES
+)
+from response_cache import cached_response
+from replica import replica_read
+from degraded import snapshot_read
+from session_tokens import session_required
+from pagination import get_page_args, paginate
+from lookups import election_by_id, student_by_id, user_by_id
+from read_models import (
+    application_select,
+    candidate_listing_select,
+    candidate_profile_select,
+    election_summaries,
+    election_summary,
+    position_election_id,
+    position_with_election,
+    positions_by_election,
+    student_exists,
+    voting_candidates,
+)
 from sqlalchemy import and_, or_
 
 candidate_bp = Blueprint('candidate', __name__, url_prefix='/api/candidates')
@@ -17,38 +39,68 @@ def allowed_file(filename):
 
 
 def save_uploaded_file(file):
-    """Save uploaded file and return the URL path."""
+    """Save uploaded file in the photo store and return the URL path."""
     if file and allowed_file(file.filename):
-        # Generate unique filename
         filename = secure_filename(file.filename)
         file_ext = filename.rsplit('.', 1)[1].lower()
-        unique_filename = f"{uuid.uuid4()}.{file_ext}"
-        
-        # Get upload folder from app config
-        upload_folder = current_app.config.get('UPLOAD_FOLDER')
-        if not upload_folder:
-            upload_folder = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads', 'candidates')
-            os.makedirs(upload_folder, exist_ok=True)
-        
-        # Save file
-        file_path = os.path.join(upload_folder, unique_filename)
-        file.save(file_path)
-        
-        # Return URL path (relative to the static route)
-        return f"/uploads/candidates/{unique_filename}"
+        return get_photo_store().save(file.stream, file_ext)
     return None
 
+
+def _student_data(row):
+    """Student block of a candidate response, built from a candidate_profile_select row."""
+    return {
+        "id": row.student_id,
+        "user": {
+            "first_name": row.first_name,
+            "last_name": row.last_name,
+            "email": row.email
+        },
+        "year_of_study": row.year_of_study,
+        "department": {
+            "id": row.department_id,
+            "name": row.department_name
+        } if row.department_id else None
+    }
+
+
+def _election_data(row):
+    """Election block of a response, built from a row with election_* columns."""
+    return {
+        "id": row.election_id,
+        "title": row.election_title,
+        "election_year": row.election_year,
+        "status": row.election_status
+    }
+
 # ============================================================================
 # ELECTION ENDPOINTS (for voting interface)
 # ============================================================================
 
+# Positions never move between elections, so their election is looked up once
+_position_elections: dict[str, str] = {}
+
+
+def _position_election(position_id):
+    """Cache scope arguments for a position's election, or None if it does not exist."""
+    election_id = _position_elections.get(position_id)
+    if election_id is None:
+        with get_session() as session:
+            election_id = position_election_id(session, position_id)
+        if election_id is None:
+            return None
+        _position_elections[position_id] = election_id
+    return {"election_id": election_id}
+
+
 @candidate_bp.route("/voting/elections", methods=["GET"])
+@snapshot_read
+@replica_read
+@conditional(CATALOG)
 def get_elections_for_voting():
     """Get all active elections for voting."""
     with get_session() as session:
-        elections = session.query(Election).filter(
-            Election.status.in_(["UPCOMING", "ACTIVE"])
-        ).all()
+        elections = election_summaries(session, ["UPCOMING", "ACTIVE"])
         
         elections_data = [
             {
@@ -56,8 +108,8 @@ def get_elections_for_voting():
                 "title": election.title,
                 "election_year": election.election_year,
                 "status": election.status,
-                "start_time": election.start_time.isoformat() if election.start_time else None,
-                "end_time": election.end_time.isoformat() if election.end_time else None,
+                "start_time": election.start_time,
+                "end_time": election.end_time,
             }
             for election in elections
         ]
@@ -69,14 +121,14 @@ def get_elections_for_voting():
 
 
 @candidate_bp.route("/apply/elections", methods=["GET"])
+@snapshot_read
+@replica_read
+@conditional(CATALOG)
 def get_elections_for_application():
     """Get upcoming elections with their positions for candidate application."""
     with get_session() as session:
-        elections = session.query(Election).filter(
-            Election.status == "UPCOMING"
-        ).options(
-            joinedload(Election.positions)
-        ).all()
+        elections = election_summaries(session, ["UPCOMING"])
+        positions = positions_by_election(session, [election.id for election in elections])
         
         elections_data = []
         for election in elections:
@@ -84,9 +136,9 @@ def get_elections_for_application():
                 {
                     "id": position.id,
                     "name": position.name,
-                    "description": position.description if hasattr(position, 'description') else None
+                    "description": None  # Position has no description column
                 }
-                for position in election.positions
+                for position in positions[election.id]
             ]
             
             elections_data.append({
@@ -104,36 +156,35 @@ def get_elections_for_application():
 
 
 @candidate_bp.route("/voting/elections/<election_id>/candidates", methods=["GET"])
+@snapshot_read
+@replica_read
+@conditional(*ELECTION_CANDIDATE_SCOPES)
+@cached_response(*ELECTION_CANDIDATE_SCOPES)
+@precompressed
 def get_approved_candidates_for_voting(election_id):
     """Get approved candidates grouped by position for a specific election (for voting)."""
     with get_session() as session:
         # Check if election exists
-        election = session.query(Election).filter(Election.id == election_id).first()
+        election = election_summary(session, election_id)
         if not election:
             return jsonify({"error": "Election not found"}), 404
         
         # Get only approved candidates for this election
-        candidates = session.query(Candidate).options(
-            joinedload(Candidate.student).joinedload(Student.user),
-            joinedload(Candidate.position)
-        ).filter(
-            Candidate.election_id == election_id,
-            Candidate.is_approved == True
-        ).all()
+        candidates = voting_candidates(session, election_id)
         
         # Group candidates by position
         candidates_by_position = {}
         for candidate in candidates:
-            position_name = candidate.position.name
+            position_name = candidate.position_name
             if position_name not in candidates_by_position:
                 candidates_by_position[position_name] = []
             
             candidates_by_position[position_name].append({
                 "id": candidate.id,
-                "name": f"{candidate.student.user.first_name} {candidate.student.user.last_name}",
+                "name": f"{candidate.first_name} {candidate.last_name}",
                 "platform_statement": candidate.platform_statement,
                 "photo_url": candidate.photo_url,
-                "position_id": candidate.position.id,
+                "position_id": candidate.position_id,
                 "position_name": position_name,
             })
         
@@ -154,24 +205,38 @@ def get_approved_candidates_for_voting(election_id):
 # ============================================================================
 
 @candidate_bp.get("/all-candidates")
+@snapshot_read
+@replica_read
+@conditional(CATALOG, CANDIDATES, STUDENTS)
+@precompressed
 def get_all_candidates():
+    try:
+        page = get_page_args()
+    except ValueError:
+        return jsonify({"error": "Invalid limit or cursor"}), 400
+
     with get_session() as session:
-        # Join Candidate → Student → User to get candidate name
         # Only return approved candidates for public viewing
-        candidates = session.query(Candidate).options(
-            joinedload(Candidate.student).joinedload(Student.user),
-            joinedload(Candidate.position),
-            joinedload(Candidate.election)
-        ).filter(Candidate.is_approved == True).all()
+        stmt = candidate_listing_select()
+        if page:
+            candidates, next_cursor = paginate(session, stmt, [Candidate.election_id, Candidate.id], *page)
+        else:
+            candidates = session.execute(stmt).all()
         result = [
             {
                 "id": candidate.id,
-                "name": f"{candidate.student.user.first_name} {candidate.student.user.last_name}",
-                "position": candidate.position.name,
-                "election": candidate.election.title
+                "name": f"{candidate.first_name} {candidate.last_name}",
+                "position": candidate.position_name,
+                "election": candidate.election_title
             }
             for candidate in candidates
         ]
+        if page:
+            return jsonify({
+                "candidates": result,
+                "total": len(result),
+                "next_cursor": next_cursor
+            })
         return jsonify(result)
 
 @candidate_bp.route('/apply', methods=['POST'])
@@ -205,17 +270,17 @@ def apply_for_position():
     
     with get_session() as session:
         # Check if student exists
-        student = session.query(Student).filter(Student.id == student_id).first()
+        student = student_by_id(session, student_id)
         if not student:
             return jsonify({"error": "Student not found"}), 404
         
         # Check if student's user is verified
-        user = session.query(User).filter(User.id == student.user_id).first()
+        user = user_by_id(session, student.user_id)
         if not user or not user.is_verified:
             return jsonify({"error": "Student account not verified"}), 403
         
         # Check if election exists and is in UPCOMING status
-        election = session.query(Election).filter(Election.id == election_id).first()
+        election = election_by_id(session, election_id)
         if not election:
             return jsonify({"error": "Election not found"}), 404
         
@@ -246,8 +311,11 @@ def apply_for_position():
             is_approved=False  # Requires admin approval
         )
         
-        session.add(candidate)
-        session.flush()  # Flush to get the ID without committing
+        with pipelined(session):
+            session.add(candidate)
+            session.flush()  # Flush to get the ID without committing
+            bump_versions(session, CANDIDATES, candidates_scope(election_id))
+        run_after_commit(session, candidate_statistics.invalidate)
         
         return jsonify({
             "message": "Application submitted successfully. Awaiting admin approval.",
@@ -257,91 +325,94 @@ def apply_for_position():
 
 
 @candidate_bp.route('/my-applications/<student_id>', methods=['GET'])
+@conditional(CATALOG, CANDIDATES, STUDENTS)
 def get_my_applications(student_id):
     """Get all applications for a specific student."""
+    try:
+        page = get_page_args()
+    except ValueError:
+        return jsonify({"error": "Invalid limit or cursor"}), 400
+
     with get_session() as session:
         # Check if student exists
-        student = session.query(Student).filter(Student.id == student_id).first()
-        if not student:
+        if not student_exists(session, student_id):
             return jsonify({"error": "Student not found"}), 404
         
         # Get all applications for this student
-        applications = session.query(Candidate).options(
-            joinedload(Candidate.position),
-            joinedload(Candidate.election)
-        ).filter(Candidate.student_id == student_id).all()
+        stmt = application_select(student_id)
+        next_cursor = None
+        if page:
+            applications, next_cursor = paginate(session, stmt, [Candidate.election_id, Candidate.id], *page)
+        else:
+            applications = session.execute(stmt).all()
         
         applications_data = []
         for app in applications:
             applications_data.append({
                 "id": app.id,
-                "election": {
-                    "id": app.election.id,
-                    "title": app.election.title,
-                    "election_year": app.election.election_year,
-                    "status": app.election.status
-                },
+                "election": _election_data(app),
                 "position": {
-                    "id": app.position.id,
-                    "name": app.position.name
+                    "id": app.position_id,
+                    "name": app.position_name
                 },
                 "platform_statement": app.platform_statement,
                 "photo_url": app.photo_url,
                 "is_approved": app.is_approved,
-                "applied_at": app.created_at.isoformat() if hasattr(app, 'created_at') else None
+                "applied_at": None  # Candidate has no created_at column
             })
         
-        return jsonify({
+        response_data = {
             "applications": applications_data,
             "total": len(applications_data)
-        }), 200
+        }
+        if page:
+            response_data["next_cursor"] = next_cursor
+        return jsonify(response_data), 200
 
 
 @candidate_bp.route('/election/<election_id>', methods=['GET'])
+@snapshot_read
+@replica_read
+@conditional(*ELECTION_CANDIDATE_SCOPES)
 def get_candidates_by_election(election_id):
     """Get all approved candidates for a specific election."""
+    try:
+        page = get_page_args()
+    except ValueError:
+        return jsonify({"error": "Invalid limit or cursor"}), 400
+
     with get_session() as session:
         # Check if election exists
-        election = session.query(Election).filter(Election.id == election_id).first()
+        election = election_summary(session, election_id)
         if not election:
             return jsonify({"error": "Election not found"}), 404
         
         # Get only approved candidates for this election
-        candidates = session.query(Candidate).options(
-            joinedload(Candidate.student).joinedload(Student.user),
-            joinedload(Candidate.position)
-        ).filter(
+        stmt = candidate_profile_select().where(
             Candidate.election_id == election_id,
             Candidate.is_approved == True
-        ).all()
+        )
+        next_cursor = None
+        if page:
+            candidates, next_cursor = paginate(session, stmt, [Candidate.election_id, Candidate.id], *page)
+        else:
+            candidates = session.execute(stmt).all()
         
         candidates_data = []
         for candidate in candidates:
             candidates_data.append({
                 "id": candidate.id,
-                "student": {
-                    "id": candidate.student.id,
-                    "user": {
-                        "first_name": candidate.student.user.first_name,
-                        "last_name": candidate.student.user.last_name,
-                        "email": candidate.student.user.email
-                    },
-                    "year_of_study": candidate.student.year_of_study,
-                    "department": {
-                        "id": candidate.student.department.id,
-                        "name": candidate.student.department.name
-                    } if candidate.student.department else None
-                },
+                "student": _student_data(candidate),
                 "position": {
-                    "id": candidate.position.id,
-                    "name": candidate.position.name
+                    "id": candidate.position_id,
+                    "name": candidate.position_name
                 },
                 "platform_statement": candidate.platform_statement,
                 "photo_url": candidate.photo_url,
                 "is_approved": candidate.is_approved
             })
         
-        return jsonify({
+        response_data = {
             "election": {
                 "id": election.id,
                 "title": election.title,
@@ -350,46 +421,38 @@ def get_candidates_by_election(election_id):
             },
             "candidates": candidates_data,
             "total": len(candidates_data)
-        }), 200
+        }
+        if page:
+            response_data["next_cursor"] = next_cursor
+        return jsonify(response_data), 200
 
 
 @candidate_bp.route('/position/<position_id>', methods=['GET'])
+@snapshot_read
+@replica_read
+@conditional(CATALOG, CANDIDATES, STUDENTS)
+@cached_response(*ELECTION_CANDIDATE_SCOPES, resolve=_position_election)
 def get_candidates_by_position(position_id):
     """Get all approved candidates for a specific position."""
     with get_session() as session:
         # Check if position exists
-        position = session.query(Position).options(
-            joinedload(Position.election)
-        ).filter(Position.id == position_id).first()
+        position = position_with_election(session, position_id)
         if not position:
             return jsonify({"error": "Position not found"}), 404
         
         # Get only approved candidates for this position
-        candidates = session.query(Candidate).options(
-            joinedload(Candidate.student).joinedload(Student.user),
-            joinedload(Candidate.student).joinedload(Student.department)
-        ).filter(
-            Candidate.position_id == position_id,
-            Candidate.is_approved == True
+        candidates = session.execute(
+            candidate_profile_select().where(
+                Candidate.position_id == position_id,
+                Candidate.is_approved == True
+            )
         ).all()
         
         candidates_data = []
         for candidate in candidates:
             candidates_data.append({
                 "id": candidate.id,
-                "student": {
-                    "id": candidate.student.id,
-                    "user": {
-                        "first_name": candidate.student.user.first_name,
-                        "last_name": candidate.student.user.last_name,
-                        "email": candidate.student.user.email
-                    },
-                    "year_of_study": candidate.student.year_of_study,
-                    "department": {
-                        "id": candidate.student.department.id,
-                        "name": candidate.student.department.name
-                    } if candidate.student.department else None
-                },
+                "student": _student_data(candidate),
                 "platform_statement": candidate.platform_statement,
                 "photo_url": candidate.photo_url,
                 "is_approved": candidate.is_approved
@@ -399,12 +462,7 @@ def get_candidates_by_position(position_id):
             "position": {
                 "id": position.id,
                 "name": position.name,
-                "election": {
-                    "id": position.election.id,
-                    "title": position.election.title,
-                    "election_year": position.election.election_year,
-                    "status": position.election.status
-                }
+                "election": _election_data(position)
             },
             "candidates": candidates_data,
             "total": len(candidates_data)
@@ -412,43 +470,25 @@ def get_candidates_by_position(position_id):
 
 
 @candidate_bp.route('/<candidate_id>', methods=['GET'])
+@conditional(CATALOG, CANDIDATES, STUDENTS)
 def get_candidate_details(candidate_id):
     """Get detailed information about a specific candidate."""
     with get_session() as session:
-        candidate = session.query(Candidate).options(
-            joinedload(Candidate.student).joinedload(Student.user),
-            joinedload(Candidate.student).joinedload(Student.department),
-            joinedload(Candidate.position).joinedload(Position.election)
-        ).filter(Candidate.id == candidate_id).first()
+        candidate = session.execute(
+            candidate_profile_select(with_election=True).where(Candidate.id == candidate_id)
+        ).first()
         
         if not candidate:
             return jsonify({"error": "Candidate not found"}), 404
         
         return jsonify({
             "id": candidate.id,
-            "student": {
-                "id": candidate.student.id,
-                "user": {
-                    "first_name": candidate.student.user.first_name,
-                    "last_name": candidate.student.user.last_name,
-                    "email": candidate.student.user.email
-                },
-                "year_of_study": candidate.student.year_of_study,
-                "department": {
-                    "id": candidate.student.department.id,
-                    "name": candidate.student.department.name
-                } if candidate.student.department else None
-            },
+            "student": _student_data(candidate),
             "position": {
-                "id": candidate.position.id,
-                "name": candidate.position.name
-            },
-            "election": {
-                "id": candidate.election.id,
-                "title": candidate.election.title,
-                "election_year": candidate.election.election_year,
-                "status": candidate.election.status
+                "id": candidate.position_id,
+                "name": candidate.position_name
             },
+            "election": _election_data(candidate),
             "platform_statement": candidate.platform_statement,
             "photo_url": candidate.photo_url,
             "is_approved": candidate.is_approved
@@ -467,6 +507,8 @@ def update_candidate_application(candidate_id):
         if candidate.is_approved:
             return jsonify({"error": "Cannot modify approved applications"}), 400
         
+        old_photo_url = None
+        
         # Check if request contains form data (file upload) or JSON
         if request.content_type and 'multipart/form-data' in request.content_type:
             # Handle file upload
@@ -477,22 +519,9 @@ def update_candidate_application(candidate_id):
                 candidate.platform_statement = platform_statement
             
             if photo_file:
-                # Delete old photo if exists
-                if candidate.photo_url:
-                    old_filename = candidate.photo_url.split('/')[-1]
-                    upload_folder = current_app.config.get('UPLOAD_FOLDER')
-                    if not upload_folder:
-                        upload_folder = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads', 'candidates')
-                    old_file_path = os.path.join(upload_folder, old_filename)
-                    if os.path.exists(old_file_path):
-                        try:
-                            os.remove(old_file_path)
-                        except:
-                            pass
-                
-                # Save new photo
                 new_photo_url = save_uploaded_file(photo_file)
                 if new_photo_url:
+                    old_photo_url = candidate.photo_url
                     candidate.photo_url = new_photo_url
         else:
             # Handle JSON request (for backward compatibility)
@@ -503,8 +532,14 @@ def update_candidate_application(candidate_id):
             if platform_statement:
                 candidate.platform_statement = platform_statement
             if photo_url:
+                old_photo_url = candidate.photo_url
                 candidate.photo_url = photo_url
         
+        # Old photo may still be shared with other candidates; the store checks after commit
+        if old_photo_url and old_photo_url != candidate.photo_url:
+            run_after_commit(session, partial(get_photo_store().release, old_photo_url))
+        bump_versions(session, CANDIDATES, candidates_scope(candidate.election_id))
+        
         return jsonify({
             "message": "Application updated successfully",
             "candidate_id": candidate.id
@@ -523,6 +558,9 @@ def withdraw_application(candidate_id):
         if candidate.is_approved:
             return jsonify({"error": "Cannot withdraw approved applications"}), 400
         
+        run_after_commit(session, partial(get_photo_store().release, candidate.photo_url))
+        run_after_commit(session, candidate_statistics.invalidate)
+        bump_versions(session, CANDIDATES, candidates_scope(candidate.election_id))
         session.delete(candidate)
         
         return jsonify({
@@ -532,55 +570,51 @@ def withdraw_application(candidate_id):
 
 # Admin-only routes
 @candidate_bp.route('/admin/pending', methods=['GET'])
+@session_required(admin=True)
+@conditional(CATALOG, CANDIDATES, STUDENTS)
+@precompressed
 def get_pending_applications():
     """Get all pending candidate applications (admin only)."""
+    try:
+        page = get_page_args()
+    except ValueError:
+        return jsonify({"error": "Invalid limit or cursor"}), 400
+
     with get_session() as session:
         # Get all pending applications
-        pending_applications = session.query(Candidate).options(
-            joinedload(Candidate.student).joinedload(Student.user),
-            joinedload(Candidate.student).joinedload(Student.department),
-            joinedload(Candidate.position).joinedload(Position.election)
-        ).filter(Candidate.is_approved == False).all()
+        stmt = candidate_profile_select(with_election=True).where(Candidate.is_approved == False)
+        next_cursor = None
+        if page:
+            pending_applications, next_cursor = paginate(session, stmt, [Candidate.election_id, Candidate.id], *page)
+        else:
+            pending_applications = session.execute(stmt).all()
         
         applications_data = []
         for app in pending_applications:
             applications_data.append({
                 "id": app.id,
-                "student": {
-                    "id": app.student.id,
-                    "user": {
-                        "first_name": app.student.user.first_name,
-                        "last_name": app.student.user.last_name,
-                        "email": app.student.user.email
-                    },
-                    "year_of_study": app.student.year_of_study,
-                    "department": {
-                        "id": app.student.department.id,
-                        "name": app.student.department.name
-                    } if app.student.department else None
-                },
+                "student": _student_data(app),
                 "position": {
-                    "id": app.position.id,
-                    "name": app.position.name
-                },
-                "election": {
-                    "id": app.election.id,
-                    "title": app.election.title,
-                    "election_year": app.election.election_year,
-                    "status": app.election.status
+                    "id": app.position_id,
+                    "name": app.position_name
                 },
+                "election": _election_data(app),
                 "platform_statement": app.platform_statement,
                 "photo_url": app.photo_url,
-                "applied_at": app.created_at.isoformat() if hasattr(app, 'created_at') else None
+                "applied_at": None  # Candidate has no created_at column
             })
         
-        return jsonify({
+        response_data = {
             "pending_applications": applications_data,
             "total": len(applications_data)
-        }), 200
+        }
+        if page:
+            response_data["next_cursor"] = next_cursor
+        return jsonify(response_data), 200
 
 
 @candidate_bp.route('/admin/<candidate_id>/approve', methods=['POST'])
+@session_required(admin=True)
 def approve_candidate(candidate_id):
     """Approve a candidate application (admin only)."""
     with get_session() as session:
@@ -592,6 +626,8 @@ def approve_candidate(candidate_id):
             return jsonify({"error": "Application already approved"}), 400
         
         candidate.is_approved = True
+        bump_versions(session, CANDIDATES, candidates_scope(candidate.election_id))
+        run_after_commit(session, candidate_statistics.invalidate)
         
         return jsonify({
             "message": "Candidate application approved successfully",
@@ -600,6 +636,7 @@ def approve_candidate(candidate_id):
 
 
 @candidate_bp.route('/admin/<candidate_id>/reject', methods=['POST'])
+@session_required(admin=True)
 def reject_candidate(candidate_id):
     """Reject a candidate application (admin only)."""
     data = request.get_json() or {}
@@ -614,6 +651,9 @@ def reject_candidate(candidate_id):
             return jsonify({"error": "Cannot reject approved applications"}), 400
         
         # Delete the application (rejection)
+        run_after_commit(session, partial(get_photo_store().release, candidate.photo_url))
+        run_after_commit(session, candidate_statistics.invalidate)
+        bump_versions(session, CANDIDATES, candidates_scope(candidate.election_id))
         session.delete(candidate)
         
         return jsonify({
@@ -623,48 +663,7 @@ def reject_candidate(candidate_id):
 
 
 @candidate_bp.route('/admin/statistics', methods=['GET'])
+@session_required(admin=True)
 def get_candidate_statistics():
     """Get candidate application statistics (admin only)."""
-    with get_session() as session:
-        # Get total applications
-        total_applications = session.query(Candidate).count()
-        
-        # Get approved applications
-        approved_applications = session.query(Candidate).filter(Candidate.is_approved == True).count()
-        
-        # Get pending applications
-        pending_applications = session.query(Candidate).filter(Candidate.is_approved == False).count()
-        
-        # Get applications by election
-        elections_stats = session.query(
-            Election.id,
-            Election.title,
-            Election.election_year,
-            Election.status
-        ).join(Candidate, Election.id == Candidate.election_id).distinct().all()
-        
-        election_stats = []
-        for election in elections_stats:
-            app_count = session.query(Candidate).filter(Candidate.election_id == election.id).count()
-            approved_count = session.query(Candidate).filter(
-                and_(Candidate.election_id == election.id, Candidate.is_approved == True)
-            ).count()
-            
-            election_stats.append({
-                "election_id": election.id,
-                "title": election.title,
-                "election_year": election.election_year,
-                "status": election.status,
-                "total_applications": app_count,
-                "approved_applications": approved_count,
-                "pending_applications": app_count - approved_count
-            })
-        
-        return jsonify({
-            "overview": {
-                "total_applications": total_applications,
-                "approved_applications": approved_applications,
-                "pending_applications": pending_applications
-            },
-            "by_election": election_stats
-        }), 200
+    return jsonify(candidate_statistics.get()), 200
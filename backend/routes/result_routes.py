@@ -1,29 +1,76 @@
-from flask import Blueprint, jsonify
-from sqlalchemy.orm import joinedload
-from sqlalchemy import and_
+from flask import Blueprint, jsonify, request
 import uuid
+from collections import Counter
+from datetime import datetime
 
-from database import (
-    get_session,
-    Election,
-    Position,
-    Candidate,
-    VoteSelection,
-    Ballot,
-    Student,
-    Department
+from compression import precompressed
+from conditional import conditional, CATALOG, DEPARTMENTS, STUDENTS, ELECTION_RESULT_SCOPES
+from response_cache import cached_response
+from replica import replica_read
+from degraded import snapshot_read
+from turnout import turnout_analytics
+from turnout_series import turnout_series, RESOLUTIONS
+from database import get_session, use_snapshot
+from read_models import (
+    department_names,
+    election_summaries,
+    election_summary,
+    positions_for_election,
+    result_candidates,
+    vote_counts,
 )
 
 result_bp = Blueprint('result', __name__, url_prefix='/api/voting/results')
 
 
+def _turnout_rate(ballots, eligible):
+    return round(ballots / eligible * 100, 2) if eligible else 0.0
+
+
+def _turnout_rows(cast, eligible, key_names):
+    """Turnout rows for each group present in cast or eligible, sorted by group."""
+    rows = []
+    for key in sorted(set(cast) | set(eligible), key=lambda k: tuple(str(part) for part in k)):
+        if not cast[key] and not eligible[key]:
+            continue  # group emptied by profile changes
+        row = dict(zip(key_names, key))
+        row.update({
+            "ballots_cast": cast[key],
+            "eligible_students": eligible[key],
+            "turnout_rate": _turnout_rate(cast[key], eligible[key])
+        })
+        rows.append(row)
+    return rows
+
+
+def _position_results(candidates, position_counts):
+    """Build (candidates_data, none_of_the_above_votes, total_votes) for one position."""
+    candidates_data = []
+    for candidate in candidates:
+        candidates_data.append({
+            "candidate_id": candidate.id,
+            "candidate_name": f"{candidate.first_name} {candidate.last_name}",
+            "department": candidate.department_name,
+            "year_of_study": candidate.year_of_study,
+            "platform_statement": candidate.platform_statement,
+            "photo_url": candidate.photo_url,
+            "vote_count": position_counts.get(str(candidate.id), 0)
+        })
+    
+    # Sort candidates by vote count (descending)
+    candidates_data.sort(key=lambda x: x['vote_count'], reverse=True)
+    
+    return candidates_data, position_counts.get(None, 0), sum(position_counts.values())
+
+
 @result_bp.route('/elections', methods=['GET'])
+@snapshot_read
+@replica_read
+@conditional(CATALOG)
 def get_all_elections_for_results():
     """Get all elections (for results viewing)."""
     with get_session() as session:
-        elections = session.query(Election).filter(
-            Election.status.in_(["ACTIVE", "COMPLETED", "ARCHIVED"])
-        ).all()
+        elections = election_summaries(session, ["ACTIVE", "COMPLETED", "ARCHIVED"])
         
         elections_data = [
             {
@@ -31,8 +78,8 @@ def get_all_elections_for_results():
                 "title": election.title,
                 "election_year": election.election_year,
                 "status": election.status,
-                "start_time": election.start_time.isoformat() if election.start_time else None,
-                "end_time": election.end_time.isoformat() if election.end_time else None
+                "start_time": election.start_time,
+                "end_time": election.end_time
             }
             for election in elections
         ]
@@ -44,6 +91,11 @@ def get_all_elections_for_results():
 
 
 @result_bp.route('/<election_id>', methods=['GET'])
+@snapshot_read
+@replica_read
+@conditional(*ELECTION_RESULT_SCOPES)
+@cached_response(*ELECTION_RESULT_SCOPES)
+@precompressed
 def get_election_results(election_id):
     """Get complete results for an election, grouped by position."""
     # Validate UUID format
@@ -53,76 +105,28 @@ def get_election_results(election_id):
         return jsonify({"error": "Invalid election_id format (must be UUID)"}), 400
     
     with get_session() as session:
-        # Check if election exists
-        election = session.query(Election).options(
-            joinedload(Election.positions)
-        ).filter(Election.id == election_id).first()
+        # The ballot total and the vote counts must agree, so both come from one snapshot of one database
+        use_snapshot(session)
         
+        # Check if election exists
+        election = election_summary(session, election_id, with_ballot_count=True)
         if not election:
             return jsonify({"error": "Election not found"}), 404
+        total_ballots = election.ballot_count
         
-        # Get total ballots cast
-        total_ballots = session.query(Ballot).filter(
-            Ballot.election_id == election_id
-        ).count()
-        
-        # Get all positions for this election
-        positions = session.query(Position).filter(
-            Position.election_id == election_id
-        ).all()
+        # Positions, approved candidates and vote counts each come from a single query
+        positions = positions_for_election(session, election_id)
+        counts = vote_counts(session, election_id)
+        candidates_by_position = {}
+        for candidate in result_candidates(session, election_id):
+            candidates_by_position.setdefault(str(candidate.position_id), []).append(candidate)
         
         results_by_position = []
-        
         for position in positions:
-            # Get all vote selections for this position
-            vote_selections = session.query(VoteSelection).filter(
-                VoteSelection.position_id == position.id
-            ).join(Ballot).filter(
-                Ballot.election_id == election_id
-            ).all()
-            
-            # Count votes per candidate
-            candidate_vote_counts = {}
-            none_of_the_above_count = 0
-            
-            for vote_selection in vote_selections:
-                if vote_selection.candidate_id:
-                    candidate_id = str(vote_selection.candidate_id)
-                    candidate_vote_counts[candidate_id] = candidate_vote_counts.get(candidate_id, 0) + 1
-                else:
-                    none_of_the_above_count += 1
-            
-            # Get all approved candidates for this position (including those with 0 votes)
-            all_candidates = session.query(Candidate).options(
-                joinedload(Candidate.student).joinedload(Student.user),
-                joinedload(Candidate.student).joinedload(Student.department)
-            ).filter(
-                and_(
-                    Candidate.position_id == position.id,
-                    Candidate.election_id == election_id,
-                    Candidate.is_approved == True
-                )
-            ).all()
-            
-            # Build candidates data with vote counts
-            candidates_data = []
-            for candidate in all_candidates:
-                candidate_id = str(candidate.id)
-                vote_count = candidate_vote_counts.get(candidate_id, 0)
-                candidates_data.append({
-                    "candidate_id": candidate.id,
-                    "candidate_name": f"{candidate.student.user.first_name} {candidate.student.user.last_name}",
-                    "department": candidate.student.department.name if candidate.student.department else None,
-                    "year_of_study": candidate.student.year_of_study,
-                    "platform_statement": candidate.platform_statement,
-                    "photo_url": candidate.photo_url,
-                    "vote_count": vote_count
-                })
-            
-            # Sort candidates by vote count (descending)
-            candidates_data.sort(key=lambda x: x['vote_count'], reverse=True)
-            
-            total_votes_for_position = len(vote_selections)
+            position_key = str(position.id)
+            candidates_data, none_of_the_above_count, total_votes_for_position = _position_results(
+                candidates_by_position.get(position_key, []), counts.get(position_key, {})
+            )
             
             results_by_position.append({
                 "position_id": position.id,
@@ -138,8 +142,8 @@ def get_election_results(election_id):
                 "title": election.title,
                 "election_year": election.election_year,
                 "status": election.status,
-                "start_time": election.start_time.isoformat() if election.start_time else None,
-                "end_time": election.end_time.isoformat() if election.end_time else None
+                "start_time": election.start_time,
+                "end_time": election.end_time
             },
             "total_ballots_cast": total_ballots,
             "results": results_by_position
@@ -147,6 +151,11 @@ def get_election_results(election_id):
 
 
 @result_bp.route('/<election_id>/position/<position_id>', methods=['GET'])
+@snapshot_read
+@replica_read
+@conditional(*ELECTION_RESULT_SCOPES)
+@cached_response(*ELECTION_RESULT_SCOPES)
+@precompressed
 def get_position_results(election_id, position_id):
     """Get results for a specific position in an election."""
     # Validate UUID formats
@@ -158,70 +167,20 @@ def get_position_results(election_id, position_id):
     
     with get_session() as session:
         # Check if election exists
-        election = session.query(Election).filter(Election.id == election_id).first()
+        election = election_summary(session, election_id)
         if not election:
             return jsonify({"error": "Election not found"}), 404
         
         # Check if position exists and belongs to the election
-        position = session.query(Position).filter(
-            and_(
-                Position.id == position_id,
-                Position.election_id == election_id
-            )
-        ).first()
-        
-        if not position:
+        positions = positions_for_election(session, election_id, position_id)
+        if not positions:
             return jsonify({"error": "Position not found or doesn't belong to this election"}), 404
+        position = positions[0]
         
-        # Get all vote selections for this position in this election
-        vote_selections = session.query(VoteSelection).filter(
-            VoteSelection.position_id == position_id
-        ).join(Ballot).filter(
-            Ballot.election_id == election_id
-        ).all()
-        
-        # Count votes per candidate
-        candidate_vote_counts = {}
-        none_of_the_above_count = 0
-        
-        for vote_selection in vote_selections:
-            if vote_selection.candidate_id:
-                candidate_id = str(vote_selection.candidate_id)
-                candidate_vote_counts[candidate_id] = candidate_vote_counts.get(candidate_id, 0) + 1
-            else:
-                none_of_the_above_count += 1
-        
-        # Get all approved candidates for this position (including those with 0 votes)
-        all_candidates = session.query(Candidate).options(
-            joinedload(Candidate.student).joinedload(Student.user),
-            joinedload(Candidate.student).joinedload(Student.department)
-        ).filter(
-            and_(
-                Candidate.position_id == position_id,
-                Candidate.election_id == election_id,
-                Candidate.is_approved == True
-            )
-        ).all()
-        
-        # Build candidates data with vote counts
-        candidates_data = []
-        for candidate in all_candidates:
-            candidate_id = str(candidate.id)
-            vote_count = candidate_vote_counts.get(candidate_id, 0)
-            candidates_data.append({
-                "candidate_id": candidate.id,
-                "candidate_name": f"{candidate.student.user.first_name} {candidate.student.user.last_name}",
-                "department": candidate.student.department.name if candidate.student.department else None,
-                "year_of_study": candidate.student.year_of_study,
-                "platform_statement": candidate.platform_statement,
-                "photo_url": candidate.photo_url,
-                "vote_count": vote_count
-            })
-        
-        # Sort candidates by vote count (descending)
-        candidates_data.sort(key=lambda x: x['vote_count'], reverse=True)
-        
-        total_votes = len(vote_selections)
+        counts = vote_counts(session, election_id, position_id)
+        candidates_data, none_of_the_above_count, total_votes = _position_results(
+            result_candidates(session, election_id, position_id), counts.get(str(position.id), {})
+        )
         
         return jsonify({
             "election": {
@@ -238,3 +197,78 @@ def get_position_results(election_id, position_id):
             "none_of_the_above_votes": none_of_the_above_count,
             "total_votes": total_votes
         }), 200
+
+
+@result_bp.route('/<election_id>/turnout', methods=['GET'])
+@snapshot_read
+@replica_read
+@conditional("election:{election_id}", DEPARTMENTS, STUDENTS, "votes:{election_id}")
+def get_election_turnout(election_id):
+    """Get turnout for an election by department and year of study."""
+    # Validate UUID format
+    try:
+        uuid.UUID(election_id)
+    except (ValueError, TypeError):
+        return jsonify({"error": "Invalid election_id format (must be UUID)"}), 400
+    
+    # Counters are kept in memory, so this is O(departments x years) whatever the electorate size
+    breakdown = turnout_analytics.breakdown(election_id)
+    if breakdown is None:
+        return jsonify({"error": "Election not found"}), 404
+    cast, eligible = breakdown
+    
+    by_department_cast, by_department_eligible = Counter(), Counter()
+    by_year_cast, by_year_eligible = Counter(), Counter()
+    for (department_id, year_of_study), count in cast.items():
+        by_department_cast[(department_id,)] += count
+        by_year_cast[(year_of_study,)] += count
+    for (department_id, year_of_study), count in eligible.items():
+        by_department_eligible[(department_id,)] += count
+        by_year_eligible[(year_of_study,)] += count
+    
+    with get_session() as session:
+        names = department_names(session)
+    by_department = _turnout_rows(by_department_cast, by_department_eligible, ["department_id"])
+    for row in by_department:
+        row["department_name"] = names.get(row["department_id"])
+    
+    total_cast, total_eligible = sum(cast.values()), sum(eligible.values())
+    return jsonify({
+        "election_id": election_id,
+        "total_ballots_cast": total_cast,
+        "total_eligible_students": total_eligible,
+        "turnout_rate": _turnout_rate(total_cast, total_eligible),
+        "by_department": by_department,
+        "by_year": _turnout_rows(by_year_cast, by_year_eligible, ["year_of_study"]),
+        "by_department_and_year": _turnout_rows(cast, eligible, ["department_id", "year_of_study"])
+    }), 200
+
+
+@result_bp.route('/<election_id>/timeline', methods=['GET'])
+def get_election_timeline(election_id):
+    """Get ballots cast over time for an election (1s, 1m or 15m buckets)."""
+    # Validate UUID format
+    try:
+        uuid.UUID(election_id)
+    except (ValueError, TypeError):
+        return jsonify({"error": "Invalid election_id format (must be UUID)"}), 400
+    
+    resolution = request.args.get("resolution", "1m")
+    if resolution not in RESOLUTIONS:
+        return jsonify({"error": f"resolution must be one of {', '.join(RESOLUTIONS)}"}), 400
+    
+    # Served from in-memory ring buffers; no ETag since the window moves with the clock
+    points = turnout_series.points(election_id, resolution)
+    if points is None:
+        return jsonify({"error": "Election not found"}), 404
+    
+    return jsonify({
+        "election_id": election_id,
+        "resolution": resolution,
+        "bucket_seconds": RESOLUTIONS[resolution][0],
+        "total_in_window": sum(count for _, count in points),
+        "points": [
+            {"start": datetime.utcfromtimestamp(start), "ballots": count}
+            for start, count in points
+        ]
+    }), 200
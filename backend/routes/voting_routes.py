@@ -1,23 +1,42 @@
 from flask import Blueprint, jsonify, request
 from datetime import datetime
+from functools import partial
 import uuid
 from database import (
     get_session, 
+    run_after_commit,
+    pipelined,
+    ELECTION_STATUS_UPCOMING,
+    ELECTION_STATUS_ACTIVE,
+    ELECTION_STATUS_COMPLETED,
     Ballot, 
     VoteSelection, 
-    Student, 
-    User, 
     Election, 
     Position, 
-    Candidate
 )
-from sqlalchemy.orm import joinedload
-from sqlalchemy import and_, or_
+from conditional import conditional, deferred_bumps, votes_scope, CATALOG, STUDENTS
+from read_models import ballot_status, election_summaries, student_exists
+from lookups import (
+    approved_candidate_positions,
+    ballot_exists,
+    election_with_positions,
+    student_by_id,
+    student_by_user_id,
+    user_by_id,
+)
+from voted_index import voted_index
+from turnout import turnout_analytics
+from turnout_series import turnout_series
+from metrics import record_ballot
+from waiting_room import waiting_room
+from degraded import snapshot_read
+from session_tokens import current_session, session_required
 
 voting_bp = Blueprint("voting", __name__, url_prefix="/api/voting")
 
 
 @voting_bp.route("/submit", methods=["POST"])
+@session_required()
 def submit_vote():
     """Submit votes for an election."""
     data = request.get_json() or {}
@@ -30,17 +49,32 @@ def submit_vote():
     # Validation
     if not election_id:
         return jsonify({"error": "election_id is required"}), 400
+
+    # A session token already says who is voting; ids in the body, if any, must agree with it
+    claims = current_session()
+    if claims is not None:
+        profile = _session_profile(claims)
+        if profile is None:
+            return jsonify({"error": "Student profile not found for this user"}), 404
+        if student_id and str(student_id) != profile[0]:
+            return jsonify({"error": "This session belongs to a different student"}), 403
+        student_id = profile[0]
     
     # If student_id not provided but user_id is, look up student_id
     if not student_id and user_id:
         with get_session() as db_session:
-            student = db_session.query(Student).filter(Student.user_id == user_id).first()
+            student = student_by_user_id(db_session, user_id)
             if not student:
                 return jsonify({"error": "Student profile not found for this user"}), 404
             student_id = student.id
     
     if not student_id:
         return jsonify({"error": "student_id or user_id is required"}), 400
+
+    # During an election-open surge only students admitted from the waiting room may submit
+    waiting = waiting_room.check_submission(str(election_id), str(student_id), request.headers.get("X-Queue-Token"))
+    if waiting:
+        return jsonify({"error": waiting, "waiting_room": True}), 403
     
     # Handle both array and dict formats
     if isinstance(votes_data, list):
@@ -99,20 +133,25 @@ def submit_vote():
     votes = normalized_votes
     
     with get_session() as db_session:
-        # Check if student exists
-        student = db_session.query(Student).filter(Student.id == student_id).first()
-        if not student:
-            return jsonify({"error": "Student not found"}), 404
-        
-        # Check if student's user is verified
-        user = db_session.query(User).filter(User.id == student.user_id).first()
-        if not user or not user.is_verified:
-            return jsonify({"error": "Student account must be verified to vote"}), 403
+        if claims is not None:
+            # Verified and profile details as of login, no lookups needed
+            if not claims["verified"]:
+                return jsonify({"error": "Student account must be verified to vote"}), 403
+            department_id, year_of_study = profile[1], profile[2]
+        else:
+            # Check if student exists
+            student = student_by_id(db_session, student_id)
+            if not student:
+                return jsonify({"error": "Student not found"}), 404
+
+            # Check if student's user is verified
+            user = user_by_id(db_session, student.user_id)
+            if not user or not user.is_verified:
+                return jsonify({"error": "Student account must be verified to vote"}), 403
+            department_id, year_of_study = student.department_id, student.year_of_study
         
         # Check if election exists
-        election = db_session.query(Election).options(
-            joinedload(Election.positions)
-        ).filter(Election.id == election_id).first()
+        election = election_with_positions(db_session, election_id)
         
         if not election:
             return jsonify({"error": "Election not found"}), 404
@@ -122,11 +161,7 @@ def submit_vote():
             return jsonify({"error": f"Voting is only allowed for active elections. Current status: {election.status}"}), 400
         
         # Check if student has already voted in this election
-        existing_ballot = db_session.query(Ballot).filter(
-            and_(Ballot.election_id == election_id, Ballot.student_id == student_id)
-        ).first()
-        
-        if existing_ballot:
+        if ballot_exists(db_session, election_id, student_id):
             return jsonify({"error": "You have already voted in this election"}), 409
         
         # Get all positions for this election (use string keys to match normalized votes)
@@ -151,6 +186,19 @@ def submit_vote():
         if extra_positions:
             return jsonify({"error": "Invalid position(s) provided"}), 400
         
+        # Candidate ids are UUIDs; anything else can never match an approved candidate
+        def parse_candidate_id(candidate_id):
+            try:
+                return str(uuid.UUID(str(candidate_id)))
+            except (ValueError, TypeError):
+                return None
+        
+        # Load every selected candidate's position in one query instead of one query per vote
+        selected_ids = {parse_candidate_id(candidate_id) for candidate_id in votes.values() if candidate_id} - {None}
+        approved_positions = approved_candidate_positions(
+            db_session, election_id, sorted(selected_ids)
+        ) if selected_ids else {}
+        
         # Validate candidates and create vote selections
         vote_selections = []
         for position_key, candidate_id in votes.items():
@@ -159,27 +207,8 @@ def submit_vote():
             
             # Validate candidate (if provided)
             if candidate_id:
-                # candidate_id may be int, uuid.UUID or string; ensure uuid strings are converted
-                parsed_candidate_id = candidate_id
-                if isinstance(candidate_id, str):
-                    try:
-                        parsed_candidate_id = uuid.UUID(candidate_id)
-                    except (ValueError, TypeError):
-                        try:
-                            parsed_candidate_id = int(candidate_id)
-                        except (ValueError, TypeError):
-                            parsed_candidate_id = candidate_id
-
-                candidate = db_session.query(Candidate).filter(
-                    and_(
-                        Candidate.id == parsed_candidate_id,
-                        Candidate.position_id == position.id,
-                        Candidate.election_id == election_id,
-                        Candidate.is_approved == True
-                    )
-                ).first()
-                
-                if not candidate:
+                candidate_id = parse_candidate_id(candidate_id)
+                if approved_positions.get(candidate_id) != position.id:
                     return jsonify({"error": f"Invalid candidate for position {position.name}"}), 400
             
             # Create vote selection (will be added after ballot is created)
@@ -201,66 +230,168 @@ def submit_vote():
             ip_address=ip_address
         )
         
-        db_session.add(ballot)
-        db_session.flush()  # Get the ballot ID without committing
-        
-        # Create vote selections
-        for vote_data in vote_selections:
-            vote_selection = VoteSelection(
-                ballot_id=ballot.id,
-                position_id=vote_data["position_id"],
-                candidate_id=vote_data["candidate_id"]
-            )
-            db_session.add(vote_selection)
+        # Ballot and selections go out in one flight; leaving the block is the only wait before commit
+        with pipelined(db_session):
+            db_session.add(ballot)
+            db_session.flush()  # Get the ballot ID without committing
+            
+            # Create vote selections
+            for vote_data in vote_selections:
+                vote_selection = VoteSelection(
+                    ballot_id=ballot.id,
+                    position_id=vote_data["position_id"],
+                    candidate_id=vote_data["candidate_id"]
+                )
+                db_session.add(vote_selection)
+            db_session.flush()
+        # The votes version is bumped after commit, outside this transaction (see conditional.py)
+        run_after_commit(db_session, partial(deferred_bumps.mark, votes_scope(election_id)))
+        run_after_commit(db_session, partial(voted_index.record, election_id, student_id))
+        run_after_commit(db_session, partial(
+            turnout_analytics.record_ballot, election_id, department_id, year_of_study
+        ))
+        run_after_commit(db_session, partial(turnout_series.record, election_id, ballot.submitted_at))
+        run_after_commit(db_session, record_ballot)
+        run_after_commit(db_session, partial(waiting_room.complete, str(election_id), str(student_id)))
         
         # Return success response
         return jsonify({
             "message": "Vote submitted successfully",
             "ballot_id": ballot.id,
             "election_id": election_id,
-            "submitted_at": ballot.submitted_at.isoformat(),
+            "submitted_at": ballot.submitted_at,
             "votes_count": len(vote_selections)
         }), 201
 
 
+@voting_bp.route("/waiting-room/<election_id>/join", methods=["POST"])
+@session_required()
+def join_waiting_room(election_id):
+    """Let a student in to vote, or queue them while the election's waiting room is open."""
+    data = request.get_json(silent=True) or {}
+    student_id = data.get('student_id')
+    claims = current_session()
+    if claims is not None:
+        profile = _session_profile(claims)
+        if profile is None:
+            return jsonify({"error": "Student profile not found for this user"}), 404
+        if student_id and str(student_id) != profile[0]:
+            return jsonify({"error": "This session belongs to a different student"}), 403
+        student_id = profile[0]
+    if not student_id:
+        return jsonify({"error": "student_id is required"}), 400
+
+    # Rooms and voting sessions are held in memory; only real students and elections get them
+    if not _student_known(str(student_id)):
+        return jsonify({"error": "Student not found"}), 404
+    if voted_index.has_voted(election_id, str(student_id)) is None:
+        return jsonify({"error": "Election not found"}), 404
+    response = jsonify(waiting_room.join(election_id, str(student_id)))
+    response.headers["Cache-Control"] = "no-store"
+    return response, 200
+
+
+@voting_bp.route("/waiting-room/status", methods=["GET"])
+def waiting_room_status():
+    """Queue position for a waiting-room token (never touches the database)."""
+    status = waiting_room.status(request.args.get("token") or request.headers.get("X-Queue-Token"))
+    if status is None:
+        return jsonify({"error": "Invalid or expired queue token"}), 400
+    response = jsonify(status)
+    response.headers["Cache-Control"] = "no-store"
+    return response, 200
+
+
 @voting_bp.route("/status/<student_id>/<election_id>", methods=["GET"])
+@session_required(student_arg="student_id")
+# The votes version is bumped up to VOTES_VERSION_INTERVAL_MS after a ballot commits; the student's own
+# has-voted bit is set as soon as it commits, so a status check right after voting never gets a stale 304
+@conditional("election:{election_id}", STUDENTS, "votes:{election_id}",
+             vary=lambda student_id, election_id: voted_index.has_voted(election_id, student_id))
 def get_voting_status(student_id, election_id):
     """Check if a student has already voted in an election."""
+    # Check if student exists
+    if not _student_known(student_id):
+        return jsonify({"error": "Student not found"}), 404
+    
+    # Election existence and the has-voted flag come from the in-memory index
+    has_voted = voted_index.has_voted(election_id, student_id)
+    if has_voted is None:
+        return jsonify({"error": "Election not found"}), 404
+    
+    if not has_voted:
+        return jsonify({
+            "has_voted": False
+        }), 200
+    
     with get_session() as db_session:
-        # Check if student exists
-        student = db_session.query(Student).filter(Student.id == student_id).first()
-        if not student:
-            return jsonify({"error": "Student not found"}), 404
-        
-        # Check if election exists
-        election = db_session.query(Election).filter(Election.id == election_id).first()
-        if not election:
-            return jsonify({"error": "Election not found"}), 404
-        
-        # Check if student has voted
-        ballot = db_session.query(Ballot).filter(
-            and_(Ballot.election_id == election_id, Ballot.student_id == student_id)
-        ).first()
-        
-        if ballot:
-            # Get vote selections
-            vote_selections = db_session.query(VoteSelection).filter(
-                VoteSelection.ballot_id == ballot.id
-            ).all()
-            
-            return jsonify({
-                "has_voted": True,
-                "ballot_id": ballot.id,
-                "submitted_at": ballot.submitted_at.isoformat(),
-                "votes_count": len(vote_selections)
-            }), 200
-        else:
-            return jsonify({
-                "has_voted": False
-            }), 200
+        ballot = ballot_status(db_session, election_id, student_id)
+    if not ballot:
+        # Indexed by another worker but not visible here yet
+        return jsonify({"has_voted": False}), 200
+    
+    return jsonify({
+        "has_voted": True,
+        "ballot_id": ballot.id,
+        "submitted_at": ballot.submitted_at,
+        "votes_count": ballot.votes_count
+    }), 200
+
+
+@voting_bp.route("/status/<student_id>", methods=["GET"])
+@session_required(student_arg="student_id")
+def get_voting_statuses(student_id):
+    """Check whether a student has voted, for every election in one call."""
+    if not _student_known(student_id):
+        return jsonify({"error": "Student not found"}), 404
+    
+    with get_session() as db_session:
+        elections = election_summaries(
+            db_session, [ELECTION_STATUS_UPCOMING, ELECTION_STATUS_ACTIVE, ELECTION_STATUS_COMPLETED]
+        )
+    statuses = voted_index.statuses(student_id, [election.id for election in elections])
+    
+    return jsonify({
+        "student_id": student_id,
+        "elections": [
+            {
+                "election_id": election.id,
+                "title": election.title,
+                "status": election.status,
+                "has_voted": statuses[election.id]
+            }
+            for election in elections
+        ],
+        "total": len(elections)
+    }), 200
+
+
+def _session_profile(claims):
+    """(student_id, department_id, year_of_study) of a session, or None if its user has no profile."""
+    if claims["sid"]:
+        return claims["sid"], claims["dept"], claims["year"]
+    # Token issued before the profile was created; look the profile up rather than refuse
+    with get_session() as db_session:
+        student = student_by_user_id(db_session, claims["uid"])
+        if student is None:
+            return None
+        return str(student.id), str(student.department_id), student.year_of_study
+
+
+def _student_known(student_id):
+    """Whether the student exists; students seen before are answered from the voted index."""
+    if voted_index.knows_student(student_id):
+        return True
+    with get_session() as db_session:
+        if not student_exists(db_session, student_id):
+            return False
+    voted_index.add_student(student_id)
+    return True
 
 
 @voting_bp.route("/elections/active", methods=["GET"])
+@snapshot_read
+@conditional(CATALOG)
 def get_active_elections():
     """Get all active elections for voting."""
     with get_session() as db_session:
@@ -274,8 +405,8 @@ def get_active_elections():
                 "title": election.title,
                 "election_year": election.election_year,
                 "status": election.status,
-                "start_time": election.start_time.isoformat() if election.start_time else None,
-                "end_time": election.end_time.isoformat() if election.end_time else None,
+                "start_time": election.start_time,
+                "end_time": election.end_time,
             }
             for election in elections
         ]
@@ -287,6 +418,8 @@ def get_active_elections():
 
 
 @voting_bp.route("/elections/upcoming", methods=["GET"])
+@snapshot_read
+@conditional(CATALOG)
 def get_upcoming_elections():
     """Get all upcoming elections."""
     with get_session() as db_session:
@@ -300,8 +433,8 @@ def get_upcoming_elections():
                 "title": election.title,
                 "election_year": election.election_year,
                 "status": election.status,
-                "start_time": election.start_time.isoformat() if election.start_time else None,
-                "end_time": election.end_time.isoformat() if election.end_time else None,
+                "start_time": election.start_time,
+                "end_time": election.end_time,
             }
             for election in elections
         ]
@@ -3,7 +3,25 @@ from flask import Flask, jsonify, request, send_from_directory
 from flask_cors import CORS
 from dotenv import load_dotenv
 
-from database import create_all_tables
+from database import create_all_tables, engine, replica_engine, POOL_ADAPTIVE, pool_min, pool_max
+from photo_store import create_photo_store
+from compression import Compression
+from response_cache import init_response_cache
+from voted_index import voted_index
+from turnout import turnout_analytics
+from turnout_series import turnout_series
+from waiting_room import waiting_room
+from json_provider import FastJSONProvider
+from metrics import init_metrics
+from query_tracker import init_query_tracking, install as track_queries
+from slow_queries import init_slow_query_log
+from profiling import init_profiling
+from tracing import init_tracing, instrument_engine as trace_queries
+from replica import router as replica_router
+from pool_control import init_pool_controller
+from admission import init_admission
+from degraded import init_degraded_mode
+from session_tokens import session_tokens
 from routes.auth_routes import auth_bp
 from routes.candidate_routes import candidate_bp
 from routes.voting_routes import voting_bp
@@ -14,6 +32,39 @@ def create_app() -> Flask:
     # Load environment variables from backend/.env if present
     load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env"), override=False)
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+
+    # Stack-sampling profiles of requests with a signed X-Profile-Token (or PROFILE_SAMPLE_RATE)
+    init_profiling(app)
+
+    # Sampled request traces (request, SQL, hashing, OTP, mail spans) as JSON lines
+    init_tracing(app, engine)
+
+    # Per-request statement counts (N+1 warnings with QUERY_DEBUG=true) and Prometheus metrics at /metrics
+    init_query_tracking(app, engine)
+    init_metrics(app, engine)
+
+    # While the database is unreachable: stale snapshots for cached reads, fast 503s for the rest
+    init_degraded_mode(app)
+
+    # Per-class concurrency limits (vote/auth/read/admin); excess requests get 503 + Retry-After
+    init_admission(app)
+
+    # Replica statements count towards the same per-request budgets and traces
+    if replica_engine is not None:
+        track_queries(replica_engine)
+        trace_queries(replica_engine)
+
+    # Grow/shrink the retained connections from checkout wait times (DB_POOL_ADAPTIVE=true)
+    pool_controllers = {}
+    for name, pool_engine in (("primary", engine), ("replica", replica_engine)):
+        if POOL_ADAPTIVE and pool_engine is not None:
+            controller = init_pool_controller(pool_engine, pool_min, pool_max)
+            if controller is not None:
+                pool_controllers[name] = controller
+
+    # Statements over SLOW_QUERY_MS, with sampled EXPLAIN plans, at /api/admin/slow-queries
+    init_slow_query_log(app, engine)
 
     allowed_origins = os.getenv("ALLOWED_ORIGINS", "http://localhost:5173").split(",")
     CORS(
@@ -30,17 +81,67 @@ def create_app() -> Flask:
     app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
     app.config['ALLOWED_EXTENSIONS'] = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
 
-    # Serve uploaded files
-    @app.route('/uploads/candidates/<filename>')
+    # Content-addressed photo store; unreferenced files are garbage collected
+    photo_store = create_photo_store(uploads_dir)
+    app.extensions['photo_store'] = photo_store
+    if os.getenv("PHOTO_GC_ENABLED", "true").lower() == "true":
+        photo_store.start_collector()
+
+    # Serve uploaded files (names never change content, so let clients cache them)
+    @app.route('/uploads/candidates/<path:filename>')
     def uploaded_file(filename):
-        return send_from_directory(uploads_dir, filename)
+        return send_from_directory(uploads_dir, filename, max_age=365 * 24 * 3600)
+
+    # Gzip/brotli compression for large JSON responses
+    compression = Compression(app)
+
+    # Election-scoped cache for hot candidate and results endpoints
+    response_cache = init_response_cache(app)
 
     create_all_tables()
 
+    # Has-voted bitmaps, turnout counters and turnout time series, rebuilt from ballots
+    voted_index.load()
+    turnout_analytics.load()
+    turnout_series.load()
+    turnout_series.start_persister()
+    turnout_series.start_sync()
+
+    # Revoked session tokens, reloaded from the database every few seconds
+    session_tokens.start_refresher()
+
     @app.get("/api/health")
     def health():
         return jsonify({"status": "ok"})
 
+    @app.get("/api/health/replica")
+    def replica_health():
+        replica_router.healthy()  # refresh the lag measurement if due
+        return jsonify(replica_router.stats())
+
+    @app.get("/api/health/waiting-room")
+    def waiting_room_health():
+        return jsonify(waiting_room.stats())
+
+    @app.get("/api/health/pool")
+    def pool_health():
+        return jsonify({
+            "adaptive": POOL_ADAPTIVE,
+            "pools": {name: controller.stats() for name, controller in pool_controllers.items()},
+        })
+
+    @app.get("/api/health/caches")
+    def cache_stats():
+        return jsonify({
+            "response_cache": response_cache.stats(),
+            "compressed_cache": {
+                "bytes": compression.cache.current_bytes,
+                "max_bytes": compression.cache.max_bytes,
+                "hits": compression.cache.hits,
+                "misses": compression.cache.misses,
+            },
+        })
+
     # Register blueprints
     app.register_blueprint(auth_bp)
     app.register_blueprint(candidate_bp)
@@ -0,0 +1,187 @@
+"""
+Signed, expiring session tokens.
+
+``login`` and ``otp_login`` return a token. It carries the user id, the
+student id, department and year of study (if the user has a student
+profile), and the admin and verified flags. Clients send it back as
+``Authorization: Bearer <token>``. Verifying a token means checking an
+HMAC-SHA256 signature, the expiry and an in-memory revocation set, so the
+routes that use it learn who is calling without querying the database.
+
+Token format: ``<key id>.<base64url JSON claims>.<base64url signature>``.
+``SESSION_TOKEN_KEYS`` lists ``id:secret`` pairs, separated by commas. The
+first key signs new tokens and all of them verify. To rotate, put a new
+key first and drop the old one after ``SESSION_TOKEN_TTL`` (8 hours). The
+keys are required unless ``FLASK_ENV=development``. Only then does a
+process without keys make up its own random key, so its tokens fail on
+every other worker and after a restart.
+
+``POST /api/auth/logout`` revokes a token. Revocations are stored in
+``revoked_sessions`` until the token would have expired anyway. Each
+process reloads that small list every ``SESSION_REVOCATION_REFRESH_SECONDS``
+(5), so a revocation reaches every worker within that time.
+
+Until ``SESSION_TOKENS_REQUIRED=true``, requests without a token are still
+served the old way, identified by the ids in the request.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from datetime import datetime
+from functools import wraps
+
+from flask import g, jsonify, request
+from sqlalchemy import delete, select
+
+from database import get_session, RevokedSession
+
+TOKENS_REQUIRED = os.getenv("SESSION_TOKENS_REQUIRED", "false").lower() == "true"
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _parse_keys(value: str | None) -> dict[str, bytes]:
+    keys = {}
+    for entry in (value or "").split(","):
+        kid, _, secret = entry.strip().partition(":")
+        if kid and secret:
+            keys[kid] = secret.encode()
+    return keys
+
+
+class SessionTokens:
+    def __init__(self, keys: dict[str, bytes], ttl_seconds: int, refresh_seconds: float):
+        self.keys = keys
+        self.signing_kid = next(iter(keys))
+        self.ttl = ttl_seconds
+        self.refresh_seconds = refresh_seconds
+        self._revoked: set[str] = set()  # jti of revoked, not yet expired tokens
+        self._thread = None
+
+    def _sign(self, kid: str, payload: str) -> str:
+        return _b64encode(hmac.new(self.keys[kid], f"{kid}.{payload}".encode(), hashlib.sha256).digest())
+
+    def issue(self, user, student=None) -> tuple[str, int]:
+        """Token for user (and their student profile, if any) and its expiry in unix seconds."""
+        now = int(time.time())
+        claims = {
+            "jti": secrets.token_hex(16),
+            "iat": now,
+            "exp": now + self.ttl,
+            "uid": str(user.id),
+            "admin": bool(user.is_admin),
+            "verified": bool(user.is_verified),
+            "sid": str(student.id) if student is not None else None,
+            "dept": str(student.department_id) if student is not None else None,
+            "year": student.year_of_study if student is not None else None,
+        }
+        payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        return f"{self.signing_kid}.{payload}.{self._sign(self.signing_kid, payload)}", claims["exp"]
+
+    def verify(self, token: str | None) -> dict | None:
+        """Claims of a well-signed, unexpired, unrevoked token; None otherwise."""
+        parts = (token or "").split(".")
+        if len(parts) != 3 or parts[0] not in self.keys:
+            return None
+        kid, payload, signature = parts
+        if not hmac.compare_digest(signature, self._sign(kid, payload)):
+            return None
+        try:
+            claims = json.loads(_b64decode(payload))
+        except ValueError:
+            return None
+        if claims.get("exp", 0) < time.time() or claims.get("jti") in self._revoked:
+            return None
+        return claims
+
+    def revoke(self, claims: dict) -> None:
+        self._revoked.add(claims["jti"])
+        with get_session() as session:
+            session.merge(RevokedSession(
+                jti=claims["jti"], user_id=claims["uid"], expires_at=datetime.utcfromtimestamp(claims["exp"]),
+            ))
+
+    def refresh_revocations(self) -> int:
+        """Reload the revocation list, dropping expired entries; return its size."""
+        now = datetime.utcnow()
+        with get_session() as session:
+            session.execute(delete(RevokedSession).where(RevokedSession.expires_at < now))
+            revoked = set(session.execute(select(RevokedSession.jti)).scalars())
+        self._revoked = revoked
+        return len(self._revoked)
+
+    def start_refresher(self) -> None:
+        if self._thread is not None:
+            return
+
+        def run():
+            while True:
+                try:
+                    self.refresh_revocations()
+                except Exception as e:
+                    print(f"⚠️  Session revocation refresh failed: {e}")
+                time.sleep(self.refresh_seconds)
+
+        self._thread = threading.Thread(target=run, name="session-revocations", daemon=True)
+        self._thread.start()
+
+
+_keys = _parse_keys(os.getenv("SESSION_TOKEN_KEYS"))
+if not _keys:
+    if os.getenv("FLASK_ENV") != "development":
+        raise RuntimeError("SESSION_TOKEN_KEYS must be set (key-id:secret pairs) outside FLASK_ENV=development")
+    print("⚠️  SESSION_TOKEN_KEYS is not set; session tokens use a random per-process key")
+    _keys = {"dev": secrets.token_bytes(32)}
+
+session_tokens = SessionTokens(
+    _keys,
+    ttl_seconds=int(os.getenv("SESSION_TOKEN_TTL", str(8 * 3600))),
+    refresh_seconds=float(os.getenv("SESSION_REVOCATION_REFRESH_SECONDS", "5")),
+)
+
+
+def current_session() -> dict | None:
+    """Claims of the request's bearer token, verified once per request."""
+    if "session_claims" not in g:
+        header = request.headers.get("Authorization", "")
+        g.session_claims = session_tokens.verify(header[7:]) if header.startswith("Bearer ") else None
+    return g.session_claims
+
+
+def session_required(admin: bool = False, student_arg: str | None = None, always: bool = False):
+    """Check the bearer token before the view runs.
+
+    A request that presents a token must present a valid one. With admin=True
+    the token must belong to an admin. With student_arg, the named view
+    argument must be the token's own student id, unless the caller is an
+    admin. Requests without a token are let through until
+    SESSION_TOKENS_REQUIRED is on, or never with always=True (for views
+    that did not exist before tokens did, such as monitoring).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            claims = current_session()
+            if claims is None:
+                if always or TOKENS_REQUIRED or "Authorization" in request.headers:
+                    return jsonify({"error": "A valid session token is required. Please log in again."}), 401
+                return view(*args, **kwargs)
+            if admin and not claims["admin"]:
+                return jsonify({"error": "Admin access required"}), 403
+            if student_arg and not claims["admin"] and str(kwargs.get(student_arg)) != claims["sid"]:
+                return jsonify({"error": "This session belongs to a different student"}), 403
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
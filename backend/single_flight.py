@@ -0,0 +1,59 @@
+"""
+Single-flight execution: concurrent calls with the same key share one run.
+
+The first caller for a key runs the function; callers arriving while it is
+in flight wait for it and get the same result (or exception). Nothing is
+remembered once the call finishes, so this only coalesces concurrent work;
+caching is up to the caller.
+"""
+
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent identical computations within one process."""
+
+    def __init__(self):
+        self.executions = 0
+        self.shared = 0
+        self._calls: dict = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Run fn() unless a call for key is already in flight, and return its result."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self, key) -> bool:
+        with self._lock:
+            return key in self._calls
@@ -0,0 +1,156 @@
+"""
+Slow-query log with sampled EXPLAIN plans.
+
+Engine events time every statement. Statements slower than
+``SLOW_QUERY_MS`` are printed and kept in a bounded in-memory log
+(``SLOW_QUERY_LOG_SIZE`` entries per process) with the route that ran them
+and the elapsed time. Parameter values are never logged, only their types.
+
+On PostgreSQL a ``SLOW_QUERY_EXPLAIN_SAMPLE`` fraction of slow SELECTs is
+re-run under ``EXPLAIN (ANALYZE, BUFFERS)`` by a background thread on its
+own connection, and the plan is attached to the log entry. Only SELECTs
+without row locks are explained, since ANALYZE really executes the statement. Admins read the
+log at ``GET /api/admin/slow-queries``.
+"""
+
+import os
+import queue
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from flask import Flask, has_request_context, jsonify, request
+from sqlalchemy import event
+
+from session_tokens import session_required
+
+EXPLAIN_PREFIX = "EXPLAIN (ANALYZE, BUFFERS) "
+# ANALYZE executes the statement, so these would take row locks
+LOCKING_CLAUSE = re.compile(r"\bFOR\s+(NO\s+KEY\s+UPDATE|UPDATE|SHARE|KEY\s+SHARE)\b", re.IGNORECASE)
+
+_logs: dict = {}  # engine -> SlowQueryLog, so several apps share one set of listeners
+
+
+def _redact(parameters, executemany: bool):
+    if executemany:
+        return f"<{len(parameters)} parameter sets>"
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return None
+
+
+def _route() -> str:
+    if not has_request_context():
+        return "<background>"
+    rule = request.url_rule.rule if request.url_rule is not None else request.path
+    return f"{request.method} {rule}"
+
+
+class SlowQueryLog:
+    """Bounded log of statements slower than threshold_ms, with optional sampled plans."""
+
+    def __init__(self, engine, threshold_ms: float, max_entries: int = 200, explain_sample: float = 0.0):
+        self.engine = engine
+        self.threshold = threshold_ms / 1000
+        self.explain_sample = explain_sample if engine.dialect.name == "postgresql" else 0.0
+        self.recorded = 0
+        self.explained = 0
+        self._entries: deque[dict] = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+        self._explain_queue: queue.Queue = queue.Queue(maxsize=16)
+        self._thread = None
+
+    def install(self) -> None:
+        event.listen(self.engine, "before_cursor_execute", self._before)
+        event.listen(self.engine, "after_cursor_execute", self._after)
+        event.listen(self.engine, "handle_error", self._failed)
+        if self.explain_sample > 0:
+            self._thread = threading.Thread(target=self._run_explainer, name="slow-query-explain", daemon=True)
+            self._thread.start()
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["slow_query_started"].pop()
+        if elapsed < self.threshold or statement.startswith(EXPLAIN_PREFIX):
+            return
+
+        entry = {
+            "at": datetime.utcnow(),
+            "route": _route(),
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "statement": statement,
+            "parameters": _redact(parameters, executemany),
+            "plan": None,
+        }
+        with self._lock:
+            self._entries.append(entry)
+            self.recorded += 1
+        print(f"🐢 Slow query ({entry['elapsed_ms']} ms) in {entry['route']}: {' '.join(statement.split())[:300]}")
+
+        if (
+            self.explain_sample > 0 and not executemany
+            and statement.lstrip().upper().startswith("SELECT") and not LOCKING_CLAUSE.search(statement)
+            and random.random() < self.explain_sample
+        ):
+            try:
+                # The real parameters only live in this queue until the plan is captured
+                self._explain_queue.put_nowait((entry, statement, parameters))
+            except queue.Full:
+                pass  # the explainer is behind; skip this sample
+
+    def _failed(self, context):
+        if context.connection is not None and context.connection.info.get("slow_query_started"):
+            context.connection.info["slow_query_started"].pop()
+
+    def _run_explainer(self) -> None:
+        while True:
+            entry, statement, parameters = self._explain_queue.get()
+            try:
+                with self.engine.connect() as conn:
+                    conn.exec_driver_sql("SET LOCAL statement_timeout = '30s'")
+                    rows = conn.exec_driver_sql(EXPLAIN_PREFIX + statement, parameters).all()
+                    conn.rollback()
+                with self._lock:
+                    entry["plan"] = "\n".join(row[0] for row in rows)
+                    self.explained += 1
+            except Exception as e:
+                with self._lock:
+                    entry["plan"] = f"EXPLAIN failed: {e}"
+
+    def entries(self) -> list[dict]:
+        """Logged slow statements, slowest first."""
+        with self._lock:
+            return sorted((dict(entry) for entry in self._entries), key=lambda entry: -entry["elapsed_ms"])
+
+
+def init_slow_query_log(app: Flask, engine) -> SlowQueryLog:
+    log = _logs.get(engine)
+    if log is None:
+        log = _logs[engine] = SlowQueryLog(
+            engine,
+            threshold_ms=float(os.getenv("SLOW_QUERY_MS", "200")),
+            max_entries=int(os.getenv("SLOW_QUERY_LOG_SIZE", "200")),
+            explain_sample=float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE", "0")),
+        )
+        log.install()
+    app.extensions["slow_query_log"] = log
+
+    @app.get("/api/admin/slow-queries")
+    @session_required(admin=True, always=True)  # statements and plans reveal the schema and data shapes
+    def slow_queries():
+        return jsonify({
+            "threshold_ms": log.threshold * 1000,
+            "explain_sample": log.explain_sample,
+            "recorded": log.recorded,
+            "explained": log.explained,
+            "queries": log.entries(),
+        })
+
+    return log
@@ -0,0 +1,256 @@
+"""
+Lightweight request tracing in the OpenTelemetry span model.
+
+Each sampled request gets a trace: a SERVER span for the Flask request with
+child spans for every SQL statement (CLIENT) and for instrumented work such
+as password hashing, OTP creation and email/SMS delivery (``span()`` /
+``@traced``). Spans carry OpenTelemetry-style ids, timestamps in unix nanos,
+attributes and status, and are exported as JSON lines by a background
+thread to ``TRACE_FILE`` (stdout if unset).
+
+Sampling is decided once per request: an incoming W3C ``traceparent``
+header with the sampled flag is honoured when it comes from one of
+``TRACE_TRUSTED_PROXIES`` and fewer than ``TRACE_MAX_FORCED_PER_SECOND``
+requests were forced this second; otherwise ``TRACE_SAMPLE_RATE``
+(default 1%) of requests are traced. Unsampled requests only pay for one
+context-variable lookup per instrumentation point. Sampled responses carry
+a ``traceparent`` header to correlate client and server logs.
+"""
+
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from flask import Flask, g, request
+from sqlalchemy import event
+
+_current: ContextVar["Span | None"] = ContextVar("trace_span", default=None)
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start", "attributes", "status", "message")
+
+    def __init__(self, name: str, kind: str, trace_id: str, parent_id: str | None, attributes: dict):
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start = time.time_ns()
+        self.attributes = attributes
+        self.status = "UNSET"
+        self.message = None
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, error: BaseException | str) -> None:
+        self.status, self.message = "ERROR", str(error)
+
+    def finish(self) -> None:
+        end = time.time_ns()
+        exporter.export({
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_time_unix_nano": self.start,
+            "end_time_unix_nano": end,
+            "duration_ms": round((end - self.start) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": {"code": self.status, "message": self.message} if self.message else {"code": self.status},
+        })
+
+
+class SpanExporter:
+    """Writes finished spans as JSON lines from a background thread; drops spans if it falls behind."""
+
+    def __init__(self, path: str | None, max_queue: int = 10000):
+        self.path = path
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+            self._thread.start()
+
+    def export(self, span: dict) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        out = open(self.path, "a", buffering=1) if self.path else sys.stdout
+        while True:
+            span = self._queue.get()
+            try:
+                out.write(json.dumps(span, default=str) + "\n")
+            except Exception as e:
+                print(f"⚠️  Trace export failed: {e}")
+
+
+exporter = SpanExporter(os.getenv("TRACE_FILE") or None)
+
+
+@contextmanager
+def span(name: str, kind: str = "INTERNAL", **attributes):
+    """Child span of the current span; a no-op (yielding None) when the request is not sampled."""
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(name, kind, parent.trace_id, parent.span_id, attributes)
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.set_error(e)
+        raise
+    finally:
+        _current.reset(token)
+        child.finish()
+
+
+def traced(name: str):
+    """Decorator form of span()."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return fn(*args, **kwargs)
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _parse_traceparent(header: str | None) -> tuple[str, str, bool] | None:
+    """(trace_id, parent span_id, sampled) from a W3C traceparent header."""
+    parts = (header or "").split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        return parts[1], parts[2], bool(int(parts[3], 16) & 1)
+    except ValueError:
+        return None
+
+
+class Tracer:
+    def __init__(self, sample_rate: float, trusted_proxies: set[str], max_forced_per_second: int):
+        self.sample_rate = sample_rate
+        self.trusted_proxies = trusted_proxies
+        self.max_forced_per_second = max_forced_per_second
+        self._forced_second = 0
+        self._forced = 0
+        self._lock = threading.Lock()
+
+    def _may_force(self) -> bool:
+        """Whether this request may be traced because its caller set the sampled flag."""
+        # Any client can set the flag, so only follow it from our own proxies, and at a bounded rate
+        if request.remote_addr not in self.trusted_proxies:
+            return False
+        second = int(time.monotonic())
+        with self._lock:
+            if second != self._forced_second:
+                self._forced_second, self._forced = second, 0
+            if self._forced >= self.max_forced_per_second:
+                return False
+            self._forced += 1
+            return True
+
+    def install(self, app: Flask, engine) -> None:
+        app.before_request(self._start_request)
+        app.after_request(self._finish_response)
+        app.teardown_request(self._end_request)
+        instrument_engine(engine)
+
+    def _start_request(self):
+        incoming = _parse_traceparent(request.headers.get("traceparent"))
+        if incoming is not None:
+            trace_id, parent_id, sampled = incoming
+            if sampled and not self._may_force():
+                sampled = random.random() < self.sample_rate
+        else:
+            trace_id, parent_id, sampled = None, None, random.random() < self.sample_rate
+        if not sampled:
+            return
+        root = Span(
+            f"{request.method} {request.url_rule.rule if request.url_rule is not None else request.path}",
+            "SERVER", trace_id or f"{random.getrandbits(128):032x}", parent_id,
+            {"http.method": request.method, "http.target": request.path, "http.route": getattr(request.url_rule, "rule", None)},
+        )
+        g.trace_span, g.trace_token = root, _current.set(root)
+
+    def _finish_response(self, response):
+        root = g.get("trace_span")
+        if root is not None:
+            root.set_attribute("http.status_code", response.status_code)
+            if response.status_code >= 500:
+                root.status = "ERROR"
+            response.headers["traceparent"] = f"00-{root.trace_id}-{root.span_id}-01"
+        return response
+
+    def _end_request(self, exc):
+        root = g.pop("trace_span", None)
+        if root is None:
+            return
+        if exc is not None:
+            root.set_error(exc)
+        _current.reset(g.pop("trace_token"))
+        root.finish()
+
+
+def instrument_engine(engine) -> None:
+    """Record a CLIENT span for each statement engine runs in a sampled request."""
+    if not event.contains(engine, "before_cursor_execute", _start_query):
+        event.listen(engine, "before_cursor_execute", _start_query)
+        event.listen(engine, "after_cursor_execute", _end_query)
+        event.listen(engine, "handle_error", _failed_query)
+
+
+def _start_query(conn, cursor, statement, parameters, context, executemany):
+    parent = _current.get()
+    if parent is not None:
+        query = Span("db.query", "CLIENT", parent.trace_id, parent.span_id, {
+            "db.system": conn.dialect.name,
+            "db.statement": " ".join(statement.split())[:500],
+        })
+        conn.info.setdefault("trace_spans", []).append(query)
+
+
+def _end_query(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None and conn.info.get("trace_spans"):
+        query = conn.info["trace_spans"].pop()
+        if cursor.rowcount >= 0:
+            query.set_attribute("db.rowcount", cursor.rowcount)
+        query.finish()
+
+
+def _failed_query(context):
+    if _current.get() is not None and context.connection is not None and context.connection.info.get("trace_spans"):
+        query = context.connection.info["trace_spans"].pop()
+        query.set_error(context.original_exception)
+        query.finish()
+
+
+def init_tracing(app: Flask, engine) -> Tracer:
+    tracer = Tracer(
+        float(os.getenv("TRACE_SAMPLE_RATE", "0.01")),
+        {addr.strip() for addr in os.getenv("TRACE_TRUSTED_PROXIES", "127.0.0.1,::1").split(",") if addr.strip()},
+        int(os.getenv("TRACE_MAX_FORCED_PER_SECOND", "10")),
+    )
+    tracer.install(app, engine)
+    exporter.start()
+    app.extensions["tracer"] = tracer
+    return tracer
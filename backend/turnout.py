@@ -0,0 +1,178 @@
+"""
+Turnout analytics by department and year of study.
+
+Keeps, in memory, the number of ballots cast per (election, department,
+year_of_study) and the number of students per (department, year_of_study)
+as the eligible population. Both are loaded with one GROUP BY each at
+startup and then updated incrementally after ballots and student profile
+changes commit, so a turnout breakdown costs O(departments x years)
+regardless of the size of the electorate.
+
+The eligible counts remember the ``students`` version they reflect and
+reload when a request sees that another worker process has moved it on.
+Ballot counts are split at a time boundary: ``settled`` holds ballots
+submitted before it, which have all committed (``COMMIT_SKEW_SECONDS``),
+and ``recent`` those after. Like the voted index, at most every
+``TURNOUT_SYNC_SECONDS``, or sooner when the request saw a newer
+``votes:<election>`` version, one grouped query over the ballots since the
+boundary adds the newly settled ones and replaces ``recent``. Ballots
+recorded locally go to ``recent`` until then.
+"""
+
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from conditional import current_versions, request_versions, votes_scope, STUDENTS
+from database import get_snapshot_session, Ballot, DataVersion, Election, Student
+from turnout_series import COMMIT_SKEW_SECONDS
+
+SYNC_SECONDS = float(os.getenv("TURNOUT_SYNC_SECONDS", "1"))
+
+
+class CastCounts:
+    """Ballots of one election per (department_id, year_of_study), settled before a boundary and recent after."""
+
+    __slots__ = ("settled", "recent", "boundary", "version", "synced_at")
+
+    def __init__(self):
+        self.settled = Counter()
+        self.recent = Counter()
+        self.boundary = None  # epoch seconds; None until the first sync
+        self.version = 0      # votes:<election> version accounted for
+        self.synced_at = 0.0
+
+    def total(self) -> Counter:
+        return self.settled + self.recent
+
+
+class TurnoutAnalytics:
+    """Ballots cast per (election, department, year) and eligible students per (department, year)."""
+
+    def __init__(self):
+        self._eligible: Counter = Counter()
+        self._eligible_version = 0
+        self._cast: dict[str, CastCounts] = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        """Rebuild all counters from students and ballots."""
+        # One snapshot, so each counter set holds exactly the rows its version accounts for
+        with get_snapshot_session() as session:
+            started = time.time()
+            versions = dict(session.execute(
+                select(DataVersion.scope, DataVersion.version).where(
+                    (DataVersion.scope == STUDENTS) | DataVersion.scope.like("votes:%")
+                )
+            ).all())
+            eligible = _eligible_counts(session)
+            election_ids = session.execute(select(Election.id)).scalars().all()
+            boundary = started - COMMIT_SKEW_SECONDS
+            rows = _cast_rows(session, None, boundary, by_election=True)
+
+        by_election = {}
+        for election_id in election_ids:
+            entry = by_election[election_id] = CastCounts()
+            entry.boundary, entry.synced_at = boundary, started
+            entry.version = versions.get(votes_scope(election_id), 0)
+        for election_id, department_id, year_of_study, settled, count in rows:
+            entry = by_election.get(election_id)
+            if entry is not None:
+                (entry.settled if settled else entry.recent)[(department_id, year_of_study)] = count
+        with self._lock:
+            self._eligible = eligible
+            self._eligible_version = versions.get(STUDENTS, 0)
+            self._cast = by_election
+
+    def breakdown(self, election_id: str) -> tuple[Counter, Counter] | None:
+        """(ballots cast, eligible students) per (department_id, year_of_study); None for an unknown election."""
+        scope = votes_scope(election_id)
+        versions = request_versions([scope, STUDENTS])
+        entry = self._cast_counts(election_id, versions[scope] or 0)
+        if entry is None:
+            return None
+        eligible = self._eligible_counts(versions[STUDENTS] or 0)
+        with self._lock:  # copies, since record_* mutate the counters in place
+            return entry.total(), Counter(eligible)
+
+    def _cast_counts(self, election_id: str, version: int) -> CastCounts | None:
+        """The election's counts, with ballots from other processes added if they are due a sync."""
+        entry = self._cast.get(election_id)
+        if entry is not None and entry.version >= version and time.time() - entry.synced_at < SYNC_SECONDS:
+            return entry
+
+        with get_snapshot_session() as session:
+            if entry is None and session.get(Election, election_id) is None:
+                return None
+            started = time.time()
+            since = entry.boundary if entry is not None else None
+            boundary = started - COMMIT_SKEW_SECONDS
+            version = current_versions(session, [votes_scope(election_id)]).get(votes_scope(election_id), 0)
+            rows = _cast_rows(session, since, boundary, election_id=election_id)
+
+        with self._lock:
+            entry = self._cast.setdefault(election_id, CastCounts())
+            if entry.boundary != since:
+                return entry  # another request synced past us meanwhile
+            entry.recent = Counter()
+            for department_id, year_of_study, settled, count in rows:
+                (entry.settled if settled else entry.recent)[(department_id, year_of_study)] += count
+            entry.boundary, entry.synced_at = boundary, started
+            entry.version = max(entry.version, version)
+            return entry
+
+    def _eligible_counts(self, version: int) -> Counter:
+        if self._eligible_version >= version:
+            return self._eligible
+        with get_snapshot_session() as session:
+            version = current_versions(session, [STUDENTS]).get(STUDENTS, 0)
+            eligible = _eligible_counts(session)
+        with self._lock:
+            if self._eligible_version < version:
+                self._eligible, self._eligible_version = eligible, version
+            return self._eligible
+
+    def record_ballot(self, election_id: str, department_id: str, year_of_study: str) -> None:
+        """Count a committed ballot as recent; the next sync replaces it with the database's count."""
+        with self._lock:
+            entry = self._cast.setdefault(election_id, CastCounts())
+            entry.recent[(department_id, year_of_study)] += 1
+
+    def record_student(self, old_key: tuple | None, new_key: tuple, version: int) -> None:
+        """Move a student between (department_id, year_of_study) groups after a profile change commits."""
+        with self._lock:
+            if self._eligible_version == version - 1:
+                if old_key is not None:
+                    self._eligible[old_key] -= 1
+                self._eligible[new_key] += 1
+                self._eligible_version = version
+
+
+def _cast_rows(session, since: float | None, boundary: float, election_id: str | None = None,
+               by_election: bool = False) -> list[tuple]:
+    """Ballot counts per (department_id, year_of_study, submitted before boundary) since the given time."""
+    settled = Ballot.submitted_at < datetime.utcfromtimestamp(boundary)
+    groups = [Student.department_id, Student.year_of_study, settled]
+    if by_election:
+        groups.insert(0, Ballot.election_id)
+    query = select(*groups, func.count()).join(Student, Ballot.student_id == Student.id).group_by(*groups)
+    if election_id is not None:
+        query = query.where(Ballot.election_id == election_id)
+    if since is not None:
+        query = query.where(Ballot.submitted_at >= datetime.utcfromtimestamp(since))
+    return session.execute(query).all()
+
+
+def _eligible_counts(session) -> Counter:
+    rows = session.execute(
+        select(Student.department_id, Student.year_of_study, func.count())
+        .group_by(Student.department_id, Student.year_of_study)
+    ).all()
+    return Counter({(department_id, year_of_study): count for department_id, year_of_study, count in rows})
+
+
+turnout_analytics = TurnoutAnalytics()
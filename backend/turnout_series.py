@@ -0,0 +1,270 @@
+"""
+Turnout-over-time series per election.
+
+Ballot submissions are bucketed in memory into fixed-size ring buffers at
+three resolutions: 1 second (last hour), 1 minute (last day) and 15 minutes
+(last week). Committed ballots are added as they happen, so serving a chart
+reads only these buffers and never the ``ballots`` table.
+
+The buffers are snapshotted to ``turnout_series_snapshots`` every
+``TURNOUT_SERIES_PERSIST_SECONDS``. On restart each election is restored
+from its snapshot and only ballots since shortly before it are backfilled,
+via the (election_id, submitted_at) index. Every
+``TURNOUT_SERIES_SYNC_SECONDS`` a background thread rebuilds the last few
+minutes of each election the same way, which picks up ballots committed by
+other workers and elections created since startup. Requests only read
+memory.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+
+from conditional import current_versions, votes_scope
+from database import get_session, get_snapshot_session, Ballot, Election, TurnoutSeriesSnapshot
+
+# name -> (bucket seconds, number of buckets)
+RESOLUTIONS = {
+    "1s": (1, 3600),
+    "1m": (60, 1440),
+    "15m": (900, 672),
+}
+# Rebuild boundaries are aligned to the coarsest bucket so no bucket is ever partially rebuilt
+ALIGN_SECONDS = 900
+# Ballots get submitted_at before their transaction commits; assume commits land within this
+COMMIT_SKEW_SECONDS = 60
+
+
+def _epoch(dt: datetime) -> float:
+    return dt.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _rebuild_from(synced_at: float) -> float:
+    """Aligned time from which ballots may be missing, given when the series was last in sync."""
+    return (synced_at - COMMIT_SKEW_SECONDS) // ALIGN_SECONDS * ALIGN_SECONDS
+
+
+class RingSeries:
+    """Counts per fixed-width time bucket over a sliding window of the latest buckets."""
+
+    __slots__ = ("seconds", "counts", "head")
+
+    def __init__(self, seconds: int, size: int):
+        self.seconds = seconds
+        self.counts = [0] * size
+        self.head = None  # index of the newest bucket seen
+
+    def add(self, ts: float, n: int = 1) -> None:
+        bucket, size = int(ts // self.seconds), len(self.counts)
+        if self.head is None:
+            self.head = bucket
+        elif bucket > self.head:
+            for stale in range(self.head + 1, min(bucket, self.head + size) + 1):
+                self.counts[stale % size] = 0
+            self.head = bucket
+        elif bucket <= self.head - size:
+            return  # older than the window
+        self.counts[bucket % size] += n
+
+    def truncate(self, ts: float) -> None:
+        """Forget buckets starting at or after ts (which must be bucket-aligned)."""
+        if self.head is None:
+            return
+        size = len(self.counts)
+        for bucket in range(max(int(ts // self.seconds), self.head - size + 1), self.head + 1):
+            self.counts[bucket % size] = 0
+
+    def points(self, now: float) -> list[tuple[float, int]]:
+        """(bucket start, count) for every bucket in the window ending at now, oldest first."""
+        current, size = int(now // self.seconds), len(self.counts)
+        points = []
+        for bucket in range(current - size + 1, current + 1):
+            live = self.head is not None and self.head - size < bucket <= self.head
+            points.append((bucket * self.seconds, self.counts[bucket % size] if live else 0))
+        return points
+
+    def to_dict(self) -> dict:
+        return {"head": self.head, "counts": self.counts}
+
+    def restore(self, data: dict) -> None:
+        if len(data["counts"]) == len(self.counts):
+            self.head, self.counts = data["head"], list(data["counts"])
+
+
+class ElectionSeries:
+    """Ring buffers of one election plus the sync state they reflect."""
+
+    def __init__(self):
+        self.rings = {name: RingSeries(seconds, size) for name, (seconds, size) in RESOLUTIONS.items()}
+        self.version = 0       # votes:<election> version accounted for
+        self.synced_at = 0.0   # all ballots up to shortly before this time are included
+        self.persisted_version = None
+
+    def add(self, ts: float, n: int = 1) -> None:
+        for ring in self.rings.values():
+            ring.add(ts, n)
+
+    def truncate(self, ts: float) -> None:
+        for ring in self.rings.values():
+            ring.truncate(ts)
+
+
+class TurnoutSeries:
+    """Per-election turnout time series, fed by committed ballots."""
+
+    def __init__(self, persist_seconds: int, sync_seconds: float):
+        self.persist_seconds = persist_seconds
+        self.sync_seconds = sync_seconds
+        self._elections: dict[str, ElectionSeries] = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._sync_thread = None
+
+    def load(self) -> None:
+        """Restore every election from its snapshot and backfill the ballots since."""
+        longest = max(seconds * size for seconds, size in RESOLUTIONS.values())
+        with get_snapshot_session() as session:
+            started = time.time()
+            election_ids = session.execute(select(Election.id)).scalars().all()
+            versions = current_versions(session, [votes_scope(election_id) for election_id in election_ids])
+            snapshots = {s.election_id: s for s in session.execute(select(TurnoutSeriesSnapshot)).scalars()}
+
+            elections = {}
+            for election_id in election_ids:
+                series = ElectionSeries()
+                snapshot = snapshots.get(election_id)
+                if snapshot is not None:
+                    for name, data in json.loads(snapshot.data).items():
+                        if name in series.rings:
+                            series.rings[name].restore(data)
+                    since = _rebuild_from(_epoch(snapshot.as_of))
+                    series.truncate(since)
+                else:
+                    since = (started - longest) // ALIGN_SECONDS * ALIGN_SECONDS
+                for (submitted_at,) in _ballots_since(session, election_id, since):
+                    series.add(_epoch(submitted_at))
+                series.version = versions.get(votes_scope(election_id), 0)
+                series.synced_at = started
+                elections[election_id] = series
+
+        with self._lock:
+            self._elections = elections
+        print(f"✅ Turnout series loaded for {len(elections)} elections ({len(snapshots)} from snapshots)")
+
+    def points(self, election_id: str, resolution: str) -> list[tuple[float, int]] | None:
+        """Buckets of the given resolution for the election; None if it is not known (yet)."""
+        now = time.time()
+        with self._lock:
+            series = self._elections.get(election_id)
+            return None if series is None else series.rings[resolution].points(now)
+
+    def sync(self) -> int:
+        """Rebuild every election's recent buckets from ballots; return how many elections changed."""
+        with self._lock:
+            synced_at = {election_id: series.synced_at for election_id, series in self._elections.items()}
+        with get_snapshot_session() as session:
+            started = time.time()
+            election_ids = session.execute(select(Election.id)).scalars().all()
+            versions = current_versions(session, [votes_scope(election_id) for election_id in election_ids])
+            updates = []
+            for election_id in election_ids:
+                version = versions.get(votes_scope(election_id), 0)
+                since = _rebuild_from(synced_at[election_id]) if election_id in synced_at else 0
+                ballots = [_epoch(submitted_at) for (submitted_at,) in _ballots_since(session, election_id, since)]
+                updates.append((election_id, version, since, ballots))
+
+        changed = 0
+        with self._lock:
+            for election_id, version, since, ballots in updates:
+                series = self._elections.setdefault(election_id, ElectionSeries())
+                if series.synced_at >= started:
+                    continue
+                series.truncate(since)
+                for ts in ballots:
+                    series.add(ts)
+                changed += series.version != version
+                series.version, series.synced_at = version, started
+        return changed
+
+    def start_sync(self) -> None:
+        """Run sync every sync_seconds in a daemon thread."""
+        if self._sync_thread is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(self.sync_seconds)
+                try:
+                    self.sync()
+                except Exception as e:
+                    print(f"⚠️  Turnout series sync failed: {e}")
+
+        self._sync_thread = threading.Thread(target=run, name="turnout-series-sync", daemon=True)
+        self._sync_thread.start()
+
+    def record(self, election_id: str, submitted_at: datetime) -> None:
+        """Add a committed ballot; the next sync rebuilds its bucket from the database."""
+        with self._lock:
+            series = self._elections.get(election_id)
+            if series is not None:
+                series.add(_epoch(submitted_at))
+
+    def persist(self) -> int:
+        """Write snapshots of elections that changed since the last persist; return how many."""
+        with self._lock:
+            changed = [
+                (election_id, series.version, series.synced_at, json.dumps(
+                    {name: ring.to_dict() for name, ring in series.rings.items()}, separators=(",", ":")
+                ))
+                for election_id, series in self._elections.items()
+                if series.persisted_version != series.version
+            ]
+        if not changed:
+            return 0
+
+        with get_session() as session:
+            for election_id, _, synced_at, data in changed:
+                session.merge(TurnoutSeriesSnapshot(
+                    election_id=election_id, as_of=datetime.utcfromtimestamp(synced_at), data=data
+                ))
+        with self._lock:
+            for election_id, version, _, _ in changed:
+                self._elections[election_id].persisted_version = version
+        return len(changed)
+
+    def start_persister(self) -> None:
+        """Snapshot the series every persist_seconds in a daemon thread."""
+        if self._thread is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(self.persist_seconds)
+                try:
+                    saved = self.persist()
+                    if saved:
+                        print(f"💾 Turnout series: persisted {saved} election(s)")
+                except Exception as e:
+                    print(f"⚠️  Turnout series persist failed: {e}")
+
+        self._thread = threading.Thread(target=run, name="turnout-series-persister", daemon=True)
+        self._thread.start()
+
+
+def _ballots_since(session, election_id: str, since: float):
+    return session.execute(
+        select(Ballot.submitted_at).where(
+            Ballot.election_id == election_id,
+            Ballot.submitted_at >= datetime.utcfromtimestamp(since),
+        )
+    )
+
+
+turnout_series = TurnoutSeries(
+    int(os.getenv("TURNOUT_SERIES_PERSIST_SECONDS", "60")),
+    float(os.getenv("TURNOUT_SERIES_SYNC_SECONDS", "2")),
+)
@@ -8,6 +8,9 @@ from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta
 from typing import Optional
 from database import get_session, OTP, User
+from lookups import user_by_email_or_phone
+from metrics import track_delivery
+from tracing import traced
 import re
 from dotenv import load_dotenv
 
@@ -45,6 +48,7 @@ def format_phone_number(phone: str) -> str:
     return phone
 
 
+@traced("otp.create")
 def create_otp(user_id: str, otp_type: str, session=None, expires_minutes: int = 10) -> str:
     """Create and store an OTP for a user."""
     code = generate_otp()
@@ -106,6 +110,8 @@ def verify_otp(user_id: str, code: str, otp_type: str) -> bool:
         return False
 
 
+@traced("otp.send.email")
+@track_delivery("email")
 def send_email_otp(email: str, otp_code: str) -> bool:
     """Send OTP via email using SMTP."""
     try:
@@ -172,6 +178,8 @@ def send_email_otp(email: str, otp_code: str) -> bool:
         return False
 
 
+@traced("otp.send.sms")
+@track_delivery("sms")
 def send_sms_otp(phone: str, otp_code: str) -> bool:
     """Send OTP via SMS. This is a placeholder implementation."""
     # In a real implementation, you would use an SMS service like Twilio, AWS SNS, etc.
@@ -190,16 +198,5 @@ def send_sms_otp(phone: str, otp_code: str) -> bool:
 
 def get_user_by_email_or_phone(identifier: str) -> Optional[User]:
     """Get user by email or phone number."""
-    from sqlalchemy.orm import joinedload
     with get_session() as session:
-        # Try to find by email first
-        user = session.query(User).options(joinedload(User.student)).filter(User.email == identifier).first()
-        if user:
-            return user
-        
-        # Try to find by phone
-        user = session.query(User).options(joinedload(User.student)).filter(User.phone == identifier).first()
-        if user:
-            return user
-        
-        return None
+        return user_by_email_or_phone(session, identifier)
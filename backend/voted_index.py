@@ -0,0 +1,183 @@
+"""
+In-memory "has voted" index.
+
+Every student gets a dense ordinal, and every election keeps a bitmap over
+those ordinals plus a running count of set bits, so "has this student voted
+here?" and "how many ballots were cast?" are answered from memory in O(1).
+
+The index is loaded from ``students`` and ``ballots`` at startup and updated
+after each local ballot commits. Ballots committed by other worker processes
+are picked up as deltas: at most every ``VOTED_INDEX_SYNC_SECONDS``, or
+sooner when the request has already read a newer ``votes:<election>``
+version than the bitmap reflects, the ballots submitted since the bitmap
+was last in sync (less ``COMMIT_SKEW_SECONDS``) are read through the
+(election_id, submitted_at) index and added. Ballots are never deleted,
+so adding one twice is harmless.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+
+from flask import g, has_app_context
+from sqlalchemy import and_, or_, select
+
+from conditional import current_versions, votes_scope
+from database import get_session, get_snapshot_session, Ballot, DataVersion, Election, Student
+from turnout_series import COMMIT_SKEW_SECONDS
+
+SYNC_SECONDS = float(os.getenv("VOTED_INDEX_SYNC_SECONDS", "1"))
+
+
+class ElectionBitmap:
+    """Bitmap over student ordinals with a count of set bits."""
+
+    __slots__ = ("bits", "count", "version", "synced_at")
+
+    def __init__(self, version: int = 0, synced_at: float = 0.0):
+        self.bits = bytearray()
+        self.count = 0
+        self.version = version      # votes:<election> version accounted for
+        self.synced_at = synced_at  # all ballots submitted up to shortly before this time are set
+
+    def add(self, ordinal: int) -> None:
+        byte, mask = ordinal >> 3, 1 << (ordinal & 7)
+        if byte >= len(self.bits):
+            self.bits.extend(bytes(byte + 1 - len(self.bits)))
+        if not self.bits[byte] & mask:
+            self.bits[byte] |= mask
+            self.count += 1
+
+    def __contains__(self, ordinal: int) -> bool:
+        byte = ordinal >> 3
+        return byte < len(self.bits) and bool(self.bits[byte] & (1 << (ordinal & 7)))
+
+
+class VotedIndex:
+    """Per-election has-voted bitmaps, kept in step with the votes:<election> versions."""
+
+    def __init__(self):
+        self._ordinals: dict[str, int] = {}
+        self._elections: dict[str, ElectionBitmap] = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        """Rebuild every election's bitmap from the database."""
+        # One snapshot, so each bitmap holds exactly the ballots its version accounts for
+        with get_snapshot_session() as session:
+            started = time.time()
+            versions = dict(session.execute(
+                select(DataVersion.scope, DataVersion.version).where(DataVersion.scope.like("votes:%"))
+            ).all())
+            student_ids = session.execute(select(Student.id).order_by(Student.created_at, Student.id)).scalars().all()
+            election_ids = session.execute(select(Election.id)).scalars().all()
+            ballots = session.execute(select(Ballot.election_id, Ballot.student_id)).all()
+
+        with self._lock:
+            self._ordinals = {}
+            for student_id in student_ids:
+                self._ordinal(student_id)
+            self._elections = {
+                election_id: ElectionBitmap(versions.get(votes_scope(election_id), 0), started)
+                for election_id in election_ids
+            }
+            for election_id, student_id in ballots:
+                bitmap = self._elections.get(election_id)
+                if bitmap is not None:
+                    bitmap.add(self._ordinal(student_id))
+        print(f"✅ Voted index loaded: {len(student_ids)} students, {len(election_ids)} elections, {len(ballots)} ballots")
+
+    def _ordinal(self, student_id: str) -> int:
+        ordinal = self._ordinals.get(student_id)
+        if ordinal is None:
+            ordinal = self._ordinals[student_id] = len(self._ordinals)
+        return ordinal
+
+    def _due(self, election_id: str) -> bool:
+        """Whether the election's bitmap is missing or due a sync."""
+        bitmap = self._elections.get(election_id)
+        if bitmap is None:
+            return True
+        # Only a version this request already looked up (e.g. for its ETag); never a query of its own
+        seen = (g.get("data_versions", {}).get(votes_scope(election_id)) if has_app_context() else None) or 0
+        return bitmap.version < seen or time.time() - bitmap.synced_at >= SYNC_SECONDS
+
+    def _sync(self, election_ids: list[str]) -> None:
+        """Add the ballots since each election's watermark, for all of them in one query."""
+        with self._lock:
+            watermarks = {
+                election_id: self._elections[election_id].synced_at if election_id in self._elections else 0.0
+                for election_id in election_ids
+            }
+        conditions = []
+        for election_id, synced_at in watermarks.items():
+            condition = Ballot.election_id == election_id
+            if synced_at:
+                condition = and_(condition, Ballot.submitted_at >= datetime.utcfromtimestamp(synced_at - COMMIT_SKEW_SECONDS))
+            conditions.append(condition)
+
+        with get_snapshot_session() as session:
+            started = time.time()
+            versions = current_versions(session, [votes_scope(election_id) for election_id in election_ids])
+            ballots = session.execute(select(Ballot.election_id, Ballot.student_id).where(or_(*conditions))).all()
+
+        with self._lock:
+            for election_id in election_ids:
+                bitmap = self._elections.setdefault(election_id, ElectionBitmap())
+                bitmap.version = max(bitmap.version, versions.get(votes_scope(election_id), 0))
+                bitmap.synced_at = max(bitmap.synced_at, started)
+            for election_id, student_id in ballots:
+                self._elections[election_id].add(self._ordinal(student_id))
+
+    def _bitmap(self, election_id: str) -> ElectionBitmap | None:
+        """The election's bitmap, with ballots from other processes added if it is due a sync."""
+        if self._due(election_id):
+            if election_id not in self._elections:
+                with get_session() as session:
+                    if session.get(Election, election_id) is None:
+                        return None
+            self._sync([election_id])
+        return self._elections.get(election_id)
+
+    def has_voted(self, election_id: str, student_id: str) -> bool | None:
+        """Whether the student voted in the election; None if the election does not exist."""
+        bitmap = self._bitmap(election_id)
+        if bitmap is None:
+            return None
+        ordinal = self._ordinals.get(student_id)
+        return ordinal is not None and ordinal in bitmap
+
+    def turnout(self, election_id: str) -> int | None:
+        """Number of ballots cast in the election; None if it does not exist."""
+        bitmap = self._bitmap(election_id)
+        return None if bitmap is None else bitmap.count
+
+    def statuses(self, student_id: str, election_ids: list[str]) -> dict[str, bool]:
+        """Has-voted flag of one student for each of the given (existing) elections."""
+        due = [election_id for election_id in election_ids if self._due(election_id)]
+        if due:
+            self._sync(due)  # one query for every election that needs it
+        ordinal = self._ordinals.get(student_id)
+        statuses = {}
+        for election_id in election_ids:
+            # Elections deleted since the caller listed them count as not voted
+            bitmap = self._elections.get(election_id)
+            statuses[election_id] = ordinal is not None and bitmap is not None and ordinal in bitmap
+        return statuses
+
+    def knows_student(self, student_id: str) -> bool:
+        return student_id in self._ordinals
+
+    def add_student(self, student_id: str) -> None:
+        with self._lock:
+            self._ordinal(student_id)
+
+    def record(self, election_id: str, student_id: str) -> None:
+        """Mark a committed ballot. The version is left alone; the deferred votes bump advances it."""
+        with self._lock:
+            bitmap = self._elections.setdefault(election_id, ElectionBitmap())
+            bitmap.add(self._ordinal(student_id))
+
+
+voted_index = VotedIndex()
@@ -0,0 +1,220 @@
+"""
+Virtual waiting room for election-open surges.
+
+Students call ``POST /api/voting/waiting-room/<election_id>/join`` before
+opening the ballot. Each election tracks its in-flight voting sessions:
+students who were let in and have neither voted nor been idle for
+``WAITING_ROOM_SESSION_SECONDS``. While fewer than
+``WAITING_ROOM_THRESHOLD`` sessions are in flight, a student is let in
+straight away. Above that the room opens. New arrivals then get the next
+ticket in a signed queue token, and the room admits tickets in FIFO order
+at ``WAITING_ROOM_ADMIT_PER_SECOND``. The room closes again once its queue
+has drained and the sessions are back under the threshold.
+
+Queued students poll ``GET /api/voting/waiting-room/status`` with their
+token. The endpoint checks the signature and compares the ticket with the
+admission counter, so it never touches the database. While a room is open,
+``submit_vote`` accepts only an admitted token for that election and
+student, sent in the ``X-Queue-Token`` header.
+
+Only existing students and elections can join, and each process keeps at
+most ``WAITING_ROOM_MAX_ROOMS`` rooms. When that many are held, idle rooms
+(closed, with no sessions in flight) are dropped first. If none is idle, new
+elections let students in without a room.
+
+The room state lives in each process, like the voted index. Behind several
+workers, route ``/api/voting`` with sticky sessions, or run the room on one
+worker, so that a student's polls and submission reach the worker that
+issued the ticket.
+"""
+
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+
+
+class Room:
+    """Queue and in-flight sessions of one election."""
+
+    def __init__(self):
+        self.open = False
+        self.issued = 0            # last ticket handed out
+        self.admitted = 0.0        # tickets up to this number are admitted
+        self.advanced_at = time.monotonic()
+        self.sessions: dict[str, float] = {}  # student_id -> session expiry (monotonic)
+
+    def advance(self, rate: float) -> None:
+        now = time.monotonic()
+        self.admitted = min(float(self.issued), self.admitted + rate * (now - self.advanced_at))
+        self.advanced_at = now
+
+    def live_sessions(self) -> int:
+        now = time.monotonic()
+        for student_id in [s for s, expires in self.sessions.items() if expires <= now]:
+            del self.sessions[student_id]
+        return len(self.sessions)
+
+
+class WaitingRoom:
+    def __init__(self, enabled: bool, threshold: int, admit_per_second: float,
+                 session_seconds: int, token_ttl: int, secret: str, max_rooms: int):
+        self.enabled = enabled
+        self.max_rooms = max_rooms
+        self.threshold = threshold
+        self.rate = admit_per_second
+        self.session_seconds = session_seconds
+        self.token_ttl = token_ttl
+        self._secret = secret.encode()
+        self._rooms: dict[str, Room] = {}
+        self._lock = threading.Lock()
+
+    # Tokens: "<election_id>.<student_id>.<ticket>.<expires>.<signature>"; ticket 0 means let in directly
+    def _sign(self, payload: str) -> str:
+        return hmac.new(self._secret, f"waiting-room:{payload}".encode(), hashlib.sha256).hexdigest()
+
+    def make_token(self, election_id: str, student_id: str, ticket: int) -> str:
+        payload = f"{election_id}.{student_id}.{ticket}.{int(time.time()) + self.token_ttl}"
+        return f"{payload}.{self._sign(payload)}"
+
+    def parse_token(self, token: str | None) -> tuple[str, str, int] | None:
+        """(election_id, student_id, ticket) of a valid, unexpired token."""
+        parts = (token or "").split(".")
+        if len(parts) != 5 or not parts[2].isdigit() or not parts[3].isdigit():
+            return None
+        payload, signature = ".".join(parts[:4]), parts[4]
+        if int(parts[3]) < time.time() or not hmac.compare_digest(signature, self._sign(payload)):
+            return None
+        return parts[0], parts[1], int(parts[2])
+
+    def _room(self, election_id: str) -> Room | None:
+        """The election's room, created if there is space for another; None if there is not."""
+        room = self._rooms.get(election_id)
+        if room is None:
+            if len(self._rooms) >= self.max_rooms:
+                for idle in [e for e, r in self._rooms.items() if not r.open and not r.live_sessions()]:
+                    del self._rooms[idle]
+                if len(self._rooms) >= self.max_rooms:
+                    return None
+            room = self._rooms[election_id] = Room()
+        return room
+
+    def _let_in(self, room: Room, student_id: str) -> None:
+        room.sessions[student_id] = time.monotonic() + self.session_seconds
+
+    def _position(self, room: Room, ticket: int) -> int:
+        return max(ticket - int(room.admitted), 0)
+
+    def _status(self, room: Room, election_id: str, student_id: str, ticket: int) -> dict:
+        admitted = ticket <= room.admitted
+        status = {
+            "election_id": election_id,
+            "admitted": admitted,
+            "token": self.make_token(election_id, student_id, ticket),
+        }
+        if not admitted:
+            position = self._position(room, ticket)
+            status["position"] = position
+            wait = position / self.rate if self.rate > 0 else None
+            status["estimated_wait_seconds"] = None if wait is None else round(wait)
+            # Poll a few times over the expected wait, but at least every 10 s and at most every second
+            status["poll_after_seconds"] = 10 if wait is None else min(max(round(wait / 4), 1), 10)
+        return status
+
+    def join(self, election_id: str, student_id: str) -> dict:
+        if not self.enabled:
+            return {"election_id": election_id, "admitted": True, "token": None}
+        with self._lock:
+            room = self._room(election_id)
+            if room is None:
+                return {"election_id": election_id, "admitted": True, "token": None}
+            room.advance(self.rate)
+            self._maybe_close(room, election_id)
+            if student_id in room.sessions or (
+                not room.open and room.live_sessions() < self.threshold
+            ):
+                self._let_in(room, student_id)
+                return self._status(room, election_id, student_id, 0)
+            if not room.open:
+                room.open = True
+                room.admitted = float(room.issued)
+                print(f"🚪 Waiting room opened for election {election_id} "
+                      f"({len(room.sessions)} voting sessions in flight)")
+            room.issued += 1
+            return self._status(room, election_id, student_id, room.issued)
+
+    def status(self, token: str | None) -> dict | None:
+        """Queue status for a token; None if the token is invalid."""
+        parsed = self.parse_token(token)
+        if parsed is None:
+            return None
+        election_id, student_id, ticket = parsed
+        with self._lock:
+            room = self._rooms.get(election_id)
+            if room is None:
+                # Dropped while idle (or lost in a restart); submissions are not held back without a room
+                return {"election_id": election_id, "admitted": True, "token": token}
+            room.advance(self.rate)
+            if ticket <= room.admitted and student_id not in room.sessions:
+                self._let_in(room, student_id)
+            self._maybe_close(room, election_id)
+            return self._status(room, election_id, student_id, ticket)
+
+    def check_submission(self, election_id: str, student_id: str, token: str | None) -> str | None:
+        """Why a submission must wait in the room, or None if it may proceed."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            room = self._rooms.get(election_id)
+            if room is None or not room.open:
+                return None
+            room.advance(self.rate)
+            parsed = self.parse_token(token)
+            if parsed is None or parsed[:2] != (election_id, student_id):
+                return "The waiting room is open for this election; join it to get a queue token"
+            if parsed[2] > room.admitted:
+                return "Your place in the waiting room has not been admitted yet"
+            return None
+
+    def complete(self, election_id: str, student_id: str) -> None:
+        """End a student's voting session after their ballot is committed."""
+        with self._lock:
+            room = self._rooms.get(election_id)
+            if room is not None:
+                room.sessions.pop(student_id, None)
+                self._maybe_close(room, election_id)
+
+    def _maybe_close(self, room: Room, election_id: str) -> None:
+        if room.open and room.admitted >= room.issued and room.live_sessions() < self.threshold:
+            room.open = False
+            print(f"🚪 Waiting room closed for election {election_id}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            rooms = {}
+            for election_id, room in self._rooms.items():
+                room.advance(self.rate)
+                rooms[election_id] = {
+                    "open": room.open,
+                    "sessions": room.live_sessions(),
+                    "queued": room.issued - int(room.admitted),
+                    "issued": room.issued,
+                }
+        return {"enabled": self.enabled, "threshold": self.threshold, "admit_per_second": self.rate, "rooms": rooms}
+
+
+waiting_room = WaitingRoom(
+    enabled=os.getenv("WAITING_ROOM_ENABLED", "false").lower() == "true",
+    threshold=int(os.getenv("WAITING_ROOM_THRESHOLD", "200")),
+    admit_per_second=float(os.getenv("WAITING_ROOM_ADMIT_PER_SECOND", "10")),
+    session_seconds=int(os.getenv("WAITING_ROOM_SESSION_SECONDS", "600")),
+    token_ttl=int(os.getenv("WAITING_ROOM_TOKEN_TTL", "3600")),
+    # Unused while the room is disabled
+    secret=os.getenv("WAITING_ROOM_SECRET") or secrets.token_hex(32),
+    max_rooms=int(os.getenv("WAITING_ROOM_MAX_ROOMS", "100")),
+)
+if waiting_room.enabled and not os.getenv("WAITING_ROOM_SECRET"):
+    # Tokens signed with a per-process key fail on every other worker and after a restart
+    raise RuntimeError("WAITING_ROOM_SECRET must be set when WAITING_ROOM_ENABLED is true")
@@ -14,6 +14,7 @@ const CandidateVoting = () => {
   const [error, setError] = useState('');
   const [studentId, setStudentId] = useState(null);
   const [hasVoted, setHasVoted] = useState(false);
+  const [queue, setQueue] = useState(null); // waiting-room status: { admitted, token, position, ... }
 
   // Get student ID on mount
   useEffect(() => {
@@ -65,9 +66,27 @@ const CandidateVoting = () => {
     if (selectedElection && studentId) {
       fetchCandidates(selectedElection.id);
       checkVotingStatus(selectedElection.id);
+      joinWaitingRoom(selectedElection.id);
     }
   }, [selectedElection, studentId]);
 
+  // While queued in the waiting room, poll for admission
+  useEffect(() => {
+    if (!queue || queue.admitted) return undefined;
+    const timer = setTimeout(async () => {
+      try {
+        const response = await fetch(`/api/voting/waiting-room/status?token=${encodeURIComponent(queue.token)}`);
+        if (response.ok) {
+          setQueue(await response.json());
+        }
+      } catch (err) {
+        console.error('Error polling waiting room:', err);
+        setQueue({ ...queue });  // try again after the same delay
+      }
+    }, (queue.poll_after_seconds || 5) * 1000);
+    return () => clearTimeout(timer);
+  }, [queue]);
+
   const fetchElections = async () => {
     setLoadingElections(true);
     try {
@@ -111,11 +130,35 @@ const CandidateVoting = () => {
     }));
   };
 
+  // Signed session token from login, sent the same way the axios client in services/api.js does
+  const authHeaders = () => {
+    const token = localStorage.getItem('token');
+    return token ? { Authorization: `Bearer ${token}` } : {};
+  };
+
+  const joinWaitingRoom = async (electionId) => {
+    try {
+      const response = await fetch(`/api/voting/waiting-room/${electionId}/join`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          ...authHeaders(),
+        },
+        body: JSON.stringify({ student_id: studentId })
+      });
+      if (response.ok) {
+        setQueue(await response.json());
+      }
+    } catch (err) {
+      console.error('Error joining waiting room:', err);
+    }
+  };
+
   const checkVotingStatus = async (electionId) => {
     if (!studentId) return;
     
     try {
-      const response = await fetch(`/api/voting/status/${studentId}/${electionId}`);
+      const response = await fetch(`/api/voting/status/${studentId}/${electionId}`, { headers: authHeaders() });
       if (response.ok) {
         const data = await response.json();
         if (data.has_voted) {
@@ -153,6 +196,8 @@ const CandidateVoting = () => {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          ...(queue?.token ? { 'X-Queue-Token': queue.token } : {}),
+          ...authHeaders(),
         },
         body: JSON.stringify({
           election_id: selectedElection.id,
@@ -184,6 +229,7 @@ const CandidateVoting = () => {
     setSelectedCandidates({});
     setSubmitted(false);
     setHasVoted(false);
+    setQueue(null);
     setError('');
   };
 
@@ -276,7 +322,15 @@ const CandidateVoting = () => {
                     </div>
                   )}
 
-                  {loadingCandidates ? (
+                  {queue && !queue.admitted && !hasVoted ? (
+                    <div style={loadingStyle}>
+                      <div className="loading-spinner"></div>
+                      <p>Lots of students are voting right now. You are number {queue.position} in line.</p>
+                      {queue.estimated_wait_seconds != null && (
+                        <p>Estimated wait: about {Math.max(1, Math.ceil(queue.estimated_wait_seconds / 60))} min. Keep this page open.</p>
+                      )}
+                    </div>
+                  ) : loadingCandidates ? (
                     <div style={loadingStyle}>
                       <div className="loading-spinner"></div>
                       <p>Loading candidates...</p>
@@ -39,6 +39,9 @@ const login = async (credentials) => {
 
     if (response?.user) {
       localStorage.setItem('user', JSON.stringify(response.user));
+      if (response.token) {
+        localStorage.setItem('token', response.token);
+      }
       setUser(response.user);
       setIsAuthenticated(true);
       return { success: true, data: response };
@@ -109,6 +112,7 @@ const login = async (credentials) => {
       console.error('Logout error:', error);
     } finally {
       localStorage.removeItem('user');
+      localStorage.removeItem('token');
       setUser(null);
       setIsAuthenticated(false);
     }
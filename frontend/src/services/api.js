@@ -11,7 +11,11 @@ const api = axios.create({
 // Request interceptor to add auth token
 api.interceptors.request.use(
   (config) => {
-    // No token-based auth for now - using session-based auth
+    // Signed session token from login / OTP login
+    const token = localStorage.getItem('token');
+    if (token) {
+      config.headers.Authorization = `Bearer ${token}`;
+    }
     return config;
   },
   (error) => {
@@ -26,6 +30,7 @@ api.interceptors.response.use(
     if (error.response?.status === 401) {
       localStorage.removeItem('user');
       localStorage.removeItem('student');
+      localStorage.removeItem('token');
       //window.location.href = '/login';
     }
     return Promise.reject(error);
@@ -67,6 +72,10 @@ export const authAPI = {
   // OTP login
   otpLogin: async (credentials) => {
     const response = await api.post('/auth/otp-login', credentials);
+    // Keep the session token, as AuthContext.login does for password logins
+    if (response.data?.token) {
+      localStorage.setItem('token', response.data.token);
+    }
     return response.data;
   },
 
@@ -88,6 +97,10 @@ export const studentAPI = {
   // Create student profile
   createProfile: async (studentData) => {
     const response = await api.post('/auth/create-student-profile', studentData);
+    // The profile change revokes the old session token and returns one with the new profile
+    if (response.data?.token) {
+      localStorage.setItem('token', response.data.token);
+    }
     return response.data;
   },
 